@@ -0,0 +1,322 @@
+"""
+Headless batch rendering (no Qt).
+
+Example:
+    python batch.py photos/ -o out/ --style portrait --mode soft
+    python batch.py "photos/*.jpg" -o out/ --detail 60 --strength 40 --clean 20
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import fast_blur
+from image_processor import ImageProcessor
+from mask_cache import MaskCache
+from model_manager import CACHE_DIR, MODEL_DIR, PRECISIONS, ModelManager
+from styles.default import DefaultStyle
+from styles.portrait import PortraitStyle
+from styles.architecture import ArchitectureStyle
+from styles.vehicle import VehicleStyle
+from styles.engrave import EngraveStyle
+
+IMAGE_EXT = (".png", ".jpg", ".jpeg", ".bmp")
+
+STYLES = {
+    "default": DefaultStyle,
+    "portrait": PortraitStyle,
+    "architecture": ArchitectureStyle,
+    "vehicle": VehicleStyle,
+    "engrave": EngraveStyle,
+}
+
+# U2Net témakiemelés (ModelManager.registry név)
+SUBJECT_MODEL = "Téma kiemelés"
+
+
+# ---------------------------------------------------------
+# Bemenet összegyűjtése (mappa vagy glob)
+# ---------------------------------------------------------
+def collect_inputs(patterns):
+    files = []
+
+    for pattern in patterns:
+        p = Path(pattern)
+
+        if p.is_dir():
+            found = [f for f in sorted(p.iterdir()) if f.suffix.lower() in IMAGE_EXT]
+        else:
+            found = [Path(f) for f in sorted(glob.glob(pattern))]
+
+        files.extend(f for f in found if f.is_file())
+
+    # duplikátumok kiszűrése, sorrend megtartásával
+    seen = set()
+    unique = []
+    for f in files:
+        key = f.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(f)
+
+    return unique
+
+
+def output_paths(files, out_dir):
+    """
+    Kimeneti PNG útvonalak: név.png, azonos név esetén név_2.png, név_3.png ...
+    (a.jpg és a.png, vagy azonos fájlnév különböző mappákból)
+    """
+    used = set()
+    out = []
+
+    for src in files:
+        name = src.stem + ".png"
+        n = 1
+        while name.lower() in used:
+            n += 1
+            name = f"{src.stem}_{n}.png"
+
+        used.add(name.lower())
+        out.append(out_dir / name)
+
+    return out
+
+
+# ---------------------------------------------------------
+# Unicode kompatibilis olvasás / írás (mint a GUI-ban)
+# ---------------------------------------------------------
+def read_image(path):
+    data = np.fromfile(str(path), dtype=np.uint8)
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+def write_png(path, img):
+    success, encoded = cv2.imencode(".png", img)
+    if success:
+        encoded.tofile(str(path))
+    return success
+
+
+# ---------------------------------------------------------
+# WORKER (külön processzben fut)
+# ---------------------------------------------------------
+_processor = None
+
+
+def _init_worker(style_name, exact_blur=False, subject=False, mask_cache=None,
+                 model_batch=1, precision="fp32"):
+    global _processor
+
+    # egy processz = egy mag, ne versenyezzenek az OpenCV szálak
+    cv2.setNumThreads(1)
+    fast_blur.set_exact(exact_blur)
+
+    models = ModelManager(intra_threads=1, precision=precision) if subject else None
+
+    # a memória cache-nek egy teljes köteg maszkját el kell bírnia
+    cache = MaskCache(entries=max(16, model_batch), cache_dir=mask_cache)
+
+    _processor = ImageProcessor(models, cache)
+    _processor.style = STYLES[style_name](_processor)
+
+    if subject:
+        _processor.active_model = SUBJECT_MODEL
+
+
+def _render_one(src, dst, mode, detail, strength, clean, full_res, memory_mb,
+                img=None):
+    """(src, dst vagy None, idő, hibaüzenet vagy None)"""
+    t0 = time.perf_counter()
+
+    try:
+        return _render_image(src, dst, mode, detail, strength, clean,
+                             full_res, memory_mb, img, t0)
+    except Exception as e:
+        # egy hibás kép ne állítsa le a köteget
+        return src, None, time.perf_counter() - t0, f"{type(e).__name__}: {e}"
+
+
+def _render_image(src, dst, mode, detail, strength, clean, full_res, memory_mb,
+                  img, t0):
+    if img is None:
+        img = read_image(src)
+    if img is None:
+        return src, None, time.perf_counter() - t0, "cannot read image"
+
+    if full_res:
+        # a processz pool már minden magot használ → csempék egy szálon
+        sketch = _processor.process_tiled(
+            img, mode=mode, detail=detail, strength=strength, clean=clean,
+            budget_mb=memory_mb, workers=1
+        )
+    else:
+        sketch = _processor.process(
+            img, mode=mode, detail=detail, strength=strength, clean=clean
+        )
+
+    if sketch is None:
+        return src, None, time.perf_counter() - t0, "no result"
+    if not write_png(dst, sketch):
+        return src, None, time.perf_counter() - t0, "cannot write output"
+
+    return src, dst, time.perf_counter() - t0, None
+
+
+def _render_chunk(items, mode, detail, strength, clean, full_res, memory_mb):
+    """
+    Több kép egy feladatban: a U2Net maszkok egy kötegelt futtatással
+    készülnek, utána a képek a cache-ből kapják.
+    """
+    t0 = time.perf_counter()
+
+    images = [read_image(src) for src, _ in items]
+    loaded = [img for img in images if img is not None]
+
+    # (a csempés render is ugyanezen az 1600 px-es képen kéri a maszkot)
+    # hiba esetén a képek egyenként kérik a maszkjukat
+    try:
+        _processor.prefetch_masks(loaded, batch_size=len(loaded) or 1)
+    except Exception as e:
+        print(f"[batch] mask batch failed ({e}), masking per image")
+
+    # a köteg ideje egyenlően oszlik el a képek között
+    share = (time.perf_counter() - t0) / max(1, len(items))
+
+    results = []
+    for (src, dst), img in zip(items, images):
+        src, out, elapsed, error = _render_one(
+            src, dst, mode, detail, strength, clean, full_res, memory_mb, img=img
+        )
+        results.append((src, out, elapsed + share, error))
+
+    return results
+
+
+# ---------------------------------------------------------
+# FŐ FÜGGVÉNY
+# ---------------------------------------------------------
+def run_batch(files, out_dir, style="default", mode="soft",
+              detail=50, strength=50, clean=0, workers=None,
+              full_res=False, memory_mb=1024, exact_blur=False,
+              subject=False, mask_cache=None, model_batch=8, precision="fp32"):
+    """
+    Minden fájl feldolgozása processz poolon.
+    subject esetén model_batch képenként egy feladat (kötegelt U2Net).
+    Hibás kép (vagy leállt worker) sikertelennek számít, a többi folytatódik.
+    Visszatérés: (sikeres darabszám, teljes idő mp-ben)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    done = 0
+    t_start = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(style, exact_blur, subject, mask_cache, model_batch, precision),
+    ) as pool:
+
+        items = list(zip(files, output_paths(files, out_dir)))
+        chunk = max(1, model_batch) if subject else 1
+
+        jobs = {
+            pool.submit(
+                _render_chunk, items[i:i + chunk],
+                mode, detail, strength, clean, full_res, memory_mb
+            ): items[i:i + chunk]
+            for i in range(0, len(items), chunk)
+        }
+
+        for fut in as_completed(jobs):
+            try:
+                results = fut.result()
+            except Exception as e:
+                # a worker processz maga hibázott (pl. elfogyott a memória)
+                results = [(src, None, 0.0, f"{type(e).__name__}: {e}")
+                           for src, _ in jobs[fut]]
+
+            for src, dst, elapsed, error in results:
+
+                if dst is None:
+                    print(f"FAILED  {src}  ({elapsed:.2f} s)  {error}")
+                    continue
+
+                done += 1
+                print(f"{elapsed:7.2f} s  {src} -> {dst}")
+
+    total = time.perf_counter() - t_start
+    return done, total
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="LaserBase Sketch - batch drawing generator"
+    )
+    ap.add_argument("inputs", nargs="+", help="directory or glob pattern")
+    ap.add_argument("-o", "--output", required=True, help="output directory")
+    ap.add_argument("--style", choices=sorted(STYLES), default="default")
+    ap.add_argument("--mode", choices=("soft", "strong"), default="soft")
+    ap.add_argument("--detail", type=int, default=50)
+    ap.add_argument("--strength", type=int, default=50)
+    ap.add_argument("--clean", type=int, default=0)
+    ap.add_argument("-j", "--workers", type=int, default=None,
+                    help="worker processes (default: all cores)")
+    ap.add_argument("--full-res", action="store_true",
+                    help="render at native resolution in tiles (no 1600 px cap)")
+    ap.add_argument("--memory-mb", type=int, default=1024,
+                    help="tile working memory per worker for --full-res")
+    ap.add_argument("--exact-blur", action="store_true",
+                    help="use exact Gaussian blur instead of the pyramid approximation")
+    ap.add_argument("--subject", action="store_true",
+                    help="separate the subject from the background with U2Net")
+    ap.add_argument("--mask-cache", default=str(CACHE_DIR / "masks"),
+                    help="directory for cached subject masks ('none' to disable)")
+    ap.add_argument("--model-batch", type=int, default=8,
+                    help="images per U2Net inference call with --subject")
+    ap.add_argument("--precision", choices=PRECISIONS, default="fp32",
+                    help="U2Net variant for --subject (int8 is built once if missing)")
+    args = ap.parse_args(argv)
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("No input images found.")
+        return 1
+
+    if args.subject:
+        models = ModelManager(precision=args.precision)
+        if not (MODEL_DIR / models.registry[SUBJECT_MODEL]).exists():
+            print(f"Subject model not found in {MODEL_DIR}")
+            return 1
+
+        # a kvantált változat egyszer készül, nem minden worker-ben
+        models.prepare(SUBJECT_MODEL)
+
+    mask_cache = None if args.mask_cache.lower() == "none" else args.mask_cache
+
+    done, total = run_batch(
+        files, args.output,
+        style=args.style, mode=args.mode,
+        detail=args.detail, strength=args.strength, clean=args.clean,
+        workers=args.workers,
+        full_res=args.full_res, memory_mb=args.memory_mb,
+        exact_blur=args.exact_blur,
+        subject=args.subject, mask_cache=mask_cache,
+        model_batch=args.model_batch, precision=args.precision,
+    )
+
+    rate = done / total if total > 0 else 0.0
+    print(f"\n{done}/{len(files)} images, {total:.2f} s, {rate:.2f} images/s")
+    return 0 if done == len(files) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
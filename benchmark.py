@@ -0,0 +1,864 @@
+"""
+Teljesítmény mérések.
+
+    python benchmark.py styles [images...]
+    python benchmark.py blur [images...]
+    python benchmark.py masks [images...] [--batch 8] [--count 16]
+    python benchmark.py precision [images...]
+    python benchmark.py vectorize [images...] [--style engrave]
+    python benchmark.py merge [images...] [--merge 50]
+    python benchmark.py export [images...] [--out DIR]
+    python benchmark.py travel [images...] [--budget 2]
+    python benchmark.py preview [images...] [--scale 0.5]
+    python benchmark.py tiles [images...] [--megapixels 12 48] [--budget 128] [--subject]
+    python benchmark.py trace [images...] [--workers 1 2 4 8]
+    python benchmark.py history [images...] [--steps 20]
+    python benchmark.py brush [--size 12] [--events-per-frame 8]
+"""
+import argparse
+import gc
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from batch import STYLES, SUBJECT_MODEL, collect_inputs, read_image
+from edit.history import History
+from edit.manager import EditManager
+from exporters import export_paths
+from fast_blur import gaussian_blur
+from image_processor import ImageProcessor
+from mask_cache import MaskCache
+from model_manager import MODEL_DIR, PRECISIONS, ModelManager
+from path_set import PathSet
+from travel_optimizer import TravelOptimizer
+from vectorizer import Vectorizer
+
+IMAGES_DIR = Path(__file__).parent / "images"
+
+
+def _timed(fn, repeat=1):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _load_images(paths):
+    files = collect_inputs(paths or [str(IMAGES_DIR)])
+    images = []
+    for f in files:
+        img = read_image(f)
+        if img is not None:
+            images.append((f.name, img))
+    return images
+
+
+# ---------------------------------------------------------
+# CSEMPÉS RENDER: csúcs memória a kerethez képest
+# ---------------------------------------------------------
+def bench_tiles(args):
+    images = _load_images(args.images)
+
+    # témakiemelés: a maszk a (kis keretnél kisebb) proxyhoz igazodik
+    if args.subject and _mask_processor(1) is None:
+        print(f"Subject model not found in {MODEL_DIR}")
+        return 1
+
+    print(f"{'image':<16}{'size':>13}{'time s':>9}{'peak MB':>10}"
+          f"{'working MB':>12}{'budget MB':>11}{'within':>8}")
+
+    failed = False
+    for name, img in images:
+        for mp in args.megapixels:
+            f = (mp * 1e6 / (img.shape[0] * img.shape[1])) ** 0.5
+            big = cv2.resize(img, None, fx=f, fy=f, interpolation=cv2.INTER_CUBIC)
+
+            proc = _mask_processor(1) if args.subject else ImageProcessor()
+            proc.style = STYLES[args.style](proc)
+            proc.set_image(big)
+            del big
+
+            # a keretben nincs benne a kimenet és a vonal réteg
+            # (a bemenet a mérés előtt készül)
+            h, w = proc._current_image.shape[:2]
+            fixed = 2 * h * w
+
+            gc.collect()
+            tracemalloc.start()
+            t, _ = _timed(lambda: proc.process_tiled(
+                budget_mb=args.budget, workers=args.workers
+            ))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            working = (peak - fixed) / 2 ** 20
+            within = working <= args.budget
+            failed |= not within
+
+            print(f"{name:<16}{f'{w}x{h}':>13}{t:9.2f}{peak / 2 ** 20:10.0f}"
+                  f"{working:12.0f}{args.budget:11}{str(within):>8}")
+
+    print("\npeak = traced numpy / Python allocations during process_tiled; "
+          "working = peak - output and line layer")
+    return 1 if failed else 0
+
+
+# ---------------------------------------------------------
+# STÍLUSOK: közös jellemző csomag (FeatureBundle) hatása
+# ---------------------------------------------------------
+# csúszka húzás szimuláció: detail, majd vonalvastagság változik
+SLIDER_STEPS = [(50, 50), (55, 50), (60, 50), (60, 40), (60, 30), (65, 30)]
+
+
+def _style_run(img, style_cls, cache_mb):
+    proc = ImageProcessor()
+    proc.feature_registry.budget = cache_mb * 1024 * 1024
+    proc.style = style_cls(proc)
+
+    small, _ = proc._resize_for_processing(proc.auto_crop(img), 1600)
+    prep = proc.auto_prep(small)
+
+    times = []
+    for detail, strength in SLIDER_STEPS:
+        t, _ = _timed(lambda: proc.style.generate(prep, detail, strength))
+        times.append(t)
+    return times
+
+
+def bench_styles(args):
+    images = _load_images(args.images)
+
+    print(f"{'image':<16}{'style':<14}{'first':>9}{'first*':>9}"
+          f"{'steps':>9}{'steps*':>9}{'speedup':>9}")
+
+    for name, img in images:
+        for style_name, style_cls in sorted(STYLES.items()):
+            plain = _style_run(img, style_cls, 0)
+            shared = _style_run(img, style_cls, 512)
+
+            steps_plain = sum(plain[1:])
+            steps_shared = sum(shared[1:])
+            speedup = steps_plain / steps_shared if steps_shared > 0 else 0.0
+
+            print(f"{name:<16}{style_name:<14}"
+                  f"{plain[0]:9.3f}{shared[0]:9.3f}"
+                  f"{steps_plain:9.3f}{steps_shared:9.3f}{speedup:8.1f}x")
+
+    print("\n* = with FeatureBundle memoization; 'steps' = "
+          f"{len(SLIDER_STEPS) - 1} slider moves after the first render (s)")
+
+
+# ---------------------------------------------------------
+# BLUR: piramis közelítés vs cv2.GaussianBlur
+# ---------------------------------------------------------
+BLUR_SIGMAS = [8, 9, 12, 25, 35, 60]
+
+
+def bench_blur(args):
+    images = _load_images(args.images)
+
+    print(f"{'image':<16}{'sigma':>6}{'exact':>9}{'fast':>9}{'speedup':>9}"
+          f"{'max err':>9}{'mean err':>10}")
+
+    for name, img in images:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        for sigma in BLUR_SIGMAS:
+            t_exact, exact = _timed(
+                lambda: cv2.GaussianBlur(gray, (0, 0), sigma), args.repeat)
+            t_fast, fast = _timed(
+                lambda: gaussian_blur(gray, (0, 0), sigma, exact=False), args.repeat)
+
+            err = cv2.absdiff(exact, fast)
+            speedup = t_exact / t_fast if t_fast > 0 else 0.0
+
+            print(f"{name:<16}{sigma:>6}{t_exact:9.3f}{t_fast:9.3f}{speedup:8.1f}x"
+                  f"{int(err.max()):>9}{float(np.mean(err)):>10.3f}")
+
+
+# ---------------------------------------------------------
+# MASZKOK: képenkénti ai_mask vs kötegelt ai_masks
+# ---------------------------------------------------------
+def _mask_processor(intra_threads, precision="fp32"):
+    models = ModelManager(intra_threads=intra_threads, precision=precision)
+    if not (MODEL_DIR / models.registry[SUBJECT_MODEL]).exists():
+        return None
+
+    # cache nélkül mérünk (minden hívás tényleges inferencia)
+    proc = ImageProcessor(models, MaskCache(entries=1))
+    proc.active_model = SUBJECT_MODEL
+    return proc
+
+
+def bench_masks(args):
+    proc = _mask_processor(args.threads)
+    if proc is None:
+        print(f"Subject model not found in {MODEL_DIR}")
+        return 1
+
+    images = [img for _, img in _load_images(args.images)]
+    if not images:
+        print("No input images found.")
+        return 1
+
+    images = [
+        proc._resize_for_processing(images[i % len(images)], 1600)[0]
+        for i in range(args.count)
+    ]
+
+    # session betöltés + első futás ne számítson
+    proc.models.warm_up(SUBJECT_MODEL, background=False)
+
+    def loop():
+        for img in images:
+            proc.mask_cache.clear()
+            proc.ai_mask(img)
+
+    def batched():
+        proc.mask_cache.clear()
+        proc.ai_masks(images, args.batch)
+
+    t_loop, _ = _timed(loop, args.repeat)
+    t_batch, _ = _timed(batched, args.repeat)
+
+    n = len(images)
+    print(f"{'path':<22}{'time':>9}{'images/s':>10}")
+    print(f"{'per-image ai_mask':<22}{t_loop:9.3f}{n / t_loop:10.2f}")
+    print(f"{'ai_masks batch=' + str(args.batch):<22}{t_batch:9.3f}{n / t_batch:10.2f}")
+    print(f"\nspeedup: {t_loop / t_batch:.2f}x ({n} images)")
+
+
+# ---------------------------------------------------------
+# PONTOSSÁG: fp32 vs kvantált változatok (IoU + késleltetés)
+# ---------------------------------------------------------
+def _iou(a, b):
+    a = a > 0.5
+    b = b > 0.5
+    union = np.logical_or(a, b).sum()
+    if union == 0:
+        return 1.0
+    return float(np.logical_and(a, b).sum() / union)
+
+
+def _precision_run(proc, images, repeat):
+    masks, times = [], []
+    for img in images:
+        def one():
+            proc.mask_cache.clear()
+            return proc.ai_mask(img)
+
+        t, mask = _timed(one, repeat)
+        masks.append(mask)
+        times.append(t)
+    return masks, times
+
+
+def bench_precision(args):
+    images = _load_images(args.images)
+    if not images:
+        print("No input images found.")
+        return 1
+
+    names = [name for name, _ in images]
+    images = [
+        ImageProcessor()._resize_for_processing(img, 1600)[0]
+        for _, img in images
+    ]
+
+    results = {}
+    for precision in PRECISIONS:
+        proc = _mask_processor(args.threads, precision)
+        if proc is None:
+            print(f"Subject model not found in {MODEL_DIR}")
+            return 1
+
+        proc.models.warm_up(SUBJECT_MODEL, background=False)
+        results[precision] = _precision_run(proc, images, args.repeat)
+
+    ref_masks, ref_times = results["fp32"]
+
+    print(f"{'image':<16}{'precision':<11}{'ms':>8}{'speedup':>9}{'IoU':>8}")
+    for precision in PRECISIONS:
+        masks, times = results[precision]
+        for name, mask, ref, t, t_ref in zip(names, masks, ref_masks, times, ref_times):
+            print(f"{name:<16}{precision:<11}{t * 1000:8.1f}"
+                  f"{t_ref / t:8.2f}x{_iou(mask, ref):8.3f}")
+
+    print()
+    for precision in PRECISIONS:
+        masks, times = results[precision]
+        iou = np.mean([_iou(m, r) for m, r in zip(masks, ref_masks)])
+        print(f"{precision:<6} mean {np.mean(times) * 1000:7.1f} ms/image, "
+              f"speedup {np.mean(ref_times) / np.mean(times):.2f}x, mean IoU {iou:.3f}")
+
+
+# ---------------------------------------------------------
+# VEKTORIZÁLÁS: régi pixel bejáró vs gyűrű / kontúr követés
+# ---------------------------------------------------------
+def _sketch(img, style_name):
+    proc = ImageProcessor()
+    proc.style = STYLES[style_name](proc)
+    return proc.process(img)
+
+
+def _coverage(bw, paths):
+    """a tinta pixelek hányada, ami 1 px-en belül van egy újrarajzolt vonalhoz"""
+    ink = np.count_nonzero(bw)
+    if ink == 0:
+        return 1.0
+
+    drawn = np.zeros_like(bw)
+    if not isinstance(paths, PathSet):
+        paths = PathSet.from_paths(paths)
+    polys = [p for p in paths.polylines() if len(p) > 1]
+    cv2.polylines(drawn, polys, False, 1, 1)
+    drawn = cv2.dilate(drawn, np.ones((3, 3), np.uint8))
+
+    return np.count_nonzero(drawn & bw) / ink
+
+
+def _legacy_walk(bw, min_length):
+    """a régi pixel bejáró (a Vectorizer korábbi követése), viszonyítási alap"""
+    visited = np.zeros_like(bw, dtype=np.uint8)
+    h, w = bw.shape
+    paths = []
+
+    # 8 szomszéd
+    N = [(-1,-1),(-1,0),(-1,1),
+         ( 0,-1),       (0,1),
+         ( 1,-1),(1,0),(1,1)]
+
+    def trace(x, y):
+        path = [(x,y)]
+        visited[y,x] = 1
+
+        cx, cy = x, y
+        while True:
+            found = False
+            for dx,dy in N:
+                nx, ny = cx+dx, cy+dy
+                if 0<=nx<w and 0<=ny<h:
+                    if bw[ny,nx] and not visited[ny,nx]:
+                        visited[ny,nx] = 1
+                        path.append((nx,ny))
+                        cx,cy = nx,ny
+                        found = True
+                        break
+            if not found:
+                break
+        return path
+
+    for y in range(h):
+        for x in range(w):
+            if bw[y,x] and not visited[y,x]:
+                p = trace(x,y)
+                if len(p) > min_length:
+                    paths.append(p)
+
+    return paths
+
+
+def _vector_run(vectorizer, bw, legacy):
+    # régi: tuple listák, útvonalanként simítva; új: PathSet
+    if legacy:
+        return lambda: [vectorizer._simplify(p) for p in _legacy_walk(bw, vectorizer.min_length)]
+
+    return lambda: vectorizer._trace_rings(bw).simplify(vectorizer.epsilon)
+
+
+def _list_bytes(paths):
+    """(x, y) tuple listák tényleges memóriája"""
+    tracemalloc.start()
+    lists = paths.to_lists()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del lists
+    return size
+
+
+def bench_vectorize(args):
+    images = _load_images(args.images)
+
+    print(f"{'image':<16}{'size':>11}{'legacy':>9}{'new':>9}{'speedup':>9}"
+          f"{'paths':>14}{'coverage':>15}{'KB':>16}")
+
+    for name, img in images:
+        sketch = _sketch(img, args.style)
+        bw = (sketch < 200).astype(np.uint8)
+
+        v = Vectorizer()
+        v.min_length = 2 + (100 - args.detail) * 0.25
+        v.epsilon = 0.5 + args.smooth * 0.04
+
+        t_old, old = _timed(_vector_run(v, bw, True))
+        t_new, new = _timed(_vector_run(v, bw, False), args.repeat)
+
+        size = f"{bw.shape[1]}x{bw.shape[0]}"
+        print(f"{name:<16}{size:>11}{t_old:9.3f}{t_new:9.3f}{t_old / t_new:8.1f}x"
+              f"{len(old):>7}/{len(new):<6}"
+              f"{_coverage(bw, old):7.3f}/{_coverage(bw, new):.3f}"
+              f"{_list_bytes(new) // 1024:>9}/{new.nbytes // 1024:<6}")
+
+    print("\npaths / coverage: legacy/new "
+          "(coverage = ink pixels within 1 px of the redrawn polylines)")
+    print("KB: the new result as tuple lists / as PathSet")
+
+
+# ---------------------------------------------------------
+# ÖSSZEFŰZÉS: rács indexes vs régi páros keresés
+# ---------------------------------------------------------
+def _legacy_merge(paths, dist=2.5, angle=35):
+    """a régi páros végpont összefűzés (tuple listákon), viszonyítási alap"""
+
+    def ang(a,b):
+        dx=b[0]-a[0]
+        dy=b[1]-a[1]
+        return math.degrees(math.atan2(dy,dx))
+
+    merged = True
+    while merged:
+        merged=False
+
+        for i in range(len(paths)):
+            if merged: break
+            for j in range(i+1,len(paths)):
+                p1=paths[i]
+                p2=paths[j]
+
+                a1=p1[-2]; a2=p1[-1]
+                b1=p2[0];  b2=p2[1]
+
+                d=((a2[0]-b1[0])**2+(a2[1]-b1[1])**2)**0.5
+                if d>dist: continue
+
+                da=ang(a1,a2)
+                db=ang(b1,b2)
+
+                if abs(da-db)<angle:
+                    paths[i]=p1+p2
+                    del paths[j]
+                    merged=True
+                    break
+
+    return paths
+
+
+def bench_merge(args):
+    images = _load_images(args.images)
+
+    v = Vectorizer()
+    v.min_length = 2 + (100 - args.detail) * 0.25
+    dist = 1 + args.merge * 0.08
+
+    print(f"{'image':<16}{'paths':>8}{'merged':>8}{'joins':>8}{'indexed':>9}"
+          f"{'| subset':>9}{'pairwise':>10}{'indexed':>9}{'speedup':>9}")
+
+    for name, img in images:
+        bw = (_sketch(img, args.style) < 200).astype(np.uint8)
+        paths = v._trace_rings(bw).simplify(v.epsilon)
+
+        t_all, merged = _timed(
+            lambda: v._merge_paths(paths, dist, v.MERGE_ANGLE), args.repeat)
+        joins = v.last_merge[0]
+
+        # a régi algoritmus csak egy részhalmazon futtatható értelmes időben
+        # (és egypontos útvonalon elhasal)
+        subset = paths.select(np.flatnonzero(paths.counts() > 1)[:args.legacy_limit])
+        t_old, _ = _timed(
+            lambda: _legacy_merge(subset.to_lists(), dist, v.MERGE_ANGLE))
+        t_new, _ = _timed(
+            lambda: v._merge_paths(subset, dist, v.MERGE_ANGLE), args.repeat)
+
+        print(f"{name:<16}{len(paths):>8}{len(merged):>8}{joins:>8}{t_all:9.3f}"
+              f"{len(subset):>9}{t_old:10.3f}{t_new:9.3f}{t_old / t_new:8.1f}x")
+
+
+# ---------------------------------------------------------
+# VEKTOR EXPORT: SVG / DXF / G-code írás ideje
+# ---------------------------------------------------------
+def bench_export(args):
+    images = _load_images(args.images)
+    formats = [".svg", ".dxf", ".gcode"]
+
+    v = Vectorizer()
+    v.min_length = 2 + (100 - args.detail) * 0.25
+
+    print(f"{'image':<16}{'paths':>8}{'points':>9}"
+          + "".join(f"{ext[1:]:>10}{'MB':>6}" for ext in formats))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(args.out or tmp)
+        out.mkdir(parents=True, exist_ok=True)
+
+        for name, img in images:
+            sketch = _sketch(img, args.style)
+            paths = v._trace_rings((sketch < 200).astype(np.uint8)).simplify(v.epsilon)
+
+            row = f"{name:<16}{len(paths):>8}{paths.total_points:>9}"
+            for ext in formats:
+                target = out / (Path(name).stem + ext)
+                t, _ = _timed(
+                    lambda: export_paths(target, paths, sketch.shape, args.mm_per_px),
+                    args.repeat)
+                row += f"{t:10.3f}{target.stat().st_size / 2 ** 20:6.1f}"
+            print(row)
+
+
+# ---------------------------------------------------------
+# ÜRESJÁRAT: sorrend optimalizálás
+# ---------------------------------------------------------
+def bench_travel(args):
+    images = _load_images(args.images)
+
+    v = Vectorizer()
+    v.min_length = 2 + (100 - args.detail) * 0.25
+
+    print(f"{'image':<16}{'paths':>8}{'raster':>11}{'nearest':>10}{'final':>10}"
+          f"{'saved':>8}{'moves':>8}{'time':>8}")
+
+    for name, img in images:
+        sketch = _sketch(img, args.style)
+        paths = v._trace_rings((sketch < 200).astype(np.uint8)).simplify(v.epsilon)
+
+        opt = TravelOptimizer(time_budget=args.budget, start=(0, sketch.shape[0]))
+        opt.optimize(paths)
+        s = opt.last_stats
+
+        saved = 1 - s["after"] / s["before"] if s["before"] else 0.0
+        print(f"{name:<16}{len(paths):>8}{s['before']:11.0f}{s['nearest']:10.0f}"
+              f"{s['after']:10.0f}{saved * 100:7.1f}%{s['moves']:>8}{s['seconds']:8.2f}")
+
+    print("\ntravel in px: raster = vectorizer order, nearest = after nearest "
+          "neighbour, final = after 2-opt / Or-opt")
+
+
+# ---------------------------------------------------------
+# ELŐNÉZET: szakaszonkénti cv2.line vs egy cv2.polylines
+# ---------------------------------------------------------
+def _draw_segments(shape, paths):
+    """régi draw_preview: BGR vászon, szakaszonként, utána szürkévé"""
+    canvas = np.full((shape[0], shape[1], 3), 255, np.uint8)
+    for path in paths.to_lists():
+        for a, b in zip(path[:-1], path[1:]):
+            cv2.line(canvas, a, b, (0, 0, 0), 1, cv2.LINE_AA)
+    return cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY)
+
+
+def bench_preview(args):
+    images = _load_images(args.images)
+
+    print(f"{'image':<16}{'paths':>8}{'segments':>10}{'lines':>9}{'polylines':>11}"
+          f"{'speedup':>9}{'identical':>11}{f'x{args.scale:g}':>9}")
+
+    for name, img in images:
+        sketch = _sketch(img, args.style)
+
+        v = Vectorizer()
+        v.min_length = 2 + (100 - args.detail) * 0.25
+        paths = v._trace_rings((sketch < 200).astype(np.uint8)).simplify(v.epsilon)
+        segments = int(np.maximum(paths.counts() - 1, 0).sum())
+
+        t_old, old = _timed(lambda: _draw_segments(sketch.shape, paths))
+        t_new, new = _timed(lambda: v.draw_preview(sketch.shape, paths), args.repeat)
+        t_zoom, _ = _timed(
+            lambda: v.draw_preview(sketch.shape, paths, args.scale), args.repeat)
+
+        print(f"{name:<16}{len(paths):>8}{segments:>10}{t_old:9.3f}{t_new:11.3f}"
+              f"{t_old / t_new:8.1f}x{str(np.array_equal(old, new)):>11}{t_zoom:9.3f}")
+
+
+# ---------------------------------------------------------
+# VONAL KÖVETÉS: csempénként párhuzamosan, 1 / 2 / 4 / 8 szál
+# ---------------------------------------------------------
+def bench_trace(args):
+    images = _load_images(args.images)
+
+    head = "".join(f"{f'{n} thr':>9}" for n in args.workers)
+    print(f"{'image':<16}{'size':>11}{'paths':>8}{'single':>9}{head}"
+          f"{'tiled':>8}{'ink':>8}")
+
+    def coverage(paths, bw):
+        hit = np.zeros_like(bw)
+        hit[paths.points[:, 1], paths.points[:, 0]] = 1
+        return (hit & bw).sum() / max(bw.sum(), 1)
+
+    for name, img in images:
+        sketch = _sketch(img, args.style)
+        bw = (sketch < 200).astype(np.uint8)
+        if args.scale != 1:
+            bw = cv2.resize(bw, None, fx=args.scale, fy=args.scale,
+                            interpolation=cv2.INTER_NEAREST)
+
+        v = Vectorizer(workers=1)
+        v.min_length = 2 + (100 - args.detail) * 0.25
+        t_ref, ref = _timed(lambda: v._trace_rings(bw), args.repeat)
+
+        cols = []
+        for n in args.workers:
+            v.workers = n
+            t, paths = _timed(lambda: v._trace_rings(bw), args.repeat)
+            cols.append(f"{t_ref / t:8.2f}x")
+
+        # csempézett eredmény: útvonalak és lefedett tinta a szimplához képest
+        v.workers = 2
+        tiled = v._trace_rings(bw)
+        ink = coverage(tiled, bw) - coverage(ref, bw)
+
+        size = f"{bw.shape[1]}x{bw.shape[0]}"
+        print(f"{name:<16}{size:>11}{len(ref):>8}{t_ref:9.3f}{''.join(cols)}"
+              f"{len(tiled):>8}{ink * 100:+7.2f}%")
+
+    print(f"\nspeedup vs single-threaded tracing ({Vectorizer.TILE} px tiles, "
+          f"{Vectorizer.OVERLAP} px overlap, {os.cpu_count()} CPUs); "
+          "tiled = paths after seam stitching, ink = covered ink vs single")
+
+
+# ---------------------------------------------------------
+# UNDO: teljes másolatok vs csempe delták
+# ---------------------------------------------------------
+def bench_history(args):
+    images = _load_images(args.images)
+    rng = np.random.default_rng(0)
+
+    print(f"{'image':<16}{'size':>11}{'full MB':>9}{'delta MB':>10}{'push':>8}"
+          f"{'undo':>8}{'redo':>8}{'identical':>11}")
+
+    for name, img in images:
+        sketch = _sketch(img, args.style)
+        if args.scale != 1:
+            sketch = cv2.resize(sketch, None, fx=args.scale, fy=args.scale,
+                                interpolation=cv2.INTER_NEAREST)
+        h, w = sketch.shape[:2]
+
+        history = History(args.steps, budget_mb=1 << 20)
+        states = []
+        cur = sketch.copy()
+        t_push = 0.0
+
+        # lépésenként pár radír vonás (mint az ecset)
+        for _ in range(args.steps):
+            states.append(cur.copy())
+            state = cur.copy()
+            t0 = time.perf_counter()
+            history.push(state)
+            t_push += time.perf_counter() - t0
+
+            for _ in range(args.strokes):
+                x, y = int(rng.integers(w)), int(rng.integers(h))
+                cv2.circle(cur, (x, y), args.brush, 255, -1, cv2.LINE_AA)
+
+        stored = history.nbytes
+        states.append(cur.copy())
+
+        same = True
+        t_undo = 0.0
+        for k in range(args.steps):
+            t0 = time.perf_counter()
+            cur = history.undo(cur)
+            t_undo += time.perf_counter() - t0
+            same &= np.array_equal(cur, states[-2 - k])
+
+        t_redo = 0.0
+        for k in range(args.steps):
+            t0 = time.perf_counter()
+            cur = history.redo(cur)
+            t_redo += time.perf_counter() - t0
+            same &= np.array_equal(cur, states[k + 1])
+
+        n = args.steps
+        size = f"{w}x{h}"
+        print(f"{name:<16}{size:>11}{sketch.nbytes * n / 1e6:9.1f}{stored / 1e6:10.1f}"
+              f"{t_push / n * 1e3:6.1f}ms{t_undo / n * 1e3:6.1f}ms{t_redo / n * 1e3:6.1f}ms"
+              f"{str(same):>11}")
+
+    print(f"\n{args.steps} steps of {args.strokes} eraser dabs (r={args.brush}); "
+          "times per step")
+
+
+# ---------------------------------------------------------
+# ECSET: eseményenként egy kör vs képkockánként egy polylines
+# ---------------------------------------------------------
+def _stroke_events(step, count, size):
+    """egér események egy hullámos vonás mentén, 'step' px távolságra"""
+    t = np.arange(count) * step
+    span = size - 200
+
+    # oda-vissza (háromszög hullám): nincs ugrás a vonásban
+    x = 100 + np.abs((t + span) % (2 * span) - span)
+    y = size // 2 + 300 * np.sin(t / 400)
+    return np.stack([x, y], 1).astype(int).tolist()
+
+
+def bench_brush(args):
+    print(f"{'stroke':<8}{'events':>8}{'old':>10}{'new':>10}"
+          f"{'speedup':>9}{'gaps old':>10}{'gaps new':>10}")
+
+    for label, step in (("slow", 1), ("normal", 8), ("fast", 60)):
+        events = _stroke_events(step, args.events, args.canvas)
+
+        # régi (EditManager.apply_at): eseményenként egy kör
+        old = np.zeros((args.canvas, args.canvas), np.uint8)
+        brush = EditManager().brush
+        brush.set_size(args.size)
+
+        t0 = time.perf_counter()
+        for x, y in events:
+            brush.apply(old, x, y)
+        t_old = time.perf_counter() - t0
+
+        # új: pontok sorban, képkockánként egy festés
+        edit = EditManager()
+        edit.enable(True)
+        edit.set_tool(edit.TOOL_BRUSH)
+        edit.set_base_image(np.zeros((args.canvas, args.canvas), np.uint8))
+        edit.brush.set_size(args.size)
+
+        t0 = time.perf_counter()
+        edit.begin_stroke()
+        for i in range(0, len(events), args.events_per_frame):
+            for x, y in events[i:i + args.events_per_frame]:
+                edit.stroke_to(x, y)
+            edit.flush_stroke()
+        t_new = time.perf_counter() - t0
+
+        # hézag: a vonás középvonalán festetlen pixel
+        center = np.zeros_like(old)
+        cv2.polylines(center, [np.array(events, np.int32)], False, 255, 1)
+        on_line = center > 0
+
+        print(f"{label:<8}{len(events):>8}{t_old * 1e3:8.1f}ms{t_new * 1e3:8.1f}ms"
+              f"{t_old / t_new:8.2f}x"
+              f"{np.count_nonzero(on_line & (old < 128)):>10}"
+              f"{np.count_nonzero(on_line & (edit.mask < 128)):>10}")
+
+    print(f"\nbrush radius {args.size}, {args.events_per_frame} mouse events per frame; "
+          "old = one circle per mouse event, new = queued stroke "
+          "(circles for short segments, polylines for long); "
+          "gaps = unpainted pixels on the stroke centre line")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LaserBase Sketch benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("styles", help="SketchStyle.generate with/without feature sharing")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.set_defaults(fn=bench_styles)
+
+    p = sub.add_parser("blur", help="pyramid blur speed and error vs cv2.GaussianBlur")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_blur)
+
+    p = sub.add_parser("masks", help="U2Net per-image vs batched inference throughput")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--batch", type=int, default=8)
+    p.add_argument("--count", type=int, default=16, help="number of masks per run")
+    p.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads")
+    p.add_argument("--repeat", type=int, default=2)
+    p.set_defaults(fn=bench_masks)
+
+    p = sub.add_parser("precision", help="mask IoU and latency of model precision variants")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_precision)
+
+    p = sub.add_parser("vectorize", help="legacy pixel walker vs vectorized tracer")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="default")
+    p.add_argument("--detail", type=int, default=50, help="vec_detail slider")
+    p.add_argument("--smooth", type=int, default=25, help="vec_smooth slider")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_vectorize)
+
+    p = sub.add_parser("merge", help="grid-indexed vs pairwise endpoint merging")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="engrave")
+    p.add_argument("--detail", type=int, default=100,
+                   help="vec_detail slider (100 = keep short paths → most paths)")
+    p.add_argument("--merge", type=int, default=50, help="vec_merge slider")
+    p.add_argument("--legacy-limit", type=int, default=500,
+                   help="paths given to the pairwise merge")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_merge)
+
+    p = sub.add_parser("export", help="SVG / DXF / G-code export time and size")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="engrave")
+    p.add_argument("--detail", type=int, default=100, help="vec_detail slider")
+    p.add_argument("--mm-per-px", type=float, default=0.1)
+    p.add_argument("--out", help="keep the exported files in this directory")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_export)
+
+    p = sub.add_parser("travel", help="laser travel before / after path ordering")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="engrave")
+    p.add_argument("--detail", type=int, default=100, help="vec_detail slider")
+    p.add_argument("--budget", type=float, default=2.0, help="seconds per image")
+    p.set_defaults(fn=bench_travel)
+
+    p = sub.add_parser("preview", help="per-segment cv2.line vs batched cv2.polylines")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="engrave")
+    p.add_argument("--detail", type=int, default=100, help="vec_detail slider")
+    p.add_argument("--scale", type=float, default=0.5, help="display zoom for the scaled run")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_preview)
+
+    p = sub.add_parser("tiles", help="tiled native-resolution render: peak memory vs budget")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="default")
+    p.add_argument("--megapixels", type=float, nargs="+", default=[12, 48],
+                   help="upscale each image to these sizes")
+    p.add_argument("--budget", type=int, default=128, help="--memory-mb of the render")
+    p.add_argument("--workers", type=int, default=None, help="tile threads (default: all cores)")
+    p.add_argument("--subject", action="store_true",
+                   help="with the subject mask (needs the U2Net model)")
+    p.set_defaults(fn=bench_tiles)
+
+    p = sub.add_parser("trace", help="tile-parallel line tracing, 1/2/4/8 workers")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="engrave")
+    p.add_argument("--detail", type=int, default=100, help="vec_detail slider")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--scale", type=float, default=2.0,
+                   help="upscale the sketch (large prints)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_trace)
+
+    p = sub.add_parser("history", help="undo memory and speed with tile deltas")
+    p.add_argument("images", nargs="*", help="images or directories (default: images/)")
+    p.add_argument("--style", choices=sorted(STYLES), default="engrave")
+    p.add_argument("--scale", type=float, default=2.0,
+                   help="upscale the sketch (large prints)")
+    p.add_argument("--steps", type=int, default=20)
+    p.add_argument("--strokes", type=int, default=30, help="eraser dabs per step")
+    p.add_argument("--brush", type=int, default=12, help="dab radius")
+    p.set_defaults(fn=bench_history)
+
+    p = sub.add_parser("brush", help="per-event circles vs queued brush strokes")
+    p.add_argument("--size", type=int, default=12, help="brush radius")
+    p.add_argument("--events", type=int, default=2000)
+    p.add_argument("--events-per-frame", type=int, default=8)
+    p.add_argument("--canvas", type=int, default=3000)
+    p.set_defaults(fn=bench_brush)
+
+    args = ap.parse_args(argv)
+    cv2.setUseOptimized(True)
+    return args.fn(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,11 +8,20 @@ class BrushTool:
     A manager hívja.
     """
 
+    # vonal pontok ritkítása: ennél közelebbi minták kimaradnak (× size)
+    SPACING = 0.25
+
+    # ennél rövidebb szakasz (× size) végére egy kör kerül (olcsóbb, mint a
+    # vastag élsimított vonal, és a körök itt még hézag nélkül fednek)
+    STAMP = 1.0
+
     def __init__(self, manager):
         self.manager = manager
         self.size = 12          # px
         self.mode_add = False   # False = töröl, True = visszafest
 
+        self._last = None       # vonás utolsó festett pontja
+
     # --------------------------------------------------
     # BEÁLLÍTÁSOK
     # --------------------------------------------------
@@ -33,15 +42,17 @@ class BrushTool:
         """
         mask: numpy uint8 (0..255)
         x,y: koordináta
+
+        Visszatérés: a módosított téglalap (x0, y0, x1, y1) vagy None
         """
 
         if mask is None:
-            return
+            return None
 
         h, w = mask.shape[:2]
 
         if x < 0 or y < 0 or x >= w or y >= h:
-            return
+            return None
 
         value = 0 if self.mode_add else 255
 
@@ -53,3 +64,84 @@ class BrushTool:
             -1,
             lineType=cv2.LINE_AA
         )
+
+        self._last = (int(x), int(y))
+        return self._rect(mask, [self._last])
+
+    # --------------------------------------------------
+    # VONÁS (több egér esemény egyszerre)
+    # --------------------------------------------------
+    def begin_stroke(self):
+        self._last = None
+
+    def apply_stroke(self, mask, points):
+        """
+        A vonás folytatása a megadott pontokon át, az előző festett
+        ponttól: a rövid szakaszok végére egy-egy kör, a hosszabbak egy
+        vastag törött vonal (cv2.polylines) →
+        gyors húzásnál sincs hézag, lassúnál nem festi újra ugyanazt a
+        foltot.
+
+        Visszatérés: a módosított téglalap vagy None
+        """
+        if mask is None or not points:
+            return None
+
+        h, w = mask.shape[:2]
+        points = [(int(x), int(y)) for x, y in points
+                  if 0 <= x < w and 0 <= y < h]
+        if not points:
+            return None
+
+        # az első pont önálló folt (kattintás)
+        rect = None
+        if self._last is None:
+            rect = self.apply(mask, *points[0])
+            points = points[1:]
+
+        # túl közeli minták kihagyása (a legutolsó pont mindig marad)
+        spacing = max(1.0, self.size * self.SPACING)
+        line = [self._last]
+        for i, (x, y) in enumerate(points):
+            px, py = line[-1]
+            if (x - px) ** 2 + (y - py) ** 2 >= spacing ** 2 or i == len(points) - 1:
+                line.append((x, y))
+
+        if line[-1] == line[0]:
+            return rect
+
+        value = 0 if self.mode_add else 255
+        r = int(self.size)
+
+        # rövid szakasz → kör a végén, hosszú szakaszok → törött vonalak
+        stamp = max(1.0, self.size * self.STAMP)
+        runs = []
+        for (ax, ay), (bx, by) in zip(line[:-1], line[1:]):
+            if (bx - ax) ** 2 + (by - ay) ** 2 <= stamp ** 2:
+                cv2.circle(mask, (bx, by), r, value, -1, lineType=cv2.LINE_AA)
+            elif runs and runs[-1][-1] == (ax, ay):
+                runs[-1].append((bx, by))
+            else:
+                runs.append([(ax, ay), (bx, by)])
+
+        if runs:
+            # vastagság 2r + 1 = a kör átmérője (-r..r)
+            cv2.polylines(
+                mask,
+                [np.array(run, np.int32) for run in runs],
+                False,
+                value,
+                2 * r + 1,
+                lineType=cv2.LINE_AA
+            )
+
+        self._last = line[-1]
+        return self._rect(mask, line, 2)
+
+    def _rect(self, mask, points, margin=1):
+        """pontok + sugár befoglaló téglalapja (+ élsimítás)"""
+        h, w = mask.shape[:2]
+        r = int(self.size) + margin
+        xs, ys = zip(*points)
+        return (max(min(xs) - r, 0), max(min(ys) - r, 0),
+                min(max(xs) + r + 1, w), min(max(ys) + r + 1, h))
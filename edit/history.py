@@ -1,12 +1,31 @@
+import zlib
+from collections import deque
+
+import numpy as np
+
+
 class History:
     """
-    Egyszerű undo / redo kezelés numpy maszkokhoz.
+    Undo / redo kezelés numpy képekhez és maszkokhoz, memória kerettel.
+
+    Veremenként csak a legfelső állapot van meg teljes tömbként, a
+    régebbiek visszafelé delták: az előző állapot eltérő csempéi,
+    zlib-bel tömörítve (ecsetvonás, törlés után a kép töredéke).
+
+    - limit: undo lépések száma
+    - budget_mb: a két verem együttes mérete, túllépéskor a legrégebbi
+      lépések esnek ki (a legutóbbi mindig megmarad)
     """
 
-    def __init__(self, limit=20):
+    def __init__(self, limit=20, budget_mb=128):
         self.limit = limit
-        self.undo_stack = []
-        self.redo_stack = []
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.undo_stack = _DeltaStack()
+        self.redo_stack = _DeltaStack()
+
+    @property
+    def nbytes(self):
+        return self.undo_stack.nbytes + self.redo_stack.nbytes
 
     # --------------------------------------------------
     # RESET
@@ -20,29 +39,33 @@ class History:
     # --------------------------------------------------
     def push(self, state):
         """
-        Új állapot mentése (művelet előtt)
+        Új állapot mentése (művelet előtt).
+        A tömb a historyé lesz → a hívó másolatot adjon át.
         """
         if state is None:
             return
 
-        self.undo_stack.append(state)
-
-        # méret limit
-        if len(self.undo_stack) > self.limit:
-            self.undo_stack.pop(0)
-
         # új művelet → redo törlődik
         self.redo_stack.clear()
 
+        self.undo_stack.push(state)
+        self._trim()
+
     # --------------------------------------------------
     # UNDO
     # --------------------------------------------------
     def undo(self, current):
+        """
+        current: az aktuális állapot, a historyé lesz
+        (a hívó a visszaadott állapottal folytatja)
+        """
         if not self.undo_stack:
             return None
 
-        self.redo_stack.append(current.copy())
-        return self.undo_stack.pop()
+        self.redo_stack.push(current)
+        state = self.undo_stack.pop()
+        self._trim()
+        return state
 
     # --------------------------------------------------
     # REDO
@@ -51,6 +74,121 @@ class History:
         if not self.redo_stack:
             return None
 
-        self.undo_stack.append(current.copy())
-        return self.redo_stack.pop()
+        self.undo_stack.push(current)
+        state = self.redo_stack.pop()
+        self._trim()
+        return state
+
+    # --------------------------------------------------
+    # MEMÓRIA KERET
+    # --------------------------------------------------
+    def _trim(self):
+        while len(self.undo_stack) > self.limit:
+            self.undo_stack.drop_oldest()
+
+        # előbb a legrégebbi undo, utána a legtávolabbi redo lépés
+        while self.nbytes > self.budget:
+            if not (self.undo_stack.drop_oldest() or self.redo_stack.drop_oldest()):
+                break
+
+
+class _DeltaStack:
+    """
+    Állapot verem: top = legutóbbi állapot (teljes tömb),
+    deltas = alatta lévő állapotok, mindegyik a felette lévőhöz képest.
+    """
+
+    TILE = 128    # delta csempe (px)
+    LEVEL = 1     # zlib szint: gyors, a rajzok nagyrészt fehérek
+
+    def __init__(self):
+        self.top = None
+        self.deltas = deque()     # régi → új
+        self.delta_bytes = 0
+
+    def __len__(self):
+        return len(self.deltas) + (self.top is not None)
+
+    @property
+    def nbytes(self):
+        top = self.top.nbytes if self.top is not None else 0
+        return top + self.delta_bytes
+
+    def clear(self):
+        self.top = None
+        self.deltas.clear()
+        self.delta_bytes = 0
+
+    def push(self, state):
+        if self.top is not None:
+            delta = self._encode(self.top, state)
+            self.deltas.append(delta)
+            self.delta_bytes += delta[-1]
+        self.top = state
+
+    def pop(self):
+        state = self.top
+        if self.deltas:
+            delta = self.deltas.pop()
+            self.delta_bytes -= delta[-1]
+            self.top = self._decode(delta, state)
+        else:
+            self.top = None
+        return state
+
+    def drop_oldest(self):
+        """legrégebbi állapot eldobása (a top marad); False ha nincs mit"""
+        if not self.deltas:
+            return False
+        self.delta_bytes -= self.deltas.popleft()[-1]
+        return True
+
+    # --------------------------------------------------
+    # DELTA: old állapot a new-hoz képest
+    # --------------------------------------------------
+    def _encode(self, old, new):
+        """
+        (shape, dtype, csempék, tömörített adat, méret)
+        csempék = None → teljes kép (más méret / típus)
+        """
+        t = self.TILE
+
+        if old.shape != new.shape or old.dtype != new.dtype:
+            data = zlib.compress(np.ascontiguousarray(old).data, self.LEVEL)
+            return old.shape, old.dtype, None, data, len(data) + 64
+
+        # csempénként: volt-e eltérés (sávonként, a sáv a cache-ben marad;
+        # a csatornák egy sorba kerülnek → csempe szélesség t * csatorna)
+        h = old.shape[0]
+        span = t * (old.shape[2] if old.ndim == 3 else 1)
+        a = old.reshape(h, -1)
+        b = new.reshape(h, -1)
+        cols = np.arange(0, a.shape[1], span)
+
+        diff = np.array([
+            np.logical_or.reduceat((a[y:y + t] != b[y:y + t]).any(axis=0), cols)
+            for y in range(0, h, t)
+        ])
+        tiles = np.argwhere(diff).astype(np.int32) * t
+
+        data = zlib.compress(
+            b"".join(old[y:y + t, x:x + t].tobytes() for y, x in tiles.tolist()),
+            self.LEVEL
+        )
+        return old.shape, old.dtype, tiles, data, len(data) + tiles.nbytes + 64
+
+    def _decode(self, delta, new):
+        shape, dtype, tiles, data, _ = delta
+        buf = np.frombuffer(zlib.decompress(data), dtype)
+
+        if tiles is None:
+            return buf.reshape(shape).copy()
 
+        t = self.TILE
+        out = new.copy()
+        pos = 0
+        for y, x in tiles.tolist():
+            block = out[y:y + t, x:x + t]
+            block[...] = buf[pos:pos + block.size].reshape(block.shape)
+            pos += block.size
+        return out
@@ -2,6 +2,7 @@ import numpy as np
 
 from .history import History
 from .brush import BrushTool
+from .stroke import StrokeTool
 
 class EditManager:
     """
@@ -11,6 +12,7 @@ class EditManager:
 
     TOOL_NONE = 0
     TOOL_BRUSH = 1
+    TOOL_STROKE = 2
 
     def __init__(self):
         self.enabled = False
@@ -20,6 +22,9 @@ class EditManager:
         self.history = History(20)    # undo stack
 
         self.brush = BrushTool(self)
+        self.stroke = StrokeTool(self)
+
+        self._pending = []            # még nem festett vonás pontok
 
     # --------------------------------------------------
     # KÉP BETÖLTÉS
@@ -70,31 +75,51 @@ class EditManager:
         if not self.enabled:
             return
         self.push_undo()
+        self._pending.clear()
+        self.brush.begin_stroke()
 
-    def apply_at(self, x, y, image):
+    def stroke_to(self, x, y):
         """
-        egér húzás / kattintás
-        image = aktuális line layer (stroke tool miatt kell)
+        vonás pont sorba állítása (egér húzás); a festés flush_stroke-kal,
+        képkockánként egyszer, az összes várakozó ponttal együtt
         """
-        if not self.enabled or self.mask is None:
-            return
+        if self.enabled and self.tool in (self.TOOL_BRUSH, self.TOOL_STROKE):
+            self._pending.append((x, y))
 
-        if self.tool == self.TOOL_BRUSH:
-            self.brush.apply(self.mask, x, y)
+    def flush_stroke(self, image=None):
+        """
+        várakozó pontok festése → módosított téglalap vagy None
+        image = aktuális line layer (stroke tool)
+        """
+        if not self._pending or self.mask is None:
+            self._pending.clear()
+            return None
+
+        points, self._pending = self._pending, []
+        if self.tool == self.TOOL_STROKE:
+            return self.stroke.apply_stroke(self.mask, image, points)
+        return self.brush.apply_stroke(self.mask, points)
 
     # --------------------------------------------------
     # ALKALMAZÁS A VÉGEREDMÉNYRE
     # --------------------------------------------------
-    def apply_to(self, sketch):
+    def apply_to(self, sketch, rect=None):
         """
         A felhasználói maszk rákerül a kész rajzra.
         mask:
             0 = nincs változás
             255 = törlés (fehérítés)
+
+        rect = (x0, y0, x1, y1): csak ez a kivágás (ecset húzás közben)
         """
+        if rect is not None:
+            x0, y0, x1, y1 = rect
+            sketch = sketch[y0:y1, x0:x1]
+
         if self.mask is None:
-            return sketch
+            return sketch if rect is None else sketch.copy()
 
+        mask = self.mask if rect is None else self.mask[y0:y1, x0:x1]
         result = sketch.copy()
-        result[self.mask > 0] = 255
+        result[mask > 0] = 255
         return result
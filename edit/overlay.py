@@ -1,5 +1,4 @@
 import cv2
-import numpy as np
 
 
 class EditOverlay:
@@ -8,11 +7,19 @@ class EditOverlay:
     Nem módosítja a forrás rajzot.
     """
 
+    # hover kiemelés színe és erőssége
+    HOVER_COLOR = (0, 80, 255)
+    HOVER_ALPHA = 0.45
+
     def __init__(self, manager):
         self.manager = manager
         self.cursor_pos = None
         self.show_hover = True
 
+        # legutóbb kirajzolt ecset kör / hover kiemelés téglalapja
+        # (ennyit kell letörölni)
+        self._drawn = None
+
     # --------------------------------------------------
     # KURZOR HELYZET
     # --------------------------------------------------
@@ -22,13 +29,47 @@ class EditOverlay:
     def clear_cursor(self):
         self.cursor_pos = None
 
+    def _cursor_rect(self, line_layer=None):
+        """
+        a kurzor rajzolata (vágás nélkül): ecset kör, vagy a hover alatti
+        vonal befoglaló téglalapja; None ha nincs
+        """
+        if self.cursor_pos is None or not self.manager.enabled:
+            return None
+
+        x, y = self.cursor_pos
+        if self.manager.tool == self.manager.TOOL_BRUSH:
+            r = self.manager.brush.size + 2    # vonal + élsimítás
+            return x - r, y - r, x + r + 1, y + r + 1
+
+        if self.manager.tool == self.manager.TOOL_STROKE and self.show_hover:
+            hit = self.manager.stroke.component_at(line_layer, x, y)
+            return hit[1] if hit else None
+
+        return None
+
+    def dirty_rect(self, shape, line_layer=None):
+        """
+        Ami a kurzor miatt újrarajzolandó (x0, y0, x1, y1): a legutóbb
+        kirajzolt és az új kurzor rajzolat együtt, vagy None
+        """
+        rects = [r for r in (self._drawn, self._cursor_rect(line_layer)) if r is not None]
+        if not rects:
+            return None
+
+        h, w = shape[:2]
+        x0, y0, x1, y1 = zip(*rects)
+        rect = (max(min(x0), 0), max(min(y0), 0), min(max(x1), w), min(max(y1), h))
+        return rect if rect[0] < rect[2] and rect[1] < rect[3] else None
+
     # --------------------------------------------------
     # MEGJELENÍTÉS
     # --------------------------------------------------
-    def render(self, image, line_layer=None):
+    def render(self, image, line_layer=None, origin=(0, 0)):
         """
         image      : megjelenítendő rajz (grayscale vagy BGR)
         line_layer : stroke tool-hoz szükséges (hover preview)
+        origin     : ha image csak egy kivágás, annak bal felső sarka
         """
 
         if image is None:
@@ -40,35 +81,45 @@ class EditOverlay:
         else:
             view = image.copy()
 
+        self._drawn = self._cursor_rect(line_layer)
+
         if not self.manager.enabled or self.cursor_pos is None:
             return view
 
         x, y = self.cursor_pos
+        ox, oy = origin
 
         # --------------------------------------------------
         # BRUSH PREVIEW
         # --------------------------------------------------
         if self.manager.tool == self.manager.TOOL_BRUSH:
             r = self.manager.brush.size
-            cv2.circle(view, (x, y), r, (0, 200, 255), 1, cv2.LINE_AA)
+            cv2.circle(view, (x - ox, y - oy), r, (0, 200, 255), 1, cv2.LINE_AA)
 
         # --------------------------------------------------
         # STROKE HOVER PREVIEW
         # --------------------------------------------------
-        elif self.manager.tool == self.manager.TOOL_STROKE and line_layer is not None:
+        elif self.manager.tool == self.manager.TOOL_STROKE and self.show_hover:
 
-            if 0 <= y < line_layer.shape[0] and 0 <= x < line_layer.shape[1]:
+            hit = self.manager.stroke.component_at(line_layer, x, y)
+            if hit is not None:
+                label_id, (x0, y0, x1, y1) = hit
+                labels, _ = self.manager.stroke.components(line_layer)
 
-                binary = (line_layer < 128).astype(np.uint8)
-                num, labels = cv2.connectedComponents(binary)
-                label_id = labels[y, x]
+                # csak a komponens téglalapja (a kép többi része változatlan),
+                # a kivágással metszve
+                x1 = min(x1, ox + view.shape[1])
+                y1 = min(y1, oy + view.shape[0])
+                x0, y0 = max(x0, ox), max(y0, oy)
 
-                if label_id != 0:
-                    component = (labels == label_id)
+                if x0 < x1 and y0 < y1:
+                    roi = view[y0 - oy:y1 - oy, x0 - ox:x1 - ox]
+                    component = labels[y0:y1, x0:x1] == label_id
 
                     # halvány piros overlay
-                    overlay = view.copy()
-                    overlay[component] = (0, 80, 255)
-                    view = cv2.addWeighted(overlay, 0.45, view, 0.55, 0)
+                    overlay = roi.copy()
+                    overlay[component] = self.HOVER_COLOR
+                    cv2.addWeighted(overlay, self.HOVER_ALPHA, roi,
+                                    1 - self.HOVER_ALPHA, 0, dst=roi)
 
         return view
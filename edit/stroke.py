@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+
+
+class StrokeTool:
+    """
+    Egész vonal törlése kattintással (8 szomszédos összefüggő komponens).
+    A manager hívja, a hover kiemeléshez az overlay is ezt használja.
+    """
+
+    # tinta küszöb (mint a vektorizálónál)
+    INK = 200
+
+    def __init__(self, manager):
+        self.manager = manager
+
+        # komponens címkék a line layerhez (layerenként egyszer)
+        self._layer = None
+        self._labels = None
+        self._stats = None
+
+    # --------------------------------------------------
+    # KOMPONENS INDEX
+    # --------------------------------------------------
+    def invalidate(self):
+        """helyben módosított line layer után"""
+        self._layer = None
+        self._labels = None
+        self._stats = None
+
+    def components(self, line_layer):
+        """
+        Címkék + befoglaló téglalapok, csak új line layernél számolva.
+        A rajz minden módosításkor új tömb → az azonosság a verzió.
+        """
+        if line_layer is not self._layer:
+            gray = line_layer
+            if gray.ndim == 3:
+                gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+            binary = (gray < self.INK).astype(np.uint8)
+            _, self._labels, self._stats, _ = cv2.connectedComponentsWithStats(binary)
+            self._layer = line_layer
+
+        return self._labels, self._stats
+
+    def component_at(self, line_layer, x, y):
+        """
+        A (x, y) alatti vonal: (címke, (x0, y0, x1, y1)) vagy None
+        """
+        if line_layer is None:
+            return None
+        if not (0 <= y < line_layer.shape[0] and 0 <= x < line_layer.shape[1]):
+            return None
+
+        # már kitörölt vonal (a maszk még nincs a rajzon)
+        mask = self.manager.mask
+        if mask is not None and mask.shape == line_layer.shape[:2] and mask[y, x]:
+            return None
+
+        labels, stats = self.components(line_layer)
+        label_id = int(labels[y, x])
+        if label_id == 0:
+            return None
+
+        x0, y0, w, h = stats[label_id, :4].tolist()
+        return label_id, (x0, y0, x0 + w, y0 + h)
+
+    # --------------------------------------------------
+    # TÖRLÉS
+    # --------------------------------------------------
+    def apply_stroke(self, mask, line_layer, points):
+        """
+        A pontok alatti vonalak törlése a maszkban.
+
+        Visszatérés: a módosított téglalap vagy None
+        """
+        if mask is None or line_layer is None:
+            return None
+
+        rects = []
+        done = set()
+        for x, y in points:
+            hit = self.component_at(line_layer, int(x), int(y))
+            if hit is None or hit[0] in done:
+                continue
+
+            label_id, (x0, y0, x1, y1) = hit
+            done.add(label_id)
+            mask[y0:y1, x0:x1][self._labels[y0:y1, x0:x1] == label_id] = 255
+            rects.append((x0, y0, x1, y1))
+
+        if not rects:
+            return None
+
+        x0, y0, x1, y1 = zip(*rects)
+        return min(x0), min(y0), max(x1), max(y1)
@@ -0,0 +1,204 @@
+"""
+Vektoros export: SVG, DXF (R12 POLYLINE / VERTEX), G-code.
+
+Bemenet: PathSet (pixel koordináták) + a kép mérete.
+mm_per_px: egy pixel mérete mm-ben (0.1 → 10 px / mm).
+
+A fájl darabokban íródik (CHUNK útvonalanként), a teljes dokumentum
+nem épül fel a memóriában. A koordináták egész pixelek, ezért
+soronként / oszloponként egyszer formázódnak (táblázat), pontonként
+csak összefűzés történik → több százezer pont is < 1 s.
+
+SVG: y lefelé (mint a kép), DXF / G-code: y felfelé, origó bal alul.
+"""
+from pathlib import Path
+
+from path_set import PathSet
+
+CHUNK = 2000
+
+GCODE_FEED = 1500     # mm/perc
+GCODE_POWER = 1000    # S érték (GRBL: 0..1000)
+
+
+def _fmt(v):
+    s = f"{v:.3f}".rstrip("0").rstrip(".")
+    return "0" if s in ("", "-0") else s
+
+
+def _table(size, mm, prefix="", suffix="", flip=None):
+    """pixel → formázott mm szöveg (flip: y tükrözés ekkora magasságra)"""
+    if flip is None:
+        return [f"{prefix}{_fmt(i * mm)}{suffix}" for i in range(size)]
+    return [f"{prefix}{_fmt((flip - i) * mm)}{suffix}" for i in range(size)]
+
+
+def _tokens(path, tx, ty):
+    """pontonkénti szöveg: tx[x] + ty[y]"""
+    return map(str.__add__, map(tx.__getitem__, path[:, 0].tolist()),
+               map(ty.__getitem__, path[:, 1].tolist()))
+
+
+def _chunks(paths):
+    for start in range(0, len(paths), CHUNK):
+        yield range(start, min(start + CHUNK, len(paths)))
+
+
+def _table_size(paths, shape):
+    h, w = shape[:2]
+    if paths.total_points:
+        w = max(w, int(paths.points[:, 0].max()) + 1)
+        h = max(h, int(paths.points[:, 1].max()) + 1)
+    return w, h
+
+
+def _as_pathset(paths):
+    return paths if isinstance(paths, PathSet) else PathSet.from_paths(paths)
+
+
+# ---------------------------------------------------------
+# SVG
+# ---------------------------------------------------------
+def write_svg(f, paths, shape, mm_per_px=0.1, stroke_mm=None):
+    paths = _as_pathset(paths)
+    h, w = shape[:2]
+    tw, th = _table_size(paths, shape)
+
+    if stroke_mm is None:
+        stroke_mm = mm_per_px
+
+    width, height = _fmt(w * mm_per_px), _fmt(h * mm_per_px)
+    f.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}mm" height="{height}mm" '
+        f'viewBox="0 0 {width} {height}">\n'
+        f'<g fill="none" stroke="#000" stroke-width="{_fmt(stroke_mm)}" '
+        'stroke-linecap="round" stroke-linejoin="round">\n'
+    )
+
+    tx = _table(tw, mm_per_px, suffix=",")
+    ty = _table(th, mm_per_px, suffix=" ")
+
+    for chunk in _chunks(paths):
+        lines = []
+        for i in chunk:
+            p = paths[i]
+            if len(p) < 2:
+                continue
+            lines.append('<polyline points="%s"/>\n' % "".join(_tokens(p, tx, ty))[:-1])
+        f.write("".join(lines))
+
+    f.write("</g>\n</svg>\n")
+
+
+# ---------------------------------------------------------
+# DXF (R12: HEADER + ENTITIES, POLYLINE / VERTEX / SEQEND)
+# ---------------------------------------------------------
+def write_dxf(f, paths, shape, mm_per_px=0.1, layer="SKETCH"):
+    """
+    AutoCAD R12 (AC1009) formátum: ennél a verziónál a HEADER + ENTITIES
+    szakasz elég, handle-ök és AcDb alosztály jelölők nélkül is érvényes
+    (az LWPOLYLINE R2000-es entitás, ahhoz teljes fájl szerkezet kellene).
+    """
+    paths = _as_pathset(paths)
+    h = shape[0]
+    tw, th = _table_size(paths, shape)
+
+    # $INSUNITS 4 = mm (R12 olvasók figyelmen kívül hagyják)
+    f.write("0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n"
+            "9\n$INSUNITS\n70\n4\n0\nENDSEC\n"
+            "0\nSECTION\n2\nENTITIES\n")
+
+    tx = _table(tw, mm_per_px, prefix=f"0\nVERTEX\n8\n{layer}\n10\n", suffix="\n")
+    ty = _table(th, mm_per_px, prefix="20\n", suffix="\n", flip=h)
+    seqend = f"0\nSEQEND\n8\n{layer}\n"
+
+    counts = paths.counts().tolist()
+    closed = paths.closed().tolist()
+
+    for chunk in _chunks(paths):
+        parts = []
+        for i in chunk:
+            if counts[i] < 2:
+                continue
+
+            p = paths[i]
+            # zárt útvonal: flag 1, az ismételt végpont nélkül
+            if closed[i]:
+                p = p[:-1]
+
+            # 66 1: csúcspontok következnek; 10/20/30: kötelező (üres) pont
+            parts.append(f"0\nPOLYLINE\n8\n{layer}\n66\n1\n10\n0\n20\n0\n30\n0\n"
+                         f"70\n{int(closed[i])}\n")
+            parts.extend(_tokens(p, tx, ty))
+            parts.append(seqend)
+        f.write("".join(parts))
+
+    f.write("0\nENDSEC\n0\nEOF\n")
+
+
+# ---------------------------------------------------------
+# G-code (GRBL lézer)
+# ---------------------------------------------------------
+def write_gcode(f, paths, shape, mm_per_px=0.1, feed=GCODE_FEED, power=GCODE_POWER):
+    """
+    Útvonalanként: G0 a kezdőpontra (S0), G1 a többi pontra S power
+    teljesítménnyel. M4 dinamikus lézer mód, a végén M5.
+    """
+    paths = _as_pathset(paths)
+    h = shape[0]
+    tw, th = _table_size(paths, shape)
+
+    f.write(
+        "; LaserBase Sketch\n"
+        f"; {len(paths)} paths, {_fmt(shape[1] * mm_per_px)} x {_fmt(h * mm_per_px)} mm\n"
+        "G21\nG90\nM4 S0\n"
+    )
+
+    gx = _table(tw, mm_per_px, prefix="X")
+    gy = _table(th, mm_per_px, prefix=" Y", suffix="\n", flip=h)
+    g1 = [f"G1 {s}" for s in gx]
+
+    counts = paths.counts().tolist()
+    cut = f" S{_fmt(power)} F{_fmt(feed)}\n"
+
+    for chunk in _chunks(paths):
+        parts = []
+        for i in chunk:
+            if counts[i] < 2:
+                continue
+
+            p = paths[i]
+            x, y = p[0].tolist()
+            parts.append(f"G0 {gx[x]}{gy[y][:-1]} S0\n")
+
+            # első vágó mozgás: teljesítmény + előtolás (modális)
+            x, y = p[1].tolist()
+            parts.append(f"G1 {gx[x]}{gy[y][:-1]}{cut}")
+            parts.extend(_tokens(p[2:], g1, gy))
+        f.write("".join(parts))
+
+    f.write("M5\nG0 X0 Y0\n")
+
+
+# ---------------------------------------------------------
+# PUBLIC
+# ---------------------------------------------------------
+FORMATS = {
+    ".svg": write_svg,
+    ".dxf": write_dxf,
+    ".gcode": write_gcode,
+    ".nc": write_gcode,
+}
+
+
+def export_paths(filename, paths, shape, mm_per_px=0.1, **options):
+    """Formátum a kiterjesztésből (FORMATS)"""
+    filename = Path(filename)
+    writer = FORMATS.get(filename.suffix.lower())
+    if writer is None:
+        raise ValueError(f"unsupported export format: {filename.suffix}")
+
+    with open(filename, "w", encoding="utf-8", newline="\n",
+              buffering=1 << 20) as f:
+        writer(f, paths, shape, mm_per_px, **options)
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from fast_blur import gaussian_blur
+
+
+class FeatureBundle:
+    """
+    Egy szürke képhez tartozó, lustán számolt és megjegyzett jellemzők:
+    gradiensek, magnitúdó, irány, Laplace, blur szintek, bilateral.
+
+    Így a line_sketch / tone_sketch és a stílusok nem számolják újra
+    ugyanazt a Sobel / Laplace / blur térképet.
+
+    A visszaadott tömbök csak olvashatók (a cache-ben maradnak).
+    """
+
+    def __init__(self, gray):
+        self.gray = gray
+        self._memo = {}
+        self._slots = {}
+
+    # --------------------------------------------------
+    # MEMO
+    # --------------------------------------------------
+    def memo(self, key, fn):
+        """Paraméterfüggetlen érték: egyszer számolódik"""
+        if key not in self._memo:
+            self._memo[key] = _freeze(fn())
+        return self._memo[key]
+
+    def slot(self, name, param, fn):
+        """
+        Paraméterfüggő érték (pl. detail szerinti blur): csak a
+        legutóbbi paraméter eredménye marad meg, így csúszka húzásnál
+        nem nő a memória.
+        """
+        cached = self._slots.get(name)
+        if cached is not None and cached[0] == param:
+            return cached[1]
+
+        value = _freeze(fn())
+        self._slots[name] = (param, value)
+        return value
+
+    @property
+    def nbytes(self):
+        total = 0
+        for value in self._memo.values():
+            total += _nbytes(value)
+        for _, value in self._slots.values():
+            total += _nbytes(value)
+        return total
+
+    # --------------------------------------------------
+    # BLUR SZINTEK
+    # --------------------------------------------------
+    def blur(self, sigma):
+        """GaussianBlur (0, 0) sigma (nagy sigmánál piramis közelítés)"""
+        return self.memo(
+            ("blur", sigma),
+            lambda: gaussian_blur(self.gray, (0, 0), sigma)
+        )
+
+    def gauss(self, ksize):
+        """GaussianBlur (k, k) automatikus sigmával"""
+        return self.memo(
+            ("gauss", ksize),
+            lambda: cv2.GaussianBlur(self.gray, (ksize, ksize), 0)
+        )
+
+    def bilateral(self, d, sigma_color, sigma_space):
+        return self.memo(
+            ("bilateral", d, sigma_color, sigma_space),
+            lambda: cv2.bilateralFilter(self.gray, d, sigma_color, sigma_space)
+        )
+
+    # --------------------------------------------------
+    # GRADIENSEK
+    # --------------------------------------------------
+    def sobel(self, k):
+        """(gx, gy) float32"""
+        return self.memo(
+            ("sobel", k),
+            lambda: (
+                cv2.Sobel(self.gray, cv2.CV_32F, 1, 0, ksize=k),
+                cv2.Sobel(self.gray, cv2.CV_32F, 0, 1, ksize=k),
+            )
+        )
+
+    def magnitude(self, k):
+        return self.memo(("magnitude", k), lambda: cv2.magnitude(*self.sobel(k)))
+
+    def orientation(self, k):
+        """gradiens irány radiánban"""
+        return self.memo(
+            ("orientation", k),
+            lambda: cv2.phase(*self.sobel(k), angleInDegrees=False)
+        )
+
+    def laplacian(self):
+        """|Laplace| uint8 (convertScaleAbs)"""
+        return self.memo(
+            ("laplacian",),
+            lambda: cv2.convertScaleAbs(cv2.Laplacian(self.gray, cv2.CV_32F))
+        )
+
+
+class FeatureRegistry:
+    """
+    Képenkénti FeatureBundle-ök, a tömb azonossága alapján.
+    A stílusok egymásnak adják a köztes képeket (pl. bilateral → line_sketch),
+    ezek a memo miatt ugyanazok az objektumok maradnak.
+
+    Bájt keret szerinti LRU: a legrégebben használt csomag esik ki.
+    """
+
+    def __init__(self, budget_mb=512):
+        self.budget = int(budget_mb) * 1024 * 1024
+        self._bundles = OrderedDict()
+
+    def clear(self):
+        self._bundles.clear()
+
+    def get(self, img):
+        key = id(img)
+        bundle = self._bundles.get(key)
+
+        # a bejegyzés a képre is hivatkozik → az id nem lehet újrahasznosítva
+        if bundle is not None and bundle.gray is img:
+            self._bundles.move_to_end(key)
+            return bundle
+
+        bundle = FeatureBundle(img)
+
+        if self.budget <= 0:
+            return bundle
+
+        self._bundles[key] = bundle
+        self._trim()
+        return bundle
+
+    def _trim(self):
+        total = sum(b.nbytes for b in self._bundles.values())
+
+        while total > self.budget and len(self._bundles) > 1:
+            _, old = self._bundles.popitem(last=False)
+            total -= old.nbytes
+
+
+# ---------------------------------------------------------
+# SEGÉD
+# ---------------------------------------------------------
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, tuple):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return 0
@@ -1,21 +1,66 @@
 import cv2
 import numpy as np
 
+from fast_blur import gaussian_blur
+from features import FeatureBundle, FeatureRegistry
+from mask_cache import MaskCache
+from point_ops import PointOp
 from styles.default import DefaultStyle
+from tile_renderer import TiledRenderer
+
+
+class RenderCancelled(Exception):
+    """A render megszakadt (újabb kérés érkezett közben)"""
+
+
+class StageCache:
+    """
+    Feldolgozási lépések eredményeinek cache-e.
+
+    Minden lépés egy slotot kap: (kulcs, eredmény).
+    A kulcs a lépés összes bemenete (a felette lévő lépés kulcsával együtt),
+    így egy csúszka csak a tőle lefelé lévő lépéseket futtatja újra.
+    """
+
+    def __init__(self):
+        self._slots = {}
+
+    def clear(self):
+        self._slots.clear()
+
+    def run(self, name, key, fn, cancel=None):
+        # megszakítási pont minden lépés előtt
+        if cancel is not None and cancel():
+            raise RenderCancelled()
+
+        slot = self._slots.get(name)
+        if slot is not None and slot[0] == key:
+            return slot[1]
+
+        value = fn()
+        self._slots[name] = (key, value)
+        return value
 
 
 class ImageProcessor:
 
-    def __init__(self, model_manager=None):
+    def __init__(self, model_manager=None, mask_cache=None):
         self.models = model_manager
         self.active_model = None
 
-        # cache az AI maszkhoz
-        self._cached_mask = None
-        self._cached_mask_img = None
+        # cache az AI maszkhoz (képek között is, tartalom szerint)
+        self.mask_cache = mask_cache if mask_cache is not None else MaskCache()
 
         # aktuális kép (crop után)
         self._current_image = None
+        self._image_version = 0
+
+        # lépésenkénti eredmény cache (resize → ... → mask)
+        # felbontási szintenként külön (proxy előnézet / teljes render)
+        self._stages = {}
+
+        # képenként megjegyzett gradiens / blur / Laplace térképek
+        self.feature_registry = FeatureRegistry()
 
         # aktív rajz stílus
         self.style = DefaultStyle(self)
@@ -23,13 +68,20 @@ class ImageProcessor:
         # last line layer for edit system
         self.last_line = None
 
+        # csempés renderhez: a blur méretek a teljes képhez igazodnak,
+        # a globális normalizálások rögzítve / visszajátszva futnak
+        self.ref_shape = None
+        self._stats_record = None
+        self._stats_replay = None
+
     # --------------------------------------------------------
     # KÉP BETÖLTÉS (CACHE RESET)
     # --------------------------------------------------------
     def set_image(self, img):
         """Új kép beállítása – cache törlése"""
-        self._cached_mask = None
-        self._cached_mask_img = None
+        self._image_version += 1
+        self._stages.clear()
+        self.feature_registry.clear()
 
         if img is not None:
             self._current_image = self.auto_crop(img)
@@ -87,37 +139,104 @@ class ImageProcessor:
         resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
         return resized, scale
 
-    # --------------------------------------------------------
-    # GYORS KÉP AZONOSÍTÓ
-    # --------------------------------------------------------
-    def _img_id(self, img):
-        h, w = img.shape[:2]
-        step_h = max(h // 4, 1)
-        step_w = max(w // 4, 1)
-        sample = img[::step_h, ::step_w]
-        return hash(sample.tobytes())
-
     # --------------------------------------------------------
     # AI MASZK (U2Net)
     # --------------------------------------------------------
+    # egy session.run-ban ennyi kép (ha a modell batch mérete nem rögzített)
+    MASK_BATCH = 8
+
     def ai_mask(self, img):
-        session = self.models.get(self.active_model) if self.models else None
-        if session is None:
-            return None
+        return self.ai_masks([img])[0]
+
+    def ai_masks(self, imgs, batch_size=None):
+        """
+        Több kép maszkja kötegelt futtatással.
+        Visszatérés: maszkok listája (float32, a képek saját méretén),
+        None ahol nincs modell.
+        """
+        if self.models is None or self.active_model is None:
+            return [None] * len(imgs)
+
+        smalls = [cv2.resize(img, (320, 320)) for img in imgs]
+
+        # találatnál a session sem kell (újranyitott kép / batch újrafuttatás)
+        model_id = self.models.variant_id(self.active_model)
+        keys = [
+            self.mask_cache.key(small, model_id, img.shape)
+            for small, img in zip(smalls, imgs)
+        ]
+        preds = [self.mask_cache.get(key) for key in keys]
+        todo = [i for i, pred in enumerate(preds) if pred is None]
+
+        if todo:
+            session = self.models.get(self.active_model)
+
+            if session is not None:
+                batch = np.stack([smalls[i] for i in todo])
+                out = self._u2net(session, batch, batch_size or self.MASK_BATCH)
+
+                for i, pred in zip(todo, out):
+                    preds[i] = pred
+                    self.mask_cache.put(keys[i], pred)
+
+        masks = []
+        for pred, img in zip(preds, imgs):
+            if pred is None:
+                masks.append(None)
+                continue
+
+            h, w = img.shape[:2]
+            pred = cv2.resize(pred, (w, h))
+            pred = cv2.normalize(pred, None, 0, 1, cv2.NORM_MINMAX)
+            masks.append(pred.astype(np.float32))
+
+        return masks
+
+    def _u2net(self, session, batch, batch_size):
+        """
+        batch: N×320×320×3 uint8 → N×320×320 float32 predikció.
+        Rögzített batch dimenziójú modellnél annyi képes mikro-kötegek
+        (az utolsó nullákkal kitöltve).
+        """
+        inp_meta = session.get_inputs()[0]
+
+        fixed = inp_meta.shape[0]
+        if isinstance(fixed, int) and fixed > 0:
+            batch_size = fixed
+        else:
+            fixed = None
 
-        h, w = img.shape[:2]
+        preds = []
+        for start in range(0, len(batch), batch_size):
+            chunk = batch[start:start + batch_size]
+            n = len(chunk)
+
+            # NCHW, 0..1 (egyetlen vektorizált konverzió)
+            inp = chunk.astype(np.float32) / 255.0
+            inp = np.ascontiguousarray(inp.transpose(0, 3, 1, 2))
+
+            if fixed is not None and n < fixed:
+                pad = np.zeros((fixed - n,) + inp.shape[1:], np.float32)
+                inp = np.concatenate([inp, pad])
 
-        small = cv2.resize(img, (320, 320))
-        inp = small.astype(np.float32) / 255.0
-        inp = np.transpose(inp, (2, 0, 1))[np.newaxis, :, :, :]
+            out = session.run(None, {inp_meta.name: inp})[0]
+            preds.extend(out[:n, 0])
 
-        input_name = session.get_inputs()[0].name
-        pred = session.run(None, {input_name: inp})[0][0][0]
+        return preds
 
-        pred = cv2.resize(pred, (w, h))
-        pred = cv2.normalize(pred, None, 0, 1, cv2.NORM_MINMAX)
+    def prefetch_masks(self, imgs, max_side=1600, batch_size=None):
+        """
+        Képsor maszkjai előre, kötegelten → a process() hívások már a
+        cache-ből kapják (ugyanaz a crop + resize, mint a process()-ben).
+        """
+        if self.models is None or self.active_model != "Téma kiemelés":
+            return
 
-        return pred.astype(np.float32)
+        proc_imgs = [
+            self._resize_for_processing(self.auto_crop(img), max_side)[0]
+            for img in imgs
+        ]
+        self.ai_masks(proc_imgs, batch_size)
 
     # --------------------------------------------------------
     # HÁTTÉR MASZK ALKALMAZÁS (eredeti működés)
@@ -142,7 +261,11 @@ class ImageProcessor:
     # --------------------------------------------------------
     # ELŐKÉSZÍTÉS
     # --------------------------------------------------------
-    def auto_prep(self, img, clean=0):
+    def auto_prep(self, img, clean=0, mask=None):
+        """
+        mask: kívülről adott AI maszk (csempés render), különben
+              az aktív modellből számolódik
+        """
 
         # clean slider paraméter (jelenleg kompatibilitás miatt)
         _ = clean
@@ -152,22 +275,18 @@ class ImageProcessor:
         else:
             gray = img.copy()
 
-        if self.active_model == "Téma kiemelés":
-
-            img_id = (self._img_id(img), img.shape[1], img.shape[0])
-
-            if self._cached_mask_img != img_id:
-                self._cached_mask = self.ai_mask(img)
-                self._cached_mask_img = img_id
-
-            mask = self._cached_mask
+        if mask is None and self.active_model == "Téma kiemelés":
+            mask = self.ai_mask(img)
 
-            if mask is not None:
-                background = cv2.GaussianBlur(gray, (0, 0), 5)
-                gray = (gray * mask + background * (1 - mask)).astype(np.uint8)
+        if mask is not None:
+            background = cv2.GaussianBlur(gray, (0, 0), 5)
+            gray = (gray * mask + background * (1 - mask)).astype(np.uint8)
 
         # --- TONE RECONSTRUCTION (csak lapos képre) ---
-        if gray.std() < (18 + 0.01 * gray.mean()):
+        flat = self._global_stat(
+            lambda: bool(gray.std() < (18 + 0.01 * gray.mean()))
+        )
+        if flat:
             gray = self.reconstruct_tone(gray)
 
         return gray
@@ -175,10 +294,10 @@ class ImageProcessor:
     def reconstruct_tone(self, gray):
 
         # 1. Nagyléptékű fény (forma)
-        large = cv2.GaussianBlur(gray, (0,0), 35)
+        large = gaussian_blur(gray, (0,0), 35)
 
         # 2. Közép léptékű árnyék
-        medium = cv2.GaussianBlur(gray, (0,0), 9)
+        medium = gaussian_blur(gray, (0,0), 9)
 
         # 3. Textúra eltávolítás
         detail = cv2.subtract(medium, large)
@@ -187,189 +306,374 @@ class ImageProcessor:
         tone = cv2.addWeighted(large, 1.2, detail, 0.6, 0)
 
         # 5. Normalizálás
-        tone = cv2.normalize(tone, None, 0, 255, cv2.NORM_MINMAX)
+        tone = self._normalize(tone, 0, 255)
 
         return tone.astype(np.uint8)
 
     # --------------------------------------------------------
     # TÓNUS RAJZ (méretfüggetlen blur)
     # --------------------------------------------------------
-    def tone_sketch(self, img, detail=50, strength=50):
+    # tónus gamma: az eredeti float32 np.power helyett tábla
+    TONE_GAMMA = PointOp.gamma(1.35)
+    TONE_GAMMA_INV = TONE_GAMMA.then(PointOp.invert())
 
-        gray = img.copy()
+    def tone_sketch(self, img, detail=50, strength=50, post=None):
+        """
+        post: opcionális PointOp, ami a kimeneti kontraszt / csonkolás
+              táblájába fűződik (pl. tónus kvantálás) → egy LUT menet
+        """
 
-        g = gray.astype(np.float32) / 255.0
-        g = np.power(g, 1.35)
-        gray = (g * 255).astype(np.uint8)
+        fb = self.features(img)
 
-        inv = 255 - gray
+        # gamma + inverz (paraméterfüggetlen)
+        gray, inv = fb.memo(("tone_gamma",), lambda: self._tone_gamma(img))
 
         # --- FELBONTÁSFÜGGŐ BLUR MÉRET ---
-        h, w = gray.shape[:2]
-        diag = (h * h + w * w) ** 0.5
-        scale = diag / 1500.0  # referencia méret ~1.5MP
+        blur_size = self._tone_blur_size(self.ref_shape or gray.shape, detail)
 
-        blur_size = int((15 + (100 - detail) * 0.6) * scale)
-        blur_size = max(3, blur_size)
-        if blur_size % 2 == 0:
-            blur_size += 1
+        # dodge (csak a detail-től függ → vonalvastagság csúszkánál nem fut újra)
+        sketch = fb.slot(
+            "tone_dodge", blur_size,
+            lambda: self._tone_dodge(gray, inv, blur_size)
+        )
 
-        blur = cv2.GaussianBlur(inv, (blur_size, blur_size), 0)
+        # kontraszt + csonkolás (+ post) egyetlen LUT menetben
+        alpha = 1.0 + strength / 40.0
+        ops = PointOp.linear(alpha, -20).then(PointOp.trunc(240))
+
+        if post is not None:
+            ops = ops.then(post)
+
+        return ops.apply(sketch)
+
+    def _tone_gamma(self, img):
+        gray = self.TONE_GAMMA.apply(img)
+        inv = self.TONE_GAMMA_INV.apply(img)
+        return gray, inv
+
+    def _tone_dodge(self, gray, inv, blur_size):
+        blur = gaussian_blur(inv, (blur_size, blur_size), 0)
 
         denom = 255 - blur
         denom = np.maximum(denom, 8)
         sketch = (gray.astype(np.float32) / denom.astype(np.float32)) * 256.0
-        sketch = np.clip(sketch, 0, 255).astype(np.uint8)
+        return np.clip(sketch, 0, 255).astype(np.uint8)
 
-        alpha = 1.0 + strength / 40.0
-        sketch = cv2.convertScaleAbs(sketch, alpha=alpha, beta=-20)
+    def _tone_blur_size(self, shape, detail):
+        h, w = shape[:2]
+        diag = (h * h + w * w) ** 0.5
+        scale = diag / 1500.0  # referencia méret ~1.5MP
 
-        _, sketch = cv2.threshold(sketch, 240, 255, cv2.THRESH_TRUNC)
+        blur_size = int((15 + (100 - detail) * 0.6) * scale)
+        blur_size = max(3, blur_size)
+        if blur_size % 2 == 0:
+            blur_size += 1
 
-        return sketch
+        return blur_size
 
     # --------------------------------------------------------
     # VONAL RAJZ
     # --------------------------------------------------------
     def line_sketch(self, img, detail=50, strength=50):
 
-        gray = img.copy()
+        fb = self.features(img)
 
-        light = cv2.GaussianBlur(gray, (0, 0), 25)
-        norm = cv2.divide(gray, light, scale=255)
+        # gradiens alapú él erősség (paraméterfüggetlen)
+        mag = fb.memo(("line_mag",), lambda: self._line_magnitude(fb))
 
-        def sobel_mag(src, k):
-            gx = cv2.Sobel(src, cv2.CV_32F, 1, 0, ksize=k)
-            gy = cv2.Sobel(src, cv2.CV_32F, 0, 1, ksize=k)
-            return cv2.magnitude(gx, gy)
+        # detail függő simítás + lokális kontraszt
+        blur = int(3 + (100 - detail) / 18) | 1
+        mag, local_var = fb.slot(
+            "line_var", blur,
+            lambda: self._line_variance(mag, blur)
+        )
 
-        mag_small = sobel_mag(norm, 3)
-        mag_mid = sobel_mag(norm, 5)
-        mag_big = sobel_mag(norm, 9)
+        base_t = 140 - detail * 0.9
+        T = base_t + (local_var * 60)
+
+        bw = (mag > T).astype(np.uint8) * 255
+        bw = 255 - bw
 
-        mag = 0.5 * mag_small + 0.35 * mag_mid + 0.15 * mag_big
-     
-        gx = cv2.Sobel(norm, cv2.CV_32F, 1, 0, ksize=3)
-        gy = cv2.Sobel(norm, cv2.CV_32F, 0, 1, ksize=3)
-        angle = cv2.phase(gx, gy, angleInDegrees=False)
+        thickness = 1 + int(strength / 12)
+        kernel = np.ones((thickness, thickness), np.uint8)
+        bw = cv2.dilate(bw, kernel, iterations=1)
+
+        self.last_line = bw.copy()
+        return bw
+
+    def _line_magnitude(self, fb):
+
+        light = fb.blur(25)
+        norm = cv2.divide(fb.gray, light, scale=255)
+
+        # a normalizált kép csak itt kell → nem kerül a registry-be,
+        # de a k=3 Sobel a magnitúdóhoz és az irányhoz közös
+        nb = FeatureBundle(norm)
+
+        mag = (
+            0.5 * nb.magnitude(3)
+            + 0.35 * nb.magnitude(5)
+            + 0.15 * nb.magnitude(9)
+        )
+
+        angle = nb.orientation(3)
         angle_smooth = cv2.GaussianBlur(angle, (9, 9), 0)
 
         coherence = np.abs(np.sin(angle - angle_smooth))
-        coherence = cv2.normalize(coherence, None, 0, 1, cv2.NORM_MINMAX)
+        coherence = self._normalize(coherence, 0, 1)
 
         mag = mag * (1 - coherence)
 
-        mag = cv2.normalize(mag, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+        return self._normalize(mag, 0, 255).astype(np.uint8)
 
-        blur = int(3 + (100 - detail) / 18) | 1
+    def _line_variance(self, mag, blur):
         mag = cv2.GaussianBlur(mag, (blur, blur), 0)
+        mag_f = mag.astype(np.float32)
 
         local_var = (
-            cv2.GaussianBlur(mag.astype(np.float32) ** 2, (31, 31), 0)
-            - cv2.GaussianBlur(mag.astype(np.float32), (31, 31), 0) ** 2
+            cv2.GaussianBlur(mag_f ** 2, (31, 31), 0)
+            - cv2.GaussianBlur(mag_f, (31, 31), 0) ** 2
         )
 
-        local_var = cv2.normalize(local_var, None, 0, 1, cv2.NORM_MINMAX)
+        local_var = self._normalize(local_var, 0, 1)
+        return mag, local_var
 
-        base_t = 140 - detail * 0.9
-        T = base_t + (local_var * 60)
+    # --------------------------------------------------------
+    # JELLEMZŐ CSOMAG (közös Sobel / Laplace / blur térképek)
+    # --------------------------------------------------------
+    def features(self, img):
+        """A képhez tartozó FeatureBundle (azonosság alapján megjegyezve)"""
+        return self.feature_registry.get(img)
 
-        bw = (mag > T).astype(np.uint8) * 255
-        bw = 255 - bw
+    # --------------------------------------------------------
+    # GLOBÁLIS STATISZTIKÁK (csempés renderhez)
+    # --------------------------------------------------------
+    def _global_stat(self, compute):
+        """
+        Egész képre vonatkozó érték (min/max, döntés).
+        Csempés rendernél a proxy képen rögzített értéket kapja vissza
+        minden csempe, így nincs látható varrat.
+        """
+        if self._stats_replay is not None:
+            return next(self._stats_replay)
 
-        thickness = 1 + int(strength / 12)
-        kernel = np.ones((thickness, thickness), np.uint8)
-        bw = cv2.dilate(bw, kernel, iterations=1)
+        value = compute()
 
-        self.last_line = bw.copy()
-        return bw
+        if self._stats_record is not None:
+            self._stats_record.append(value)
+
+        return value
+
+    def _normalize(self, arr, lo, hi):
+        """cv2.normalize(NORM_MINMAX), rögzíthető min/max értékkel"""
+        if self._stats_record is None and self._stats_replay is None:
+            return cv2.normalize(arr, None, lo, hi, cv2.NORM_MINMAX)
+
+        a_min, a_max = self._global_stat(lambda: cv2.minMaxLoc(arr)[:2])
+        scale = (hi - lo) / (a_max - a_min) if a_max - a_min > 1e-12 else 0.0
+
+        return cv2.addWeighted(arr, scale, arr, 0, lo - a_min * scale)
 
     # --------------------------------------------------------
     # FŐ FÜGGVÉNY
     # --------------------------------------------------------
-    def process(self, img=None, mode="soft", detail=50, strength=50, clean=0):
+    def process(self, img=None, mode="soft", detail=50, strength=50, clean=0,
+                max_side=1600, cancel=None):
+        """
+        A pipeline lépései (mindegyik a saját bemenetein cache-elve):
+
+            resize → prep → tone/line → blend → clean → upscale → mask
+
+        Pl. a háttér tisztítás csúszka csak a clean/upscale/mask lépést,
+        a soft/strong váltás csak a blend-től lefelé futtat újra.
+
+        max_side: feldolgozási felbontás (kisebb érték = gyors proxy
+        előnézet). Az eredmény mindig az eredeti méretű.
+
+        cancel: opcionális függvény; ha True-t ad, a következő lépés előtt
+        RenderCancelled kivétel szakítja meg a futást.
+        """
+
+        if img is not None:
+            self.set_image(img)
+
+        if self._current_image is None:
+            return None
+
+        stages = self._stages.get(max_side)
+        if stages is None:
+            stages = self._stages[max_side] = StageCache()
+
+        full_w = self._current_image.shape[1]
+        full_h = self._current_image.shape[0]
+
+        # --- RESIZE ---
+        k_resize = (self._image_version, max_side)
+        proc_img, scale = stages.run(
+            "resize", k_resize,
+            lambda: self._resize_for_processing(self._current_image, max_side),
+            cancel
+        )
+
+        # --- PREP ---
+        # a clean paramétert az auto_prep nem használja → nincs a kulcsban;
+        # a maszk a modell változatától (fp32 / int8) is függ
+        model_id = self.active_model
+        if self.models is not None and model_id is not None:
+            model_id = self.models.variant_id(model_id)
+        k_prep = (k_resize, model_id)
+        prep, mask = stages.run(
+            "prep", k_prep,
+            lambda: self._prep(proc_img),
+            cancel
+        )
+
+        # --- TONE + LINE ---
+        style_id = type(self.style) if self.style is not None else None
+        k_style = (k_prep, style_id, detail, strength)
+        tone, line = stages.run(
+            "style", k_style,
+            lambda: self._generate(prep, detail, strength),
+            cancel
+        )
+
+        # --- BLEND ---
+        k_blend = (k_style, mode, strength)
+        sketch = stages.run(
+            "blend", k_blend,
+            lambda: self._blend(tone, line, mode, strength),
+            cancel
+        )
+
+        # line layer visszaméretezése az edit rendszerhez
+        k_line = (k_style, full_w, full_h)
+        self.last_line = stages.run(
+            "line", k_line,
+            lambda: self._upscale(line, scale, cv2.INTER_NEAREST),
+            cancel
+        )
+
+        # --- CLEAN ---
+        k_clean = (k_blend, clean)
+        sketch = stages.run(
+            "clean", k_clean,
+            lambda: self._clean(sketch, clean),
+            cancel
+        )
+
+        # --- UPSCALE ---
+        k_upscale = (k_clean, full_w, full_h)
+        sketch = stages.run(
+            "upscale", k_upscale,
+            lambda: self._upscale(sketch, scale, cv2.INTER_LINEAR),
+            cancel
+        )
 
+        # --- MASK ---
+        if mask is not None:
+            k_mask = (k_upscale, k_prep, clean)
+            sketch = stages.run(
+                "mask", k_mask,
+                lambda: self._composite_mask(sketch, mask, clean), cancel
+            )
+
+        # a cache-elt tömb nem kerülhet ki módosítható formában
+        return sketch.copy()
+
+    # --------------------------------------------------------
+    # TELJES FELBONTÁS (csempézve, korlátos memóriával)
+    # --------------------------------------------------------
+    def process_tiled(self, img=None, mode="soft", detail=50, strength=50,
+                      clean=0, budget_mb=1024, workers=None):
+        """
+        Mint a process(), de 1600 px-es limit nélkül, natív felbontáson.
+        A kép csempénként fut (átfedő szegéllyel), több szálon.
+        """
         if img is not None:
             self.set_image(img)
 
         if self._current_image is None:
             return None
 
-        proc_img, scale = self._resize_for_processing(self._current_image, 1600)
-        prep = self.auto_prep(proc_img, clean)
+        renderer = TiledRenderer(self, budget_mb=budget_mb, workers=workers)
+        return renderer.render(self._current_image, mode, detail, strength, clean)
+
+    # --------------------------------------------------------
+    # PIPELINE LÉPÉSEK
+    # --------------------------------------------------------
+    def _prep(self, proc_img):
+        # a maszk a prep lépéssel együtt cache-elődik (szintenként külön)
+        mask = None
+        if self.active_model == "Téma kiemelés":
+            mask = self.ai_mask(proc_img)
 
+        return self.auto_prep(proc_img, mask=mask), mask
+
+    def _generate(self, prep, detail, strength):
         if self.style is None:
             # EREDETI PROGRAM
             tone = self.tone_sketch(prep, detail, strength)
             line = self.line_sketch(prep, detail, strength)
-        else:
-            # CSAK PRESET esetén
-            tone, line = self.style.generate(prep, detail, strength)
+            return tone, line
 
+        # CSAK PRESET esetén
+        return self.style.generate(prep, detail, strength)
+
+    def _blend(self, tone, line, mode, strength):
         line_inv = 255 - line
 
         if mode == "soft":
             # EREDETI CERUZA
             tone_w = 1.0
             line_w = 0.35 + strength / 300.0
-            sketch = cv2.addWeighted(tone, tone_w, line_inv, line_w, 0)
-
         else:
             # EREDETI TOLL
             tone_w = 0.75
             line_w = 0.85 + strength / 150.0
-            sketch = cv2.addWeighted(tone, tone_w, line_inv, line_w, 0)
 
-        # line layer visszaméretezése az edit rendszerhez
-        if scale != 1.0:
-            self.last_line = cv2.resize(
-                line,
-                (self._current_image.shape[1], self._current_image.shape[0]),
-                interpolation=cv2.INTER_NEAREST
-            )
-        else:
-            self.last_line = line
+        return cv2.addWeighted(tone, tone_w, line_inv, line_w, 0)
 
+    def _clean(self, sketch, clean):
         # --------------------------------------------------
         # PORTRAIT BACKGROUND CLEAN
         # --------------------------------------------------
-        if clean > 0:
-            sigma_space = 2 + clean * 0.25
-            sigma_color = 10 + clean * 1.2
-
-            sketch = cv2.bilateralFilter(
-                sketch,
-                d=0,
-                sigmaColor=sigma_color,
-                sigmaSpace=sigma_space
-            )
+        if clean <= 0:
+            return sketch
 
-        # visszaméretezés
-        if scale != 1.0:
-            sketch = cv2.resize(
-                sketch,
-                (self._current_image.shape[1], self._current_image.shape[0]),
-                interpolation=cv2.INTER_LINEAR
-            )
+        sigma_space = 2 + clean * 0.25
+        sigma_color = 10 + clean * 1.2
 
-        # AI maszk (mérethelyesen!)
-        if self.active_model == "Téma kiemelés" and self._cached_mask is not None:
+        return cv2.bilateralFilter(
+            sketch,
+            d=0,
+            sigmaColor=sigma_color,
+            sigmaSpace=sigma_space
+        )
 
-            mask = self._cached_mask
+    def _upscale(self, img, scale, interpolation):
+        # visszaméretezés az eredeti (crop utáni) méretre
+        if scale == 1.0:
+            return img
+
+        return cv2.resize(
+            img,
+            (self._current_image.shape[1], self._current_image.shape[0]),
+            interpolation=interpolation
+        )
 
-            # stabil perem (mindig kell)
-            mask_bin = (mask > 0.5).astype(np.uint8) * 255
+    def _composite_mask(self, sketch, mask, clean):
+        # AI maszk (mérethelyesen!)
+
+        # stabil perem (mindig kell)
+        mask_bin = (mask > 0.5).astype(np.uint8) * 255
 
-            if scale != 1.0:
-                mask = cv2.resize(
-                    mask_bin,
-                    (self._current_image.shape[1], self._current_image.shape[0]),
-                    interpolation=cv2.INTER_NEAREST
-                ).astype(np.float32) / 255.0
-            else:
-                mask = mask_bin.astype(np.float32) / 255.0
+        if mask_bin.shape[:2] != sketch.shape[:2]:
+            mask_bin = cv2.resize(
+                mask_bin,
+                (sketch.shape[1], sketch.shape[0]),
+                interpolation=cv2.INTER_NEAREST
+            )
 
-            sketch = self.apply_mask(sketch, mask, clean)
+        mask = mask_bin.astype(np.float32) / 255.0
 
-        return sketch
-       
\ No newline at end of file
+        return self.apply_mask(sketch, mask, clean)
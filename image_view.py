@@ -0,0 +1,320 @@
+import math
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QRectF, Qt
+from PyQt6.QtGui import QColor, QImage, QPainter, QPixmap, QTransform
+from PyQt6.QtWidgets import QFrame, QGraphicsItem, QGraphicsScene, QGraphicsView
+
+
+class TilePyramid:
+    """
+    Kép mip piramisa csempénként, igény szerint.
+
+    - a numpy tömb másolás nélkül kerül be (csak olvasva; az első
+      update_region előtt másolódik, kivéve owned=True esetén)
+    - L. szint = 2^L-szeres kicsinyítés (2× INTER_AREA felezés az L-1.
+      szintből, felfelé kerekítve: páratlan méretnél az utolsó sor /
+      oszlop is megmarad); egy csempe TILE × TILE pixel a saját szintjén, és csak
+      akkor számolódik, amikor először kell (a hozzá tartozó alsóbb
+      szintű csempékkel együtt)
+    - kész csempék (QPixmap) LRU cache-ben (szint, tx, ty) kulccsal,
+      'cache_mb' keretig; a zoom folyamatos változása nem érvényteleníti
+      őket (a nézet transzformációja skáláz)
+    """
+
+    TILE = 256
+
+    def __init__(self, cache_mb=96):
+        self.budget = int(cache_mb * 1024 * 1024)
+
+        self.image = None
+        self._levels = []        # szint tömbök ([0] = image), lustán foglalva
+        self._valid = []         # szintenként: kész csempék (bool rács)
+        self._tiles = OrderedDict()
+        self._tile_bytes = 0
+
+    # --------------------------------------------------
+    # KÉP
+    # --------------------------------------------------
+    def set_image(self, img, owned=False):
+        """owned: a hívó már nem használja a tömböt → update_region írhat bele"""
+        img = np.ascontiguousarray(img).view()
+        if not owned:
+            img.flags.writeable = False
+
+        self.image = img
+        self._levels = [img]
+        self._valid = [None]
+        self.clear_cache()
+
+    def clear_cache(self):
+        self._tiles.clear()
+        self._tile_bytes = 0
+
+    def level_count(self):
+        """szintek száma: a legkisebb elfér egy csempében"""
+        h, w = self.image.shape[:2]
+        return math.ceil(math.log2(max(max(h, w) / self.TILE, 1))) + 1
+
+    def level_for(self, zoom):
+        """a szint, amelynek zoom-mal vett mérete (0.5, 1] között van"""
+        if zoom >= 1:
+            return 0
+        return min(int(math.floor(math.log2(1 / zoom))), self.level_count() - 1)
+
+    def update_region(self, img, rect):
+        """rect = (x0, y0, x1, y1) új tartalma; az érintett csempék újraszámolódnak"""
+        x0, y0, x1, y1 = rect
+
+        # másolás írás előtt (a forrás tömb a hívóé)
+        if not self.image.flags.writeable:
+            self.image = self.image.copy()
+            self._levels[0] = self.image
+        self.image[y0:y1, x0:x1] = img
+
+        t = self.TILE
+        for level in range(len(self._levels)):
+            s = t << level
+            tx0, ty0 = x0 // s, y0 // s
+            tx1, ty1 = (x1 - 1) // s, (y1 - 1) // s
+
+            if level > 0:
+                self._valid[level][ty0:ty1 + 1, tx0:tx1 + 1] = False
+
+            for ty in range(ty0, ty1 + 1):
+                for tx in range(tx0, tx1 + 1):
+                    pixmap = self._tiles.pop((level, tx, ty), None)
+                    if pixmap is not None:
+                        self._tile_bytes -= self._nbytes(pixmap)
+
+    # --------------------------------------------------
+    # CSEMPÉK
+    # --------------------------------------------------
+    def tiles_in(self, level, rect):
+        """(tx, ty) párok a szinten, amelyek a kép 'rect' (QRectF, kép px) részét fedik"""
+        h, w = self.image.shape[:2]
+        t = self.TILE
+        s = t << level
+
+        # a szint mérete felfelé kerekített felezésekből: ceil(h / 2^level)
+        cols = -(-(-(-w >> level)) // t)
+        rows = -(-(-(-h >> level)) // t)
+
+        tx0 = int(max(rect.left(), 0) // s)
+        ty0 = int(max(rect.top(), 0) // s)
+        tx1 = min(int(min(rect.right(), w - 1) // s), cols - 1)
+        ty1 = min(int(min(rect.bottom(), h - 1) // s), rows - 1)
+        return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+
+    def tile(self, level, tx, ty):
+        """QPixmap a szint saját felbontásán (a szélén kisebb lehet)"""
+        key = (level, tx, ty)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+
+        t = self.TILE
+        self._ensure(level, tx, ty)
+        block = np.ascontiguousarray(self._levels[level][ty * t:(ty + 1) * t, tx * t:(tx + 1) * t])
+
+        h, w = block.shape[:2]
+        fmt = QImage.Format.Format_Grayscale8 if block.ndim == 2 else QImage.Format.Format_BGR888
+        # copy(): a pixmap nem hivatkozhat a numpy blokkra
+        pixmap = QPixmap.fromImage(QImage(block.data, w, h, block.strides[0], fmt).copy())
+
+        self._tiles[key] = pixmap
+        self._tile_bytes += self._nbytes(pixmap)
+
+        while self._tile_bytes > self.budget and len(self._tiles) > 1:
+            _, old = self._tiles.popitem(last=False)
+            self._tile_bytes -= self._nbytes(old)
+        return pixmap
+
+    @staticmethod
+    def _nbytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+    # --------------------------------------------------
+    # MIP SZINTEK
+    # --------------------------------------------------
+    def _ensure(self, level, tx, ty):
+        """a szint (tx, ty) csempéje kész legyen (rekurzívan az alsóbb szintekből)"""
+        if level == 0:
+            return
+
+        t = self.TILE
+        while len(self._levels) <= level:
+            prev = self._levels[-1]
+            shape = (-(-prev.shape[0] // 2), -(-prev.shape[1] // 2)) + prev.shape[2:]
+            self._levels.append(np.empty(shape, prev.dtype))
+            self._valid.append(np.zeros((-(-shape[0] // t), -(-shape[1] // t)), bool))
+
+        valid = self._valid[level]
+        if valid[ty, tx]:
+            return
+
+        # az előző szint 2 × 2 csempéje
+        prev = self._levels[level - 1]
+        rows, cols = -(-prev.shape[0] // t), -(-prev.shape[1] // t)
+        for y in (2 * ty, 2 * ty + 1):
+            for x in (2 * tx, 2 * tx + 1):
+                if y < rows and x < cols:
+                    self._ensure(level - 1, x, y)
+
+        dst = self._levels[level][ty * t:(ty + 1) * t, tx * t:(tx + 1) * t]
+        h, w = dst.shape[:2]
+        src = prev[2 * ty * t:2 * ty * t + 2 * h, 2 * tx * t:2 * tx * t + 2 * w]
+
+        # páratlan szélen a hiányzó fél pár az utolsó sor / oszlop másolata
+        pad_y, pad_x = 2 * h - src.shape[0], 2 * w - src.shape[1]
+        if pad_y or pad_x:
+            src = cv2.copyMakeBorder(src, 0, pad_y, 0, pad_x, cv2.BORDER_REPLICATE)
+        dst[...] = cv2.resize(src, (w, h), interpolation=cv2.INTER_AREA)
+        valid[ty, tx] = True
+
+
+class _PyramidItem(QGraphicsItem):
+    """a kép a jelenetben: rajzoláskor csak a látható csempék, a zoomhoz illő szinten"""
+
+    def __init__(self, pyramid):
+        super().__init__()
+        self.pyramid = pyramid
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self):
+        image = self.pyramid.image
+        if image is None:
+            return QRectF()
+        return QRectF(0, 0, image.shape[1], image.shape[0])
+
+    def paint(self, painter, option, widget=None):
+        pyramid = self.pyramid
+        if pyramid.image is None:
+            return
+
+        zoom = option.levelOfDetailFromTransform(painter.worldTransform())
+        level = pyramid.level_for(zoom)
+        s = 1 << level
+        t = pyramid.TILE * s
+        img_h, img_w = pyramid.image.shape[:2]
+
+        for tx, ty in pyramid.tiles_in(level, option.exposedRect):
+            pixmap = pyramid.tile(level, tx, ty)
+
+            # a felfelé kerekített szint utolsó pixele túllóghat a képen
+            w = min(pixmap.width() * s, img_w - tx * t)
+            h = min(pixmap.height() * s, img_h - ty * t)
+            painter.drawPixmap(QRectF(tx * t, ty * t, w, h), pixmap, QRectF(0, 0, w / s, h / s))
+
+
+class ImageView(QGraphicsView):
+    """
+    Előnézet: csempézett, mip szintes nézet (TilePyramid) → a memória és
+    a rajzolás a nézőablak méretétől függ, nem a kép × zoom méretétől.
+
+    - set_image: új kép (másolás nélkül, szürke vagy BGR)
+    - set_zoom: csak a nézet transzformációja (a csempék megmaradnak)
+    - update_region: egy téglalap új tartalma (ecset)
+    - map_to_image: nézőablak pozíció → kép koordináta
+
+    Kép nélkül a beállított szöveg látszik (setText).
+    """
+
+    BACKGROUND = "#2b2b2b"
+
+    def __init__(self, text="", cache_mb=96):
+        super().__init__()
+        self.zoom = 1.0
+        self.tiles = TilePyramid(cache_mb)
+        self._text = text
+
+        self.setScene(QGraphicsScene(self))
+        self._item = _PyramidItem(self.tiles)
+        self.scene().addItem(self._item)
+        self.scene().setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setBackgroundBrush(QColor(self.BACKGROUND))
+        self.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
+        self.viewport().setMouseTracking(True)
+
+    # --------------------------------------------------
+    # KÉP
+    # --------------------------------------------------
+    def set_image(self, img, zoom, owned=False):
+        """
+        img  : grayscale vagy BGR, nem másolódik
+        owned: True = a nézeté (ecset frissítés bele ír), különben nem módosul
+        """
+        shape = None if self.tiles.image is None else self.tiles.image.shape[:2]
+
+        self._item.prepareGeometryChange()
+        self.tiles.set_image(img, owned)
+
+        if shape != img.shape[:2]:
+            self.scene().setSceneRect(self._item.boundingRect())
+        self.set_zoom(zoom)
+        self._item.update()
+
+    def set_zoom(self, zoom):
+        self.zoom = zoom
+        self.setTransform(QTransform.fromScale(zoom, zoom))
+
+    def clear_image(self):
+        self._item.prepareGeometryChange()
+        self.tiles.image = None
+        self.tiles.clear_cache()
+        self.scene().setSceneRect(QRectF())
+        self.viewport().update()
+
+    def has_image(self, shape, channels):
+        """a kép fogadhat-e ilyen tartalmat részletekben"""
+        image = self.tiles.image
+        if image is None:
+            return False
+        return image.shape[:2] == tuple(shape[:2]) and (image.ndim == 3) == (channels == 3)
+
+    def map_to_image(self, pos):
+        """nézőablak pozíció (QPointF) → (x, y) kép koordináta"""
+        p = self.mapToScene(pos.toPoint())
+        return p.x(), p.y()
+
+    def setText(self, text):
+        self._text = text
+        self.viewport().update()
+
+    # --------------------------------------------------
+    # RÉSZLET
+    # --------------------------------------------------
+    def update_region(self, img, rect):
+        """
+        img : a téglalap új tartalma (grayscale vagy BGR, mint set_image-nél)
+        rect: (x0, y0, x1, y1) kép koordinátákban
+        """
+        x0, y0, x1, y1 = rect
+        if x1 <= x0 or y1 <= y0:
+            return
+
+        self.tiles.update_region(img, rect)
+
+        # a simító skálázás szomszédsága: +1 pixel a látható szinten
+        m = 1 << self.tiles.level_for(self.zoom)
+        self._item.update(QRectF(x0 - m, y0 - m, x1 - x0 + 2 * m, y1 - y0 + 2 * m))
+
+    # --------------------------------------------------
+    # RAJZOLÁS
+    # --------------------------------------------------
+    def drawForeground(self, painter, rect):
+        if self.tiles.image is not None or not self._text:
+            return
+
+        painter.save()
+        painter.resetTransform()
+        painter.setPen(QColor("white"))
+        painter.drawText(self.viewport().rect(), Qt.AlignmentFlag.AlignCenter, self._text)
+        painter.restore()
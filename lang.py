@@ -79,3 +79,8 @@ def set_language(new_lang):
     LANG = new_lang
     _cfg["language"] = new_lang
     _save_config(_cfg)
+
+
+def get_setting(key, default=None):
+    """Opcionális beállítás a config.json-ból"""
+    return _cfg.get(key, default)
@@ -10,33 +10,40 @@ from PyQt6.QtWidgets import (
     QApplication,
     QGroupBox,
     QComboBox,
-    QScrollArea,
     QSizePolicy,
     QMessageBox,
     QDialog,
     QRadioButton,
 )
-from PyQt6.QtGui import QPixmap, QAction, QImage
+from PyQt6.QtGui import QAction
 from PyQt6.QtCore import Qt, QTimer
 import sys
 import cv2
 import numpy as np
 import webbrowser
+from pathlib import Path
 import lang
 
-from image_processor import ImageProcessor
+from image_processor import ImageProcessor, RenderCancelled
+from image_view import ImageView
+from render_worker import RenderWorker
 from edit.manager import EditManager
 from edit.overlay import EditOverlay
 from edit.clean import CleanTool
 from edit.simplify import SimplifyTool
 from edit.history import History
-from model_manager import ModelManager
+from model_manager import ModelManager, CACHE_DIR
+from mask_cache import MaskCache
 from styles.default import DefaultStyle
 from styles.portrait import PortraitStyle
 from styles.architecture import ArchitectureStyle
 from styles.vehicle import VehicleStyle
 from styles.engrave import EngraveStyle
 from vectorizer import Vectorizer
+from exporters import export_paths
+from travel_optimizer import TravelOptimizer
+from point_ops import PointOp
+import fast_blur
 from lang import tr
 
 class MainWindow(QMainWindow):
@@ -52,10 +59,38 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(tr("APP_TITLE"))
         self.resize(1100, 700)
 
-        self.model_manager = ModelManager()
-        self.processor = ImageProcessor(self.model_manager)
+        # ONNX beállítások (config.json: "onnx_threads", "onnx_opt_level",
+        # "model_precision" (fp32 / int8), "model_warmup")
+        self.model_manager = ModelManager(
+            intra_threads=lang.get_setting("onnx_threads", 0),
+            opt_level=lang.get_setting("onnx_opt_level", "all"),
+            precision=lang.get_setting("model_precision", "fp32"),
+        )
+        if lang.get_setting("model_warmup", True):
+            self.model_manager.warm_up("Téma kiemelés")
+        # AI maszk cache (config.json: "mask_cache_entries", "mask_cache_disk")
+        mask_cache = MaskCache(
+            entries=lang.get_setting("mask_cache_entries", 16),
+            cache_dir=CACHE_DIR / "masks"
+            if lang.get_setting("mask_cache_disk", True) else None,
+        )
+        self.processor = ImageProcessor(self.model_manager, mask_cache)
         self.processor.style = DefaultStyle(self.processor)
 
+        # ---- HÁTTÉR RENDER ----
+        # a processzort csak a worker szál használja,
+        # a GUI paraméter pillanatképet küld
+        self.style_class = DefaultStyle
+        self.active_model = None
+        self.render_worker = RenderWorker(self)
+        self.render_worker.finished.connect(self._on_job_finished)
+        self.render_worker.failed.connect(self._on_job_failed)
+        self._job_id = None
+        self._job_done = None
+        self._job_busy = False
+        self._job_queue = []        # busy feladat alatt érkezett (job, done, busy)
+        self._job_image = None      # worker oldali állapot
+
         self.cv_image = None        
         self.sketch_image = None
         self.base_sketch = None
@@ -70,10 +105,10 @@ class MainWindow(QMainWindow):
         self.overlay = EditOverlay(self.edit)
         self.clean_tool = CleanTool()
         self.simplify_tool = SimplifyTool()
-        self.history = History(20)
+        self.history = History(20, budget_mb=lang.get_setting("history_mb", 256))
         self.current_line_layer = None
         self.edit_mode = False
-        self.vectorizer = Vectorizer()
+        self.vectorizer = Vectorizer(workers=lang.get_setting("vector_workers", 1))
 
         # ---- PREVIEW TIMER ----
         self.preview_timer = QTimer()
@@ -81,6 +116,27 @@ class MainWindow(QMainWindow):
         self.preview_timer.setSingleShot(True)
         self.preview_timer.timeout.connect(self.auto_preview)
 
+        # ---- PROGRESSIVE PREVIEW ----
+        # húzás közben kis felbontású proxy, megállás után teljes render
+        # (config.json: "preview_proxy_side", 0 = kikapcsolva)
+        self.full_side = 1600
+        self.proxy_side = int(lang.get_setting("preview_proxy_side", 512))
+        self.proxy_timer = QTimer()
+        self.proxy_timer.setInterval(40)
+        self.proxy_timer.setSingleShot(True)
+        self.proxy_timer.timeout.connect(self.proxy_preview)
+
+        # ecset / vonal törlés: a húzás pontjai és a kurzor képkockánként
+        # egyszerre rajzolódnak
+        self.edit_timer = QTimer()
+        self.edit_timer.setInterval(16)
+        self.edit_timer.setSingleShot(True)
+        self.edit_timer.timeout.connect(self._flush_edit)
+
+        # pontos (lassú) Gauss blur a piramis közelítés helyett
+        # (config.json: "exact_blur")
+        fast_blur.set_exact(lang.get_setting("exact_blur", False))
+
         self.menuBar().hide()
         self._create_topbar()
         self._create_layout()
@@ -138,28 +194,11 @@ class MainWindow(QMainWindow):
         main_layout = QHBoxLayout(main_widget)
         
         # PREVIEW
-        self.image_label = QLabel(tr("OPEN_HINT"))
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.image_label.setStyleSheet("color: white;")
-        self.image_label.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-
-        # induláskor töltse ki a nézőablakot
-        self.image_label.setSizePolicy(QSizePolicy.Policy.Expanding,
-                               QSizePolicy.Policy.Expanding)
-
-        self.scroll = QScrollArea()
-        self.scroll.setWidget(self.image_label)
-        self.scroll.setWidgetResizable(True)   # fontos: üres állapothoz
-        self.scroll.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        # valódi háttér
-        self.scroll.setStyleSheet("QScrollArea { background: #2b2b2b; border: none; }")
-        self.scroll.viewport().setStyleSheet("background: #2b2b2b;")
-
-        main_layout.addWidget(self.scroll, 3)
+        # csempézett nézet: saját görgetősávok, háttér, egérkövetés
+        self.image_label = ImageView(tr("OPEN_HINT"), lang.get_setting("preview_cache_mb", 96))
+        main_layout.addWidget(self.image_label, 3)
 
         # mouse events for edit
-        self.image_label.setMouseTracking(True)
         self.image_label.mousePressEvent = self.image_mouse_press
         self.image_label.mouseMoveEvent = self.image_mouse_move
         self.image_label.mouseReleaseEvent = self.image_mouse_release
@@ -266,6 +305,7 @@ class MainWindow(QMainWindow):
 
         # ---- EDIT BUTTON CONNECTIONS ----
         self.edit_buttons["brush"].clicked.connect(self._edit_brush)
+        self.edit_buttons["stroke"].clicked.connect(self._edit_stroke)
         self.edit_buttons["clean"].clicked.connect(self._edit_clean)
         self.edit_buttons["simplify"].clicked.connect(self._edit_simplify)
 
@@ -326,6 +366,7 @@ class MainWindow(QMainWindow):
         self.group_vector.setTitle(tr("VECTOR"))
 
         self.edit_buttons["brush"].setText(tr("ERASER"))
+        self.edit_buttons["stroke"].setText(tr("ERASE_STROKE"))
         self.edit_buttons["clean"].setText(tr("DENOISE"))
         self.edit_buttons["simplify"].setText(tr("SIMPLIFY"))
 
@@ -343,6 +384,7 @@ class MainWindow(QMainWindow):
 
         # --- VECTOR PANEL BUTTONS ---
         self.btn_reconstruct.setText(tr("RECONSTRUCT"))
+        self.btn_export_vector.setText(tr("EXPORT_VECTOR"))
         self.btn_illustration.setText(tr("ILLUSTRATION_MODE"))
 
         for w, key, setter in self._tr:
@@ -380,7 +422,7 @@ class MainWindow(QMainWindow):
             "engrave": EngraveStyle,
         }
 
-        self.processor.style = style_map[mode_name](self.processor)
+        self.style_class = style_map[mode_name]
 
         # melyik blending mód
         blend = "strong" if mode_name == "strong" else "soft"
@@ -400,6 +442,7 @@ class MainWindow(QMainWindow):
         self.edit_buttons = {}
         edit_tools = {
             "brush": "ERASER",
+            "stroke": "ERASE_STROKE",
             "clean": "DENOISE",
             "simplify": "SIMPLIFY",
         }
@@ -407,8 +450,8 @@ class MainWindow(QMainWindow):
         for tool, label in edit_tools.items():
             btn = QPushButton(tr(label))
 
-            # --- CSAK A RADÍR MARAD BERAGADÓ GOMB ---
-            if tool == "brush":
+            # --- CSAK A RADÍR ESZKÖZÖK MARADNAK BERAGADÓ GOMBOK ---
+            if tool in ("brush", "stroke"):
                 btn.setCheckable(True)
             else:
                 btn.setCheckable(False)
@@ -467,6 +510,12 @@ class MainWindow(QMainWindow):
         self.btn_illustration.clicked.connect(self.run_illustration_mode)
         layout.addWidget(self.btn_illustration)
 
+        # Vektor export (SVG / DXF / G-code)
+        self.btn_export_vector = QPushButton(tr("EXPORT_VECTOR"))
+        self.btn_export_vector.setMinimumHeight(32)
+        self.btn_export_vector.clicked.connect(self.export_vector)
+        layout.addWidget(self.btn_export_vector)
+
         box.setLayout(layout)
         return box
 
@@ -478,11 +527,17 @@ class MainWindow(QMainWindow):
             btn.setChecked(False)
 
     def _edit_brush(self, checked):
+        self._select_edit_tool("brush", self.edit.TOOL_BRUSH, checked)
+
+    def _edit_stroke(self, checked):
+        self._select_edit_tool("stroke", self.edit.TOOL_STROKE, checked)
+
+    def _select_edit_tool(self, name, tool, checked):
         self._disable_all_edit_buttons()
         if checked:
             self.edit.enable(True)
-            self.edit.set_tool(self.edit.TOOL_BRUSH)
-            self.edit_buttons["brush"].setChecked(True)
+            self.edit.set_tool(tool)
+            self.edit_buttons[name].setChecked(True)
             self.render_with_edit()
         else:
             self.edit.enable(False)
@@ -491,10 +546,10 @@ class MainWindow(QMainWindow):
     def _edit_clean(self):
         if self.sketch_image is None:
             return
+        self._cancel_busy_job()
         self._push_history()
         base = self.edit.apply_to(self.sketch_image)
         self.sketch_image = self.clean_tool.apply(base)
-        self.last_line = self.processor.line_sketch(self.sketch_image, 50, 50)
         edges = cv2.Canny(self.sketch_image, 40, 120)
         self.last_line = edges
         self.render_with_edit()
@@ -502,62 +557,75 @@ class MainWindow(QMainWindow):
     def _edit_simplify(self):
         if self.sketch_image is None:
             return
+        self._cancel_busy_job()
         self._push_history()
         base = self.edit.apply_to(self.sketch_image)
         self.sketch_image = self.simplify_tool.apply(base)
-        self.last_line = self.processor.line_sketch(self.sketch_image, 50, 50)
         self.last_line = (self.sketch_image < 250).astype("uint8") * 25
         self.render_with_edit()
 
     def run_illustration_mode(self):
-        """Automatikus több lépéses rajz finomítás"""
+        """Automatikus több lépéses rajz finomítás (háttér szálon)"""
 
         if self.sketch_image is None:
             return
 
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        self.setEnabled(False)
-        QApplication.processEvents()
+        base = self.edit.apply_to(self.sketch_image)
+        params = self._vector_params()
+        simplify_tool = self.simplify_tool
+        clean_tool = self.clean_tool
+        workers = self.vectorizer.workers
 
-        try:
+        def job(cancel):
             # 1. egyszerűsítés
-            self._edit_simplify()
-            QApplication.processEvents()
- 
+            img = simplify_tool.apply(base)
+
             # 2. újrarajzolás
-            self._reconstruct_lines()
-            QApplication.processEvents()
+            img = self._vector_redraw(img, params, Vectorizer(workers=workers), cancel)
 
             # 3. tisztítás
-            self._edit_clean()
-            QApplication.processEvents()
+            img = clean_tool.apply(img)
 
             # 4. végső újrarajzolás
-            self._reconstruct_lines()
-            QApplication.processEvents()
+            return self._vector_redraw(img, params, Vectorizer(workers=workers), cancel)
 
-        finally:
-            self.setEnabled(True)
-            QApplication.restoreOverrideCursor()
+        self._submit(job, self._finish_illustration, busy=True)
+
+    def _finish_illustration(self, gray):
+        # az egész folyamat egyetlen undo lépés, csak ha eredményt adott
+        self._push_history()
+        self._set_reconstructed(gray)
+
+    def _vector_params(self):
+        return dict(
+            detail=self.vec_detail.value(),
+            smooth=self.vec_smooth.value(),
+            merge=self.vec_merge.value(),
+        )
 
+    def _vector_redraw(self, img, params, vectorizer, cancel=None):
+        """vektorizálás + újrarajzolás (GUI állapotot nem érint)"""
+        paths = vectorizer.vectorize(img, **params)
+
+        if cancel is not None and cancel():
+            raise RenderCancelled()
+
+        return vectorizer.draw_preview(img.shape, paths)
 
     # ---- ÚJ: VONAL REKONSTRUKCIÓ ----
     def _reconstruct_lines(self):
         if self.sketch_image is None:
             return
 
+        self._cancel_busy_job()
         self._push_history()
 
-        paths = self.vectorizer.vectorize(
-            self.sketch_image,
-            detail=self.vec_detail.value(),
-            smooth=self.vec_smooth.value(),
-            merge=self.vec_merge.value()
+        gray = self._vector_redraw(
+            self.sketch_image, self._vector_params(), self.vectorizer
         )
+        self._set_reconstructed(gray)
 
-        preview = self.vectorizer.draw_preview(self.sketch_image.shape, paths)
-        gray = cv2.cvtColor(preview, cv2.COLOR_BGR2GRAY)
-
+    def _set_reconstructed(self, gray):
         # új rajz
         self.sketch_image = gray
         self.base_sketch = gray.copy()
@@ -601,12 +669,12 @@ class MainWindow(QMainWindow):
 
     def on_model_changed(self, index):
         if index == 0:
-            self.processor.active_model = None
+            self.active_model = None
         else:
-            if self.processor.models is None:
+            if self.model_manager is None:
                 return
-            name = list(self.processor.models.registry.keys())[index - 1]
-            self.processor.active_model = name
+            name = list(self.model_manager.registry.keys())[index - 1]
+            self.active_model = name
 
         if self.has_generated:
             blend = "strong" if self.draw_mode == "strong" else "soft"
@@ -639,8 +707,29 @@ class MainWindow(QMainWindow):
         if not self.has_generated:
             return
 
+        # proxy: ritkítva fut (nem indul újra minden eseménynél)
+        if self._use_proxy() and not self.proxy_timer.isActive():
+            self.proxy_timer.start()
+
+        # teljes render: csak ha a csúszka megállt
         self.preview_timer.start()
 
+    def _use_proxy(self):
+        if self.proxy_side <= 0 or self.proxy_side >= self.full_side:
+            return False
+        return max(self.cv_image.shape[:2]) > self.proxy_side
+
+    def proxy_preview(self):
+        if not self.has_generated:
+            return
+
+        # a teljes render már lefutott / elindult → felesleges proxy
+        if not self.preview_timer.isActive():
+            return
+
+        blend = "strong" if self.draw_mode == "strong" else "soft"
+        self.run_processing(False, blend, max_side=self.proxy_side)
+
     def auto_preview(self):
         if not self.has_generated:
             return
@@ -652,9 +741,7 @@ class MainWindow(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, tr("OPEN_IMAGE_TITLE"), "", "Images (*.png *.jpg *.jpeg *.bmp)")
 
         # vissza vászon módba új kép előtt
-        self.scroll.setWidgetResizable(True)
-        self.image_label.setSizePolicy(QSizePolicy.Policy.Expanding,
-                                       QSizePolicy.Policy.Expanding)
+        self.image_label.clear_image()
         self.image_label.setText(tr("OPEN_HINT"))
 
         if file_path:
@@ -668,9 +755,6 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, tr("ERROR"), tr("ERROR_LOAD"))
                 return
 
-            # átadjuk a feldolgozónak
-            self.processor.set_image(self.cv_image)
-
             self.has_generated = False
             self.last_mode = None
 
@@ -681,7 +765,7 @@ class MainWindow(QMainWindow):
             # első automatikus rajz
             self.set_draw_mode("soft")
 
-    def run_processing(self, remove_bg=False, mode="soft"):
+    def run_processing(self, remove_bg=False, mode="soft", max_side=None):
         if self.cv_image is None:
             return
         
@@ -689,28 +773,120 @@ class MainWindow(QMainWindow):
         self.last_remove_bg = remove_bg
         self.last_mode = mode
 
-        # slider értékek
-        detail = 100 - self.detail_slider.value()
-        strength = 100 - self.line_slider.value()
-        clean = self.bg_slider.value()
-
-        self.base_sketch = self.processor.process(
-            mode=mode, detail=detail, strength=strength, clean=clean
+        # slider értékek (pillanatkép a worker szálnak)
+        params = dict(
+            mode=mode,
+            detail=100 - self.detail_slider.value(),
+            strength=100 - self.line_slider.value(),
+            clean=self.bg_slider.value(),
+            max_side=max_side or self.full_side,
         )
+        image = self.cv_image
+        style_class = self.style_class
+        active_model = self.active_model
+        proc = self.processor
+
+        def job(cancel):
+            # új kép → cache reset (csak a worker szálon)
+            if self._job_image is not image:
+                proc.set_image(image)
+                self._job_image = image
+
+            if type(proc.style) is not style_class:
+                proc.style = style_class(proc)
+            proc.active_model = active_model
+
+            sketch = proc.process(cancel=cancel, **params)
+            return sketch, proc.last_line
+
+        self._submit(job, self._on_render_finished)
+
+    def _on_render_finished(self, result):
+        self.base_sketch, line = result
         
         self.sketch_image = self.base_sketch.copy()
 
         # kontúr réteg az edit rendszernek
-        self.last_line = self.processor.last_line
+        self.last_line = line
        
         # !!! FONTOS: új vászon azonnal
         self.edit.set_base_image(self.sketch_image)
-        self.current_line_layer = self.processor.last_line
+        self.current_line_layer = line
 
         self.apply_style()
 
         self.render_with_edit()
 
+    # --------------------------------------------------
+    # HÁTTÉR FELADATOK
+    # --------------------------------------------------
+    def _submit(self, job, done, busy=False):
+        """
+        Feladat a worker szálra. Csak a legutolsó kérés eredménye
+        érkezik meg (done a GUI szálon fut).
+
+        Busy feladat (export, illusztráció) alatt az új kérés sorba áll,
+        hogy ne írja felül: az előnézetekből csak a legutolsó marad.
+        """
+        if self._job_busy:
+            if not busy:
+                self._job_queue = [q for q in self._job_queue if q[2]]
+            self._job_queue.append((job, done, busy))
+            return
+
+        self._set_busy(busy)
+        self._job_done = done
+        self._job_id = self.render_worker.submit(job)
+
+    def _on_job_finished(self, job_id, result):
+        if job_id != self._job_id:
+            return
+
+        done = self._job_done
+        self._job_id = None
+        self._job_done = None
+        self._set_busy(False)
+
+        done(result)
+        self._run_queued()
+
+    def _on_job_failed(self, job_id, message):
+        if job_id != self._job_id:
+            return
+
+        busy = self._job_busy
+        self._job_id = None
+        self._job_done = None
+        self._set_busy(False)
+
+        # a háttér előnézet hibája csak a konzolra megy (a worker kiírta)
+        if busy:
+            QMessageBox.warning(self, tr("ERROR"), f"{tr('ERROR_RENDER')}\n{message}")
+        self._run_queued()
+
+    def _run_queued(self):
+        if self._job_queue and self._job_id is None:
+            self._submit(*self._job_queue.pop(0))
+
+    def _cancel_busy_job(self):
+        # kézi szerkesztés → a futó illusztráció eredménye már nem kell
+        if not self._job_busy:
+            return
+
+        self.render_worker.cancel()
+        self._job_id = None
+        self._job_done = None
+        self._set_busy(False)
+        self._run_queued()
+
+    def _set_busy(self, busy):
+        if busy and not self._job_busy:
+            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        elif not busy and self._job_busy:
+            QApplication.restoreOverrideCursor()
+
+        self._job_busy = busy
+
     # ---------------- STYLE ----------------
     def apply_style(self):
         if self.sketch_image is None:
@@ -719,77 +895,83 @@ class MainWindow(QMainWindow):
         if self.base_sketch is None:
             return
 
-        img = self.base_sketch.copy()
+        img = self.base_sketch
 
         ink = self.ink_slider.value()
         comic = self.comic_slider.value()
         logo = self.logo_slider.value()
         minimal = self.minimal_slider.value()
 
+        # pontműveletek egy LUT-ba fűzve
+        ops = PointOp()
+
         if ink > 0:
             alpha = 1 + ink / 40
-            img = cv2.convertScaleAbs(img, alpha=alpha, beta=-ink)
+            ops = ops.then(PointOp.linear(alpha, -ink))
 
         if comic > 0:
+            # a dilatáció megszakítja a láncot
+            if not ops.is_identity:
+                img = ops.apply(img)
+                ops = PointOp()
+
             k = 1 + comic // 20
             kernel = np.ones((k, k), np.uint8)
             img = cv2.dilate(img, kernel, 1)
 
         if logo > 0:
-            _, img = cv2.threshold(img, 180 - logo, 255, cv2.THRESH_BINARY)
+            ops = ops.then(PointOp.threshold(180 - logo))
+
+        if not ops.is_identity:
+            img = ops.apply(img)
 
         if minimal > 0:
             k = 1 + minimal // 25
             kernel = np.ones((k, k), np.uint8)
             img = cv2.morphologyEx(img, cv2.MORPH_OPEN, kernel)
 
+        # a base_sketch nem módosulhat
+        if img is self.base_sketch:
+            img = img.copy()
+
         self.sketch_image = img
         self.render_with_edit()
 
-    def render_with_edit(self):
+    def render_with_edit(self, rect=None):
+        """
+        rect = (x0, y0, x1, y1): csak ez a téglalap változott (ecset),
+        a megjelenített kép többi része marad
+        """
         if self.sketch_image is None:
             return
 
         # biztos azonos méret
         if self.edit.mask is not None and self.edit.mask.shape != self.sketch_image.shape[:2]:
             self.edit.set_base_image(self.sketch_image)
+            rect = None
+
+        channels = 3 if self.edit.enabled or self.sketch_image.ndim == 3 else 1
+        if rect is not None and self.image_label.has_image(self.sketch_image.shape, channels):
+            img = self.edit.apply_to(self.sketch_image, rect)
+            if self.edit.enabled:
+                img = self.overlay.render(img, self.sketch_image, origin=rect[:2])
+            self.image_label.update_region(img, rect)
+            return
 
         img = self.edit.apply_to(self.sketch_image)
 
         if self.edit.enabled:
-            img = self.overlay.render(img, self.last_line)
+            img = self.overlay.render(img, self.sketch_image)
 
-        self.update_preview(img)
+        # az overlay mindig új tömböt ad → a nézet írhat bele (ecset)
+        self.update_preview(img, owned=self.edit.enabled)
 
     # ---------------- DISPLAY ----------------
-    def update_preview(self, img):
+    def update_preview(self, img, owned=False):
         if img is None:
             return
 
-        if len(img.shape) == 2:
-            h, w = img.shape
-            qimg = QImage(img.data, w, h, w, QImage.Format.Format_Grayscale8)
-        else:
-            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            qimg = QImage(rgb.data, w, h, ch * w, QImage.Format.Format_RGB888)
-
-        pixmap = QPixmap.fromImage(qimg)
-
-        scaled = pixmap.scaled(
-            int(w * self.zoom),
-            int(h * self.zoom),
-            Qt.AspectRatioMode.IgnoreAspectRatio,
-            Qt.TransformationMode.SmoothTransformation,
-        )
-
-        self.image_label.setPixmap(scaled)
-        self.image_label.resize(scaled.size())
-
-        # kép megjelenítésekor viewer mód
-        self.scroll.setWidgetResizable(False)
-        self.image_label.setSizePolicy(QSizePolicy.Policy.Fixed,
-                                       QSizePolicy.Policy.Fixed)
+        self.image_label.set_image(img, self.zoom, owned)
 
     # ---------------- SAVE ----------------
     def save_image(self):
@@ -807,6 +989,68 @@ class MainWindow(QMainWindow):
         if success:
             encoded.tofile(file_path)
 
+    # ---------------- VEKTOR EXPORT ----------------
+    EXPORT_FILTERS = {
+        "SVG (*.svg)": ".svg",
+        "DXF (*.dxf)": ".dxf",
+        "G-code (*.gcode *.nc)": ".gcode",
+    }
+
+    def export_vector(self):
+        if self.sketch_image is None:
+            return
+
+        file_path, chosen = QFileDialog.getSaveFileName(
+            self, tr("EXPORT_VECTOR_TITLE"), "", ";;".join(self.EXPORT_FILTERS)
+        )
+        if not file_path:
+            return
+
+        path = Path(file_path)
+        if not path.suffix:
+            path = path.with_suffix(self.EXPORT_FILTERS.get(chosen, ".svg"))
+
+        # lézer méretezés / G-code paraméterek: config.json
+        options = {}
+        if path.suffix.lower() in (".gcode", ".nc"):
+            options = dict(
+                feed=lang.get_setting("gcode_feed", 1500),
+                power=lang.get_setting("gcode_power", 1000),
+            )
+
+        sketch = self.sketch_image
+        params = self._vector_params()
+        workers = self.vectorizer.workers
+        mm_per_px = lang.get_setting("export_mm_per_px", 0.1)
+
+        # vágási sorrend: kevesebb üresjárat (a lézer bal alul indul)
+        optimizer = None
+        if lang.get_setting("optimize_travel", True):
+            optimizer = TravelOptimizer(
+                time_budget=lang.get_setting("travel_budget", 2.0),
+                start=(0, sketch.shape[0]),
+            )
+
+        # vektorizálás + sorrend a háttér szálon (másodpercekig is tarthat)
+        def job(cancel):
+            paths = Vectorizer(workers=workers).vectorize(sketch, **params)
+
+            if optimizer is not None:
+                if cancel():
+                    raise RenderCancelled()
+                paths = optimizer.optimize(paths)
+                print(optimizer.report())
+            return paths
+
+        def done(paths):
+            try:
+                export_paths(path, paths, sketch.shape, mm_per_px=mm_per_px, **options)
+            except (OSError, ValueError) as e:
+                print("export failed:", e)
+                QMessageBox.warning(self, tr("ERROR"), tr("ERROR_EXPORT"))
+
+        self._submit(job, done, busy=True)
+
     # --------------------------------------------------
     # EDIT: coordinate conversion
     # --------------------------------------------------
@@ -814,20 +1058,8 @@ class MainWindow(QMainWindow):
         if self.sketch_image is None:
             return None
 
-        # pozíció a labelen belül
-        lx = event.position().x()
-        ly = event.position().y()
-
-        # scroll offset hozzáadása
-        hbar = self.scroll.horizontalScrollBar().value()
-        vbar = self.scroll.verticalScrollBar().value()
-
-        lx += hbar
-        ly += vbar
-
-        # visszaskálázás képre
-        ix = lx / self.zoom
-        iy = ly / self.zoom
+        # nézőablak → kép (görgetés és zoom a nézet transzformációjában)
+        ix, iy = self.image_label.map_to_image(event.position())
 
         img_h, img_w = self.sketch_image.shape[:2]
 
@@ -848,24 +1080,50 @@ class MainWindow(QMainWindow):
             x, y = pos
             self._push_history()
             self.edit.begin_stroke()
-            self.edit.apply_at(x, y, self.last_line)
+            self.edit.stroke_to(x, y)
             self.overlay.set_cursor(x, y)
-            self.render_with_edit()
+            self._flush_edit()
 
     def image_mouse_move(self, event):
         pos = self.label_to_image(event)
         if pos:
             x, y = pos
             self.overlay.set_cursor(x, y)
+            if not self.edit.enabled:
+                return
 
             if event.buttons():
-                self.edit.apply_at(x, y, self.last_line)
-                self.render_with_edit()
+                self.edit.stroke_to(x, y)
+
+            # kurzor / hover és vonás képkockánként egyszer
+            if not self.edit_timer.isActive():
+                self.edit_timer.start()
+
+    def _flush_edit(self):
+        """
+        Ecset / vonal törlés: a várakozó vonás pontok egy festéssel, és
+        csak a változott téglalap készül újra (előző kurzor kör vagy hover
+        kiemelés + festett rész + az új)
+        """
+        if self.sketch_image is None:
+            return
+
+        rects = [self.edit.flush_stroke(self.sketch_image),
+                 self.overlay.dirty_rect(self.sketch_image.shape, self.sketch_image)]
+        rects = [r for r in rects if r is not None]
+        if not rects:
+            return
+
+        x0, y0, x1, y1 = zip(*rects)
+        self.render_with_edit((min(x0), min(y0), max(x1), max(y1)))
 
     def image_mouse_release(self, event):
         self.overlay.clear_cursor()
         if self.edit.enabled:
-            
+            # a még várakozó vonás pontok
+            self.edit_timer.stop()
+            self.edit.flush_stroke(self.sketch_image)
+
             self.sketch_image = self.edit.apply_to(self.sketch_image)
         self.overlay.clear_cursor()
         self.render_with_edit()
@@ -877,13 +1135,18 @@ class MainWindow(QMainWindow):
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
             factor = 1.1 if delta > 0 else 0.9
             self.zoom = max(self.zoom_min, min(self.zoom_max, self.zoom * factor))
-            self.render_with_edit()
+
+            # a kép nem változott: csak a megjelenítés mérete
+            if self.image_label.tiles.image is not None:
+                self.image_label.set_zoom(self.zoom)
+            else:
+                self.render_with_edit()
             return
 
-        # normál görgő = ecset méret
+        # normál görgő = ecset méret (csak a kurzor kör rajzolódik újra)
         size = self.edit.brush.size + (1 if delta > 0 else -1)
         self.edit.brush.set_size(size)
-        self.render_with_edit()
+        self._flush_edit()
 
     # --------------------------------------------------
     # HISTORY SAVE
@@ -898,6 +1161,9 @@ class MainWindow(QMainWindow):
     # --------------------------------------------------
     def keyPressEvent(self, event):
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            if event.key() in (Qt.Key.Key_Z, Qt.Key.Key_Y):
+                self._cancel_busy_job()
+
             if event.key() == Qt.Key.Key_Z:
                 img = self.history.undo(self.sketch_image)
                 if img is not None:
@@ -917,8 +1183,12 @@ class MainWindow(QMainWindow):
 
         super().keyPressEvent(event)
 
+    def closeEvent(self, event):
+        self.render_worker.shutdown()
+        super().closeEvent(event)
+
     def fit_to_view(self, img_w, img_h):
-        view = self.scroll.viewport().size()
+        view = self.image_label.viewport().size()
 
         if view.width() == 0 or view.height() == 0:
             return 1.0
@@ -941,7 +1211,7 @@ class MainWindow(QMainWindow):
 
         # 0..100 -> belső értékek
         self.vectorizer.min_length = 2 + (100 - d) * 0.25
-        self.vectorizer.merge_dist = 1 + m * 0.08
+        self.vectorizer.merge_dist = 1 + m * 0.08 if m > 0 else 0.0
         self.vectorizer.epsilon = 0.5 + s * 0.04
 
 # ---------------- RUN ----------------
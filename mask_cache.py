@@ -0,0 +1,133 @@
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+class MaskCache:
+    """
+    AI maszk cache (U2Net nyers 320×320 kimenet).
+
+    Kulcs: a hálózat tényleges bemenetének (320×320 kép) blake2b hash-e
+    + modell név + eredeti kép méret → különböző képek nem ütközhetnek,
+    ugyanaz a kép újranyitva / újra futtatott batch-ben találat.
+
+    - memóriában 'entries' darab, LRU
+    - cache_dir megadásakor lemezre is (.npy), a 'disk_mb' keretig
+      (a legrégebbi fájlok törlődnek)
+    """
+
+    def __init__(self, entries=16, cache_dir=None, disk_mb=256):
+        self.entries = max(1, int(entries))
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.disk_budget = int(disk_mb) * 1024 * 1024
+
+        self._items = OrderedDict()
+
+    @staticmethod
+    def key(net_input, model, shape):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(model.encode("utf-8"))
+        h.update(repr((net_input.shape, str(net_input.dtype), tuple(shape[:2]))).encode())
+        h.update(np.ascontiguousarray(net_input).data)
+        return h.hexdigest()
+
+    def clear(self):
+        self._items.clear()
+
+    # --------------------------------------------------
+    # LEKÉRÉS / TÁROLÁS
+    # --------------------------------------------------
+    def get(self, key):
+        pred = self._items.get(key)
+        if pred is not None:
+            self._items.move_to_end(key)
+            return pred
+
+        pred = self._load(key)
+        if pred is not None:
+            self._remember(key, pred)
+        return pred
+
+    def put(self, key, pred):
+        pred = np.ascontiguousarray(pred, dtype=np.float32)
+        pred.flags.writeable = False
+
+        self._remember(key, pred)
+        self._store(key, pred)
+
+    def _remember(self, key, pred):
+        self._items[key] = pred
+        self._items.move_to_end(key)
+
+        while len(self._items) > self.entries:
+            self._items.popitem(last=False)
+
+    # --------------------------------------------------
+    # LEMEZ
+    # --------------------------------------------------
+    def _path(self, key):
+        return self.cache_dir / f"{key}.npy"
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            pred = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+        # lemezen is LRU: a használt fájl friss marad
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        pred.flags.writeable = False
+        return pred
+
+    def _store(self, key, pred):
+        if self.cache_dir is None:
+            return
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            # atomikus csere (több batch processz is írhat egyszerre)
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, pred)
+            os.replace(tmp, path)
+
+            self._prune_disk()
+        except OSError as e:
+            print(f"[mask cache] write failed: {e}")
+
+    def _prune_disk(self):
+        files = []
+        for p in self.cache_dir.glob("*.npy"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in files)
+        files.sort()
+
+        for _, size, p in files:
+            if total <= self.disk_budget:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
@@ -1,6 +1,9 @@
 from pathlib import Path
+import numpy as np
 import onnxruntime as ort
 import sys
+import threading
+import time
 
 APP_NAME = "LaserBaseSketch"
 
@@ -20,13 +23,53 @@ def get_app_dir():
 
 MODEL_DIR = get_app_dir() / "models"
 
+# optimalizált (szerializált) modellek helye
+CACHE_DIR = get_app_dir() / "cache"
+
+OPT_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+# U2Net bemenet (a nem rögzített dimenziók helyére)
+WARMUP_SHAPE = (1, 3, 320, 320)
+
+# modell pontosság változatok
+#   fp32: az eredeti fájl
+#   int8: dinamikusan kvantált (models/<név>.int8.onnx, ha mellékelve van,
+#         különben helyben készül a cache mappába – ehhez kell az 'onnx' csomag)
+PRECISIONS = ("fp32", "int8")
+
 
 # ---------------------------------------------------------
 # Model Manager
 # ---------------------------------------------------------
 class ModelManager:
-    def __init__(self):
+    """
+    ONNX sessionök betöltése és cache-elése.
+
+    intra_threads / inter_threads: 0 = onnxruntime alapértelmezés
+    opt_level: "disable" | "basic" | "extended" | "all"
+    cache_dir: ide kerül az optimalizált modell (None = nincs cache),
+               a következő indítás már ezt tölti be optimalizálás nélkül
+    precision: alapértelmezett változat (PRECISIONS), get()-ben felülírható
+    """
+
+    def __init__(self, intra_threads=0, inter_threads=0,
+                 opt_level="all", cache_dir=CACHE_DIR, precision="fp32"):
+        # (név, pontosság) → session
         self.sessions = {}
+        self.precision = precision if precision in PRECISIONS else "fp32"
+
+        self.intra_threads = int(intra_threads)
+        self.inter_threads = int(inter_threads)
+        self.opt_level = opt_level if opt_level in OPT_LEVELS else "all"
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        # a render szál és a bemelegítő szál egyszerre kérheti
+        self._lock = threading.Lock()
 
         # Megjelenő név → fájlnév
         self.registry = {
@@ -47,6 +90,11 @@ class ModelManager:
         source = MODEL_DIR / filename
 
         if not source.exists():
+            # üzenetablak csak a GUI szálról
+            if threading.current_thread() is not threading.main_thread():
+                print(f"[model] missing model file: {source}")
+                return None
+
             from PyQt6.QtWidgets import QMessageBox
             QMessageBox.critical(None, "Hiányzó fájl",
                              f"Az AI modell nem található:\n{source}\n\n"
@@ -58,23 +106,177 @@ class ModelManager:
     # -----------------------------------------------------
     # Session lekérése (cache-elve)
     # -----------------------------------------------------
-    def get(self, name):
+    def get(self, name, precision=None):
         if name is None:
             return None
 
+        key = (name, precision or self.precision)
+
         # már betöltve
-        if name in self.sessions:
-            return self.sessions[name]
+        session = self.sessions.get(key)
+        if session is not None:
+            return session
+
+        with self._lock:
+            if key in self.sessions:
+                return self.sessions[key]
+
+            model_path = self._variant_path(name, key[1])
+            if model_path is None:
+                return None
+
+            t0 = time.perf_counter()
+            session = self._create_session(model_path)
+            print(f"[model] {name} ({key[1]}): session ready in "
+                  f"{time.perf_counter() - t0:.2f} s")
+
+            self.sessions[key] = session
+            return session
+
+    def variant_id(self, name, precision=None):
+        """Cache kulcsokhoz: a modell + pontosság azonosítója"""
+        precision = precision or self.precision
+        return name if precision == "fp32" else f"{name}@{precision}"
+
+    # -----------------------------------------------------
+    # Pontosság változatok
+    # -----------------------------------------------------
+    def _variant_path(self, name, precision):
+        source = self._ensure_model(name)
+        if source is None or precision == "fp32":
+            return source
+
+        if precision not in PRECISIONS:
+            print(f"[model] unknown precision '{precision}', using fp32")
+            return source
+
+        # mellékelt változat
+        bundled = source.with_name(f"{source.stem}.{precision}.onnx")
+        if bundled.exists():
+            return bundled
+
+        # helyben készített változat
+        local = self._quantized_path(source, precision)
+        if local.exists() and local.stat().st_mtime >= source.stat().st_mtime:
+            return local
+
+        try:
+            self._quantize(source, local)
+        except Exception as e:
+            print(f"[model] {precision} build failed ({e}), using fp32")
+            return source
+
+        return local
 
-        model_path = self._ensure_model(name)
-        if model_path is None:
+    def _quantized_path(self, source, precision):
+        folder = self.cache_dir or source.parent
+        return folder / f"{source.stem}.{precision}.onnx"
+
+    def _quantize(self, source, target):
+        # opcionális függőség (onnx), csak itt kell
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp.onnx")
+
+        t0 = time.perf_counter()
+        # konvolúciós hálóhoz az előjel nélküli súly a stabil (ConvInteger)
+        quantize_dynamic(str(source), str(tmp), weight_type=QuantType.QUInt8)
+        tmp.replace(target)
+
+        print(f"[model] quantized {source.name} -> {target} "
+              f"in {time.perf_counter() - t0:.1f} s")
+
+    def prepare(self, name, precision=None):
+        """A változat fájl elkészítése előre (pl. batch indítás előtt)"""
+        return self._variant_path(name, precision or self.precision)
+
+    # -----------------------------------------------------
+    # Session beállítások + optimalizált modell cache
+    # -----------------------------------------------------
+    def _cache_path(self, model_path):
+        if self.cache_dir is None:
             return None
 
-        # ONNX session létrehozás
-        session = ort.InferenceSession(
-            str(model_path),
-            providers=["CPUExecutionProvider"]
+        # onnxruntime verziónként és szintenként más lehet az eredmény
+        return self.cache_dir / (
+            f"{model_path.stem}.{self.opt_level}.ort{ort.__version__}.onnx"
         )
 
-        self.sessions[name] = session
-        return session
+    def _session_options(self):
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = self.intra_threads
+        opts.inter_op_num_threads = self.inter_threads
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = OPT_LEVELS[self.opt_level]
+        return opts
+
+    def _create_session(self, model_path):
+        providers = ["CPUExecutionProvider"]
+        cached = self._cache_path(model_path)
+
+        # friss cache → betöltés újraoptimalizálás nélkül
+        if cached is not None and cached.exists() \
+                and cached.stat().st_mtime >= model_path.stat().st_mtime:
+            opts = self._session_options()
+            opts.graph_optimization_level = OPT_LEVELS["disable"]
+            try:
+                return ort.InferenceSession(str(cached), opts, providers=providers)
+            except Exception as e:
+                print(f"[model] ignoring broken cache {cached}: {e}")
+
+        opts = self._session_options()
+        if cached is not None and self.opt_level != "disable":
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                opts.optimized_model_filepath = str(cached)
+            except OSError:
+                pass
+
+        return ort.InferenceSession(str(model_path), opts, providers=providers)
+
+    # -----------------------------------------------------
+    # Bemelegítés (háttérben, indításkor)
+    # -----------------------------------------------------
+    def warm_up(self, name, background=True, precision=None):
+        """
+        Session létrehozás + egy üres 320×320 futtatás, hogy az első
+        maszkos render ne a betöltésre várjon.
+        """
+        if name not in self.registry or not (MODEL_DIR / self.registry[name]).exists():
+            return None
+
+        if not background:
+            self._warm_up(name, precision)
+            return None
+
+        thread = threading.Thread(
+            target=self._warm_up, args=(name, precision), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _warm_up(self, name, precision=None):
+        t0 = time.perf_counter()
+        session = self.get(name, precision)
+        if session is None:
+            return
+        t_load = time.perf_counter() - t0
+
+        inp = session.get_inputs()[0]
+        shape = [
+            d if isinstance(d, int) and d > 0 else WARMUP_SHAPE[i]
+            for i, d in enumerate(inp.shape)
+        ]
+        dummy = np.zeros(shape, np.float32)
+
+        t0 = time.perf_counter()
+        session.run(None, {inp.name: dummy})
+        t_cold = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        session.run(None, {inp.name: dummy})
+        t_warm = time.perf_counter() - t0
+
+        print(f"[model] {name} warm-up: load {t_load:.2f} s, "
+              f"first run {t_cold * 1000:.0f} ms, warm run {t_warm * 1000:.0f} ms")
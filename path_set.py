@@ -0,0 +1,220 @@
+import cv2
+import numpy as np
+
+
+class PathSet:
+    """
+    Vektoros útvonalak egyetlen tömbben.
+
+    points:  N×2 int32 (x, y), minden útvonal pontja egymás után
+    offsets: M+1 int64, az i. útvonal = points[offsets[i]:offsets[i + 1]]
+
+    Az útvonalak nézetek (nincs másolás) → közvetlenül mehetnek a
+    cv2.polylines-nak és az exportálóknak.
+    """
+
+    def __init__(self, points=None, offsets=None):
+        if points is None:
+            points = np.empty((0, 2), np.int32)
+        if offsets is None:
+            offsets = np.zeros(1, np.int64)
+
+        self.points = np.ascontiguousarray(points, dtype=np.int32).reshape(-1, 2)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    # --------------------------------------------------
+    # LÉTREHOZÁS
+    # --------------------------------------------------
+    @classmethod
+    def from_paths(cls, paths):
+        """Tömbök vagy (x, y) listák listájából"""
+        arrays = [np.asarray(p, np.int32).reshape(-1, 2) for p in paths]
+        return cls.concat_arrays(arrays)
+
+    @classmethod
+    def concat_arrays(cls, arrays):
+        offsets = np.zeros(len(arrays) + 1, np.int64)
+        if arrays:
+            np.cumsum([len(a) for a in arrays], out=offsets[1:])
+            points = np.concatenate(arrays) if offsets[-1] else None
+        else:
+            points = None
+        return cls(points, offsets)
+
+    @classmethod
+    def concat(cls, sets):
+        """PathSet-ek egymás után (útvonalanként másolás nélkül)"""
+        offsets = np.zeros(sum(len(s) for s in sets) + 1, np.int64)
+        if len(offsets) > 1:
+            np.cumsum(np.concatenate([s.counts() for s in sets]), out=offsets[1:])
+        points = np.concatenate([s.points for s in sets]) if sets else None
+        return cls(points, offsets)
+
+    @classmethod
+    def gather(cls, points, starts, counts, closed=None):
+        """
+        Útvonalak egy forrás tömb szakaszaiból, Python ciklus nélkül:
+        az i. útvonal = points[starts[i]:starts[i] + counts[i]]
+
+        closed[i] esetén a kezdőpont a végén megismétlődik (zárt gyűrű)
+        """
+        starts = np.asarray(starts, np.int64)
+        counts = np.asarray(counts, np.int64)
+
+        keep = counts > 0
+        starts, counts = starts[keep], counts[keep]
+        if closed is None:
+            closed = np.zeros(len(counts), bool)
+        else:
+            closed = np.asarray(closed, bool)[keep]
+
+        sizes = np.zeros(len(keep), np.int64)
+        sizes[keep] = counts + closed
+        offsets = np.zeros(len(keep) + 1, np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        if offsets[-1] == 0:
+            return cls(None, offsets)
+
+        # forrás index = futó összeg: útvonalon belül +1 lépés,
+        # útvonal elején ugrás az előző útvonal utolsó indexétől
+        last = np.where(closed, starts, starts + counts - 1)
+
+        step = np.ones(offsets[-1], np.int64)
+        heads = offsets[:-1][keep]
+        step[heads[0]] = starts[0]
+        step[heads[1:]] = starts[1:] - last[:-1]
+
+        # zárópont: vissza a kezdőpontra
+        step[offsets[1:][keep][closed] - 1] = 1 - counts[closed]
+
+        return cls(points[np.cumsum(step)], offsets)
+
+    # --------------------------------------------------
+    # ELÉRÉS
+    # --------------------------------------------------
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return self.points[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        pts = self.points
+        bounds = self.offsets.tolist()
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            yield pts[a:b]
+
+    @property
+    def nbytes(self):
+        return self.points.nbytes + self.offsets.nbytes
+
+    @property
+    def total_points(self):
+        return int(self.offsets[-1])
+
+    def polylines(self):
+        """cv2.polylines / fillPoly bemenet: (n, 1, 2) nézetek"""
+        return [p.reshape(-1, 1, 2) for p in self]
+
+    def to_lists(self):
+        """(x, y) tuple listák (régi formátum)"""
+        return [list(map(tuple, p.tolist())) for p in self]
+
+    # --------------------------------------------------
+    # VEKTORIZÁLT MŰVELETEK
+    # --------------------------------------------------
+    def counts(self):
+        """pontok száma útvonalanként"""
+        return np.diff(self.offsets)
+
+    def lengths(self):
+        """ívhossz útvonalanként (pixel)"""
+        n = len(self)
+        if n == 0 or self.total_points == 0:
+            return np.zeros(n)
+
+        seg = np.diff(self.points.astype(np.float64), axis=0)
+        seg = np.hypot(seg[:, 0], seg[:, 1])
+
+        # útvonalak közötti "szakaszok" kinullázva
+        cross = self.offsets[1:-1]
+        seg[cross[(cross > 0) & (cross < len(self.points))] - 1] = 0.0
+        seg = np.append(seg, 0.0)
+
+        out = np.zeros(n)
+        nonempty = self.counts() > 0
+        out[nonempty] = np.add.reduceat(seg, self.offsets[:-1][nonempty])
+        return out
+
+    def bboxes(self):
+        """N×4 (x0, y0, x1, y1) útvonalanként (üres útvonalnál 0)"""
+        out = np.zeros((len(self), 4), np.int32)
+        nonempty = self.counts() > 0
+        if not nonempty.any():
+            return out
+
+        starts = self.offsets[:-1][nonempty]
+        out[nonempty, 0:2] = np.minimum.reduceat(self.points, starts)
+        out[nonempty, 2:4] = np.maximum.reduceat(self.points, starts)
+        return out
+
+    def endpoints(self):
+        """(eleje, vége) N×2 tömbök (üres útvonalnál 0)"""
+        first = np.zeros((len(self), 2), np.int32)
+        last = np.zeros((len(self), 2), np.int32)
+        nonempty = self.counts() > 0
+        if nonempty.any():
+            first[nonempty] = self.points[self.offsets[:-1][nonempty]]
+            last[nonempty] = self.points[self.offsets[1:][nonempty] - 1]
+        return first, last
+
+    def closed(self):
+        first, last = self.endpoints()
+        return (self.counts() > 2) & (first == last).all(1)
+
+    def select(self, index):
+        """Útvonalak kiválasztása (bool maszk vagy index lista)"""
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+
+        return PathSet.gather(self.points, self.offsets[index], self.counts()[index])
+
+    def reordered(self, order, reverse=None):
+        """
+        Útvonalak új sorrendben; reverse[i] esetén az i. (új) útvonal
+        fordított irányú. Python ciklus nélkül.
+        """
+        order = np.asarray(order, np.int64)
+        counts = self.counts()[order]
+
+        offsets = np.zeros(len(order) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        local = np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1], counts)
+        if reverse is not None:
+            rev = np.repeat(np.asarray(reverse, bool), counts)
+            local[rev] = np.repeat(counts - 1, counts)[rev] - local[rev]
+
+        index = np.repeat(self.offsets[order], counts) + local
+        return PathSet(self.points[index], offsets)
+
+    def simplify(self, epsilon):
+        """
+        Douglas–Peucker útvonalanként (2 pontos útvonal változatlan).
+
+        Kivétel a tömbös műveletek között: útvonalanként egy
+        cv2.approxPolyDP hívás (Python ciklus), az eredmény egy
+        concatenate-tel kerül vissza egy tömbbe.
+        """
+        counts = self.counts()
+        out = []
+        for p, n in zip(self, counts.tolist()):
+            if n <= 2:
+                out.append(p)
+            else:
+                out.append(cv2.approxPolyDP(p.reshape(-1, 1, 2), epsilon, False).reshape(-1, 2))
+        return PathSet.concat_arrays(out)
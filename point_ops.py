@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+
+
+class PointOp:
+    """
+    uint8 → uint8 pontművelet egy 256 elemes táblával.
+
+    Minden pixelenkénti művelet (gamma, kontraszt / fényerő, csonkolás,
+    küszöb, kvantálás, invertálás) egy táblává fűzhető össze, és egyetlen
+    cv2.LUT menettel fut le – nincs float32 köztes kép.
+
+    A táblák az eredeti művelettel készülnek a 0..255 rámpán, így
+    az eredmény bitre megegyezik a láncolt hívásokéval.
+    """
+
+    def __init__(self, lut=None):
+        if lut is None:
+            lut = np.arange(256, dtype=np.uint8)
+        self.lut = lut
+
+    @classmethod
+    def from_func(cls, fn):
+        """fn: uint8 tömb → uint8 tömb (pixelenként független)"""
+        ramp = np.arange(256, dtype=np.uint8).reshape(1, 256)
+        out = np.asarray(fn(ramp)).reshape(256)
+        return cls(out.astype(np.uint8))
+
+    # --------------------------------------------------
+    # LÁNCOLÁS / ALKALMAZÁS
+    # --------------------------------------------------
+    def then(self, other):
+        """előbb self, utána other"""
+        return PointOp(other.lut[self.lut])
+
+    @property
+    def is_identity(self):
+        return np.array_equal(self.lut, np.arange(256, dtype=np.uint8))
+
+    def apply(self, img):
+        return cv2.LUT(img, self.lut)
+
+    # --------------------------------------------------
+    # MŰVELETEK
+    # --------------------------------------------------
+    @classmethod
+    def gamma(cls, g):
+        def fn(x):
+            v = np.power(x.astype(np.float32) / 255.0, g)
+            return (v * 255).astype(np.uint8)
+        return cls.from_func(fn)
+
+    @classmethod
+    def linear(cls, alpha, beta=0):
+        """cv2.convertScaleAbs: |x * alpha + beta| telítve"""
+        return cls.from_func(lambda x: cv2.convertScaleAbs(x, alpha=alpha, beta=beta))
+
+    @classmethod
+    def trunc(cls, thresh):
+        """cv2.THRESH_TRUNC"""
+        return cls.from_func(
+            lambda x: cv2.threshold(x, thresh, 255, cv2.THRESH_TRUNC)[1]
+        )
+
+    @classmethod
+    def threshold(cls, thresh, maxval=255):
+        """cv2.THRESH_BINARY"""
+        return cls.from_func(
+            lambda x: cv2.threshold(x, thresh, maxval, cv2.THRESH_BINARY)[1]
+        )
+
+    @classmethod
+    def quantize(cls, levels):
+        """tónus síkok (floor a 0..1 tartományban)"""
+        def fn(x):
+            v = x.astype(np.float32) / 255.0
+            v = np.floor(v * levels) / levels
+            return (v * 255).astype(np.uint8)
+        return cls.from_func(fn)
+
+    @classmethod
+    def invert(cls):
+        return cls.from_func(lambda x: 255 - x)
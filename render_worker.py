@@ -0,0 +1,89 @@
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from image_processor import RenderCancelled
+
+
+class RenderWorker(QObject):
+    """
+    Háttér szál a rendereléshez.
+
+    - egyszerre egy várakozó feladat van: az új kérés felülírja a régit
+    - a futó feladat a lépések között megszakad, ha újabb kérés jött
+    - csak a legfrissebb feladat eredménye jut vissza (finished jel,
+      a GUI szálon érkezik); kivétel esetén failed jel a hibaüzenettel
+
+    A feladat egy függvény: job(cancel) → eredmény, ahol cancel()
+    True-t ad, ha a feladat már elavult.
+    """
+
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._latest = 0
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    # --------------------------------------------------
+    # PUBLIC
+    # --------------------------------------------------
+    def submit(self, job):
+        """Új feladat; a korábbi (várakozó vagy futó) elavul. → job id"""
+        with self._cond:
+            self._latest += 1
+            self._pending = (self._latest, job)
+            self._cond.notify()
+            return self._latest
+
+    def is_stale(self, job_id):
+        return job_id != self._latest
+
+    def cancel(self):
+        """Minden várakozó / futó feladat eldobása"""
+        with self._cond:
+            self._latest += 1
+            self._pending = None
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._latest += 1
+            self._pending = None
+            self._cond.notify()
+
+    # --------------------------------------------------
+    # HÁTTÉR SZÁL
+    # --------------------------------------------------
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+
+                if self._stopped:
+                    return
+
+                job_id, job = self._pending
+                self._pending = None
+
+            try:
+                result = job(lambda: self.is_stale(job_id))
+            except RenderCancelled:
+                continue
+            except Exception as e:
+                traceback.print_exc()
+                if not self.is_stale(job_id):
+                    self.failed.emit(job_id, f"{type(e).__name__}: {e}")
+                continue
+
+            if not self.is_stale(job_id):
+                self.finished.emit(job_id, result)
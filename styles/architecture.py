@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+from point_ops import PointOp
 from .base import SketchStyle
 
 
@@ -9,22 +10,21 @@ class ArchitectureStyle(SketchStyle):
 
     def generate(self, gray, detail, strength):
 
+        fb = self.p.features(gray)
+
         # --------------------------------------------------
         # 1) TEXTÚRA ELTÁVOLÍTÁS (fal, tégla, vakolat)
         # --------------------------------------------------
-        smooth = cv2.bilateralFilter(gray, 11, 60, 60)
-        smooth = cv2.GaussianBlur(smooth, (0, 0), 1.5)
+        smooth = self.p.features(fb.bilateral(11, 60, 60)).blur(1.5)
 
         # --------------------------------------------------
         # 2) TÓNUS (lapos felületek)
         # --------------------------------------------------
-        tone = self.p.tone_sketch(smooth.astype(np.uint8), detail, strength)
-
-        # tónus kvantálás (rajzos síkok)
+        # tónus kvantálás (rajzos síkok) – a tone_sketch kimeneti táblájába fűzve
         levels = 6 + int(detail / 20)
-        tone = (tone.astype(np.float32) / 255.0)
-        tone = np.floor(tone * levels) / levels
-        tone = (tone * 255).astype(np.uint8)
+        tone = self.p.tone_sketch(
+            smooth, detail, strength, post=PointOp.quantize(levels)
+        )
 
         # --------------------------------------------------
         # 3) ÉLEK (geometriai él prioritás)
@@ -34,9 +34,9 @@ class ArchitectureStyle(SketchStyle):
         # --------------------------------------------------
         # 4) EGYENESEK KIEMELÉSE (Hough)
         # --------------------------------------------------
-        canny = cv2.Canny(smooth, 60, 140)
-        lines = cv2.HoughLinesP(canny, 1, np.pi/180, 60,
-                                minLineLength=40, maxLineGap=10)
+        lines = self.p.features(smooth).memo(
+            ("hough",), lambda: self._hough(smooth)
+        )
 
         if lines is not None:
             for l in lines:
@@ -46,8 +46,12 @@ class ArchitectureStyle(SketchStyle):
         # --------------------------------------------------
         # 5) APRÓ ÉL TÖRLÉS
         # --------------------------------------------------
-        small = cv2.Laplacian(gray, cv2.CV_32F)
-        small = cv2.convertScaleAbs(small)
+        small = fb.laplacian()
         edges[small < 14] = 0
 
         return tone, edges
+
+    def _hough(self, smooth):
+        canny = cv2.Canny(smooth, 60, 140)
+        return cv2.HoughLinesP(canny, 1, np.pi/180, 60,
+                               minLineLength=40, maxLineGap=10)
@@ -9,11 +9,12 @@ class EngraveStyle(SketchStyle):
 
     def generate(self, gray, detail, strength):
 
+        fb = self.p.features(gray)
+
         # --------------------------------------------------
         # 1) ERŐS SIMÍTÁS (zaj tiltva)
         # --------------------------------------------------
-        smooth = cv2.bilateralFilter(gray, 9, 70, 70)
-        smooth = cv2.GaussianBlur(smooth, (0, 0), 2)
+        smooth = self.p.features(fb.bilateral(9, 70, 70)).blur(2)
 
         # --------------------------------------------------
         # 2) BINÁRIS TÓNUS (nem szürke!)
@@ -41,9 +42,7 @@ class EngraveStyle(SketchStyle):
         edges = self.p.line_sketch(smooth, detail, strength)
 
         # csak nagy élek maradjanak
-        big = cv2.GaussianBlur(gray, (0,0), 4)
-        big_grad = cv2.Laplacian(big, cv2.CV_32F)
-        big_grad = cv2.convertScaleAbs(big_grad)
+        big_grad = self.p.features(fb.blur(4)).laplacian()
         edges[big_grad < 18] = 0
 
         # kontúr vastagítás
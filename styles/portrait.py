@@ -9,6 +9,8 @@ class PortraitStyle(SketchStyle):
 
     def generate(self, gray, detail, strength):
 
+        fb = self.p.features(gray)
+
         # --------------------------------------------------
         # 1) BŐR SIMÍTÁS (strukturális blur, nem sima blur)
         # --------------------------------------------------
@@ -33,7 +35,7 @@ class PortraitStyle(SketchStyle):
         # --------------------------------------------------
         # 3) FONTOS ÉLEK (nem minden él!)
         # --------------------------------------------------
-        structure = cv2.bilateralFilter(gray, 7, 25, 25)
+        structure = fb.bilateral(7, 25, 25)
 
         edges = self.p.line_sketch(structure, detail, strength)
 
@@ -47,8 +49,7 @@ class PortraitStyle(SketchStyle):
         # 5) SZEM + SZÁJ KONTRASZT KIEMELÉS
         # (lokális kontraszt → arc élőbb lesz)
         # --------------------------------------------------
-        lap = cv2.Laplacian(gray, cv2.CV_32F)
-        lap = cv2.convertScaleAbs(lap)
+        lap = fb.laplacian()
 
         focus = lap > 18
         edges[focus] = np.clip(edges[focus] * 1.25, 0, 255)
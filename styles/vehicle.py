@@ -9,52 +9,53 @@ class VehicleStyle(SketchStyle):
 
     def generate(self, gray, detail, strength):
 
+        fb = self.p.features(gray)
+
         # --------------------------------------------------
         # 1) KAROSSZÉRIA SIMÍTÁS (fényes felület)
         # --------------------------------------------------
-        body = cv2.bilateralFilter(gray, 9, 55, 55)
-        body = cv2.GaussianBlur(body, (0, 0), 1.2)
-
-        # apró textúra csökkentés
-        texture = cv2.subtract(gray, body)
-        body = (
-            cv2.add(body.astype("float32"), (texture.astype("float32") * 0.25))
-            .clip(0, 255)
-            .astype("uint8")
-        )
+        body = fb.memo(("vehicle_body",), lambda: self._body(fb))
 
         # --------------------------------------------------
         # 2) TÓNUS
         # --------------------------------------------------
-        tone = self.p.tone_sketch(body.astype(np.uint8), detail, strength)
+        tone = self.p.tone_sketch(body, detail, strength)
 
         # ablakok sötétítése (tipikus jármű jelleg)
-        dark = cv2.GaussianBlur(gray, (0, 0), 4)
+        dark = fb.blur(4)
         window_mask = dark < 85
         tone[window_mask] = tone[window_mask] * 0.7
 
         # --------------------------------------------------
         # 3) STRUKTURÁLT ÉLEK
         # --------------------------------------------------
-        structure = cv2.bilateralFilter(gray, 7, 35, 35)
+        structure = fb.bilateral(7, 35, 35)
         edges = self.p.line_sketch(structure, detail, strength)
 
         # --------------------------------------------------
         # 4) APRÓ RÁCS / ZAJ ELTÁVOLÍTÁS
         # --------------------------------------------------
-        small = cv2.Laplacian(gray, cv2.CV_32F)
-        small = cv2.convertScaleAbs(small)
+        small = fb.laplacian()
         edges[small < 14] = 0
 
         # --------------------------------------------------
         # 5) JELLEGZETES RÉSZEK KIEMELÉSE
         # kerekek + lámpák
         # --------------------------------------------------
-        big = cv2.GaussianBlur(gray, (0, 0), 3)
-        big_grad = cv2.Laplacian(big, cv2.CV_32F)
-        big_grad = cv2.convertScaleAbs(big_grad)
+        big_grad = self.p.features(fb.blur(3)).laplacian()
 
         focus = big_grad > 18
         edges[focus] = np.clip(edges[focus] * 1.35, 0, 255)
 
         return tone, edges
+
+    def _body(self, fb):
+        body = self.p.features(fb.bilateral(9, 55, 55)).blur(1.2)
+
+        # apró textúra csökkentés
+        texture = cv2.subtract(fb.gray, body)
+        return (
+            cv2.add(body.astype("float32"), (texture.astype("float32") * 0.25))
+            .clip(0, 255)
+            .astype("uint8")
+        )
@@ -0,0 +1,269 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from fast_blur import ALIGN
+
+
+class TiledRenderer:
+    """
+    Natív felbontású render csempékre bontva.
+
+    - minden csempe átfedő szegéllyel (halo) fut, ami lefedi az összes
+      egymásra épülő szűrő sugarát → a csempe belseje megegyezik azzal,
+      mintha az egész kép egyben futott volna
+    - a globális min/max normalizálásokat és a "lapos kép" döntést egy
+      kicsinyített proxy képen rögzítjük, a csempék ezt játsszák vissza
+      (különben minden csempe más kontrasztot kapna → varrat)
+    - a csempe mérete a memória keretből és a szálak számából adódik,
+      a kép méretétől független
+    - a csempe oldal és a szegély a fast_blur piramis rácsához igazodik
+      (ALIGN), így a közelítő blur is ugyanúgy mintavételez, mint egyben
+    - szálanként egy processzor, a jellemző térképei csempénként törlődnek
+      (a processzor ↔ stílus kör miatt különben csak a gc szabadítaná fel)
+    """
+
+    # becsült munkamemória / csempe pixel (line_sketch float32 köztes tömbjei)
+    BYTES_PER_PIXEL = 96
+
+    # globális statisztikák legfeljebb ennyi pixeles proxy képen készülnek
+    STATS_SIDE = 1600
+
+    MIN_TILE = 256
+
+    def __init__(self, processor, budget_mb=1024, workers=None):
+        self.p = processor
+        self.budget = int(budget_mb) * 1024 * 1024
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+    # --------------------------------------------------
+    # SZEGÉLY MÉRET
+    # --------------------------------------------------
+    def halo(self, shape, detail, clean):
+        """
+        Az egymás után futó lépések kernel sugarainak összege.
+        (8 bites GaussianBlur sugara: 3 * sigma)
+        """
+        # auto_prep: reconstruct_tone sigma 35 (a maszk sigma 5 ennél kisebb)
+        prep = 3 * 35
+
+        # line_sketch: fény sigma 25, Sobel 9, szög 9x9, mag blur, 31x31 variancia,
+        # vastagítás
+        line = 3 * 25 + 4 + 4 + 4 + 15 + 8
+
+        # tone_sketch: a blur a teljes kép átlójához skálázódik
+        tone = self.p._tone_blur_size(shape, detail) // 2
+
+        # stílusok előszűrői (bilateral, adaptív küszöb, Laplace, morfológia)
+        style = 32
+
+        # háttér tisztítás bilateral szűrője
+        smooth = 0
+        if clean > 0:
+            smooth = int(round((2 + clean * 0.25) * 1.5)) + 1
+
+        return _align(prep + max(line, tone) + style + smooth)
+
+    # --------------------------------------------------
+    # CSEMPE MÉRET (memória keretből)
+    # --------------------------------------------------
+    def plan(self, shape, halo):
+        """
+        Visszatérés: (csempe oldal, szálak száma)
+        Egyszerre 'workers' csempe van a memóriában.
+        """
+        h, w = shape[:2]
+        workers = self.workers
+
+        while True:
+            per_tile = self.budget / workers / self.BYTES_PER_PIXEL
+            side = int(per_tile ** 0.5) - 2 * halo
+
+            if side >= self.MIN_TILE or workers == 1:
+                break
+            workers -= 1
+
+        side = _align(max(self.MIN_TILE, side))
+        side = min(side, max(h, w))
+
+        return side, workers
+
+    def tiles(self, shape, side):
+        h, w = shape[:2]
+        for y in range(0, h, side):
+            for x in range(0, w, side):
+                yield x, y, min(x + side, w), min(y + side, h)
+
+    # --------------------------------------------------
+    # GLOBÁLIS STATISZTIKÁK
+    # --------------------------------------------------
+    def _record_stats(self, img, mask_small, detail, strength):
+        proc = self._tile_processor()
+
+        # a proxy render is a kereten belül maradjon (kis keretnél kisebb proxy)
+        side = min(self.STATS_SIDE, int((self.budget / self.BYTES_PER_PIXEL) ** 0.5))
+        small, _ = proc._resize_for_processing(img, side)
+
+        # a maszk STATS_SIDE méretű, a proxy ennél kisebb is lehet
+        if mask_small is not None and mask_small.shape[:2] != small.shape[:2]:
+            mask_small = cv2.resize(mask_small, small.shape[1::-1],
+                                    interpolation=cv2.INTER_NEAREST)
+
+        proc._stats_record = []
+        gray = proc.auto_prep(small, mask=mask_small)
+        proc._generate(gray, detail, strength)
+
+        stats = proc._stats_record
+        self._release(proc)
+        return stats
+
+    def _ai_mask(self, img):
+        """AI maszk egyszer, kicsinyített képen (U2Net úgyis 320 px-en fut)"""
+        p = self.p
+        if p.active_model != "Téma kiemelés" or p.models is None:
+            return None
+
+        small, _ = p._resize_for_processing(img, self.STATS_SIDE)
+        return p.ai_mask(small)
+
+    def _crop_scaled(self, small, full_shape, x0, y0, x1, y1):
+        """A kicsinyített maszk egy részlete teljes felbontásra nagyítva"""
+        sh, sw = small.shape[:2]
+        fh, fw = full_shape[:2]
+
+        xs = (np.arange(x0, x1, dtype=np.float32) + 0.5) * (sw / fw) - 0.5
+        ys = (np.arange(y0, y1, dtype=np.float32) + 0.5) * (sh / fh) - 0.5
+
+        map_x = np.broadcast_to(xs[np.newaxis, :], (y1 - y0, x1 - x0))
+        map_y = np.broadcast_to(ys[:, np.newaxis], (y1 - y0, x1 - x0))
+
+        return cv2.remap(
+            small,
+            np.ascontiguousarray(map_x),
+            np.ascontiguousarray(map_y),
+            cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_REPLICATE,
+        )
+
+    # --------------------------------------------------
+    # CSEMPE FELDOLGOZÓ
+    # --------------------------------------------------
+    def _tile_processor(self):
+        # szálanként saját processzor → a szálak nem osztoznak állapoton
+        proc = type(self.p)(None)
+        proc.style = type(self.p.style)(proc) if self.p.style is not None else None
+        return proc
+
+    def _worker_processor(self, ctx):
+        """a hívó szál processzora (első csempénél jön létre)"""
+        local = ctx["local"]
+        proc = getattr(local, "proc", None)
+        if proc is None:
+            proc = local.proc = self._tile_processor()
+            proc.ref_shape = ctx["img"].shape
+            with ctx["lock"]:
+                ctx["procs"].append(proc)
+        return proc
+
+    @staticmethod
+    def _release(proc):
+        """a processzor ↔ stílus kör bontása, a megjegyzett térképek eldobása"""
+        proc.feature_registry.clear()
+        proc.style = None
+        proc._stats_record = None
+        proc._stats_replay = None
+
+    def _render_tile(self, rect, ctx):
+        proc = self._worker_processor(ctx)
+        try:
+            self._render_tile_with(proc, rect, ctx)
+        finally:
+            # a csempe köztes térképei ne maradjanak a következőre
+            proc.feature_registry.clear()
+            proc._stats_replay = None
+
+    def _render_tile_with(self, proc, rect, ctx):
+        x0, y0, x1, y1 = rect
+        img = ctx["img"]
+        h, w = img.shape[:2]
+        halo = ctx["halo"]
+
+        hx0 = max(x0 - halo, 0)
+        hy0 = max(y0 - halo, 0)
+        hx1 = min(x1 + halo, w)
+        hy1 = min(y1 + halo, h)
+
+        proc._stats_replay = iter(ctx["stats"])
+
+        mask = None
+        if ctx["mask"] is not None:
+            mask = self._crop_scaled(ctx["mask"], img.shape, hx0, hy0, hx1, hy1)
+
+        src = img[hy0:hy1, hx0:hx1]
+        gray = proc.auto_prep(src, mask=mask)
+
+        tone, line = proc._generate(gray, ctx["detail"], ctx["strength"])
+        sketch = proc._blend(tone, line, ctx["mode"], ctx["strength"])
+        sketch = proc._clean(sketch, ctx["clean"])
+
+        # szegély levágása
+        cy0, cx0 = y0 - hy0, x0 - hx0
+        cy1, cx1 = cy0 + (y1 - y0), cx0 + (x1 - x0)
+
+        sketch = sketch[cy0:cy1, cx0:cx1]
+
+        if mask is not None:
+            # stabil perem (mint a process()-ben)
+            m = (mask[cy0:cy1, cx0:cx1] > 0.5).astype(np.float32)
+            sketch = proc.apply_mask(sketch, m, ctx["clean"])
+
+        ctx["out"][y0:y1, x0:x1] = sketch
+        ctx["line"][y0:y1, x0:x1] = line[cy0:cy1, cx0:cx1]
+
+    # --------------------------------------------------
+    # FŐ FÜGGVÉNY
+    # --------------------------------------------------
+    def render(self, img, mode="soft", detail=50, strength=50, clean=0):
+        h, w = img.shape[:2]
+
+        halo = self.halo(img.shape, detail, clean)
+        side, workers = self.plan(img.shape, halo)
+
+        mask_small = self._ai_mask(img)
+        stats = self._record_stats(img, mask_small, detail, strength)
+
+        ctx = {
+            "img": img,
+            "halo": halo,
+            "mask": mask_small,
+            "stats": stats,
+            "mode": mode,
+            "detail": detail,
+            "strength": strength,
+            "clean": clean,
+            "out": np.empty((h, w), np.uint8),
+            "line": np.empty((h, w), np.uint8),
+            "local": threading.local(),
+            "lock": threading.Lock(),
+            "procs": [],
+        }
+
+        rects = list(self.tiles(img.shape, side))
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # list() → a csempék kivételei itt jönnek elő
+                list(pool.map(lambda r: self._render_tile(r, ctx), rects))
+        finally:
+            for proc in ctx["procs"]:
+                self._release(proc)
+
+        self.p.last_line = ctx["line"]
+        return ctx["out"]
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
@@ -0,0 +1,551 @@
+"""
+Lézer üresjárat (G0) optimalizálás a vektoros útvonalakhoz.
+
+Az útvonalak sorrendje és iránya szabadon választható, a cél a
+vágások közötti üresjárat teljes hosszának csökkentése:
+
+1. legközelebbi szomszéd (rács index a végpontokra; üres környék
+   esetén vektorizált keresés a nem üres cellák között); ha a rá jutó
+   idő lejár, a maradék Hilbert görbe sorrendet kap (vektorizált)
+2. 2-opt: két átmenet cseréje egy szakasz megfordításával
+   (a szakasz útvonalai is megfordulnak → a belső átmenetek nem változnak)
+3. Or-opt: egy útvonal áthelyezése (szükség esetén megfordítva) két
+   szomszédos végpontú útvonal közé
+
+A 2. és 3. lépés végpontonként a NEIGHBOURS legközelebbi végpontot nézi,
+és a time_budget lejártakor leáll (az addigi javítás megmarad).
+A time_budget a teljes optimize hívásra vonatkozik, minden lépés
+(a szomszéd listák építése is) a saját részéig fut: LIST_SHARE, NN_SHARE.
+"""
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+NEIGHBOURS = 8
+
+# másodperc
+TIME_BUDGET = 2.0
+
+# a time_budget felosztása: szomszéd listák eddig, legközelebbi szomszéd
+# eddig (a listák ideje ebbe beszámít), a maradék a javításé
+LIST_SHARE = 0.4
+NN_SHARE = 0.9
+
+# szomszéd listák ennyi végpontonként épülnek (határidő ellenőrzés)
+LIST_CHUNK = 1 << 16
+
+# a legközelebbi szomszéd ennyi cella gyűrűig keres Pythonban
+NEAR_RINGS = 2
+
+# távoli keresés: BLOCK × BLOCK cellás blokkok, vektorizálva
+BLOCK = 16
+
+# szomszéd listák: legfeljebb ennyi jelölt pár végpontonként (átlag);
+# sűrű csomóknál a cella ehhez zsugorodik
+PAIRS_PER_END = 24
+
+
+def travel_distance(paths, start=(0, 0)):
+    """Üresjárat hossza a megadott sorrendben és irányban (pixel)"""
+    ids = np.flatnonzero(paths.counts() > 0)
+    if len(ids) == 0:
+        return 0.0
+
+    first = paths.points[paths.offsets[ids]].astype(np.float64)
+    last = paths.points[paths.offsets[ids + 1] - 1].astype(np.float64)
+
+    gaps = first[1:] - last[:-1]
+    total = np.hypot(gaps[:, 0], gaps[:, 1]).sum()
+    return float(total + math.hypot(*(first[0] - np.asarray(start, np.float64))))
+
+
+def _hilbert_index(x, y, bits):
+    """Hilbert görbe menti sorszám (0 <= x, y < 2^bits egész tömbök)"""
+    d = np.zeros(len(x), np.int64)
+    top = (1 << bits) - 1
+
+    s = 1 << (bits - 1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+
+        # negyed forgatása
+        flip = rx & ~ry
+        x = np.where(flip, top - x, x)
+        y = np.where(flip, top - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+
+    return d
+
+
+class TravelOptimizer:
+
+    def __init__(self, time_budget=TIME_BUDGET, neighbours=NEIGHBOURS, start=(0, 0)):
+        self.time_budget = time_budget
+        self.neighbours = neighbours
+        self.start = start
+
+        # utolsó futás: üresjárat előtte / NN után / végül, lépések, idő
+        self.last_stats = {}
+
+    # ---------------------------------------------------------
+    # PUBLIC
+    # ---------------------------------------------------------
+    def optimize(self, paths):
+        """PathSet → új sorrendű (és részben megfordított) PathSet"""
+        t0 = time.perf_counter()
+        before = travel_distance(paths, self.start)
+
+        keep = paths.counts() > 0
+        ids = np.flatnonzero(keep)
+        n = len(ids)
+
+        if n < 2:
+            self.last_stats = dict(before=before, nearest=before, after=before,
+                                   moves=0, seconds=time.perf_counter() - t0)
+            return paths
+
+        # végpontok: 2k = eleje, 2k+1 = vége (ids[k])
+        ends = np.empty((2 * n, 2), np.float64)
+        ends[0::2] = paths.points[paths.offsets[ids]]
+        ends[1::2] = paths.points[paths.offsets[ids + 1] - 1]
+
+        deadline = t0 + self.time_budget
+        nn_deadline = t0 + self.time_budget * NN_SHARE
+        near, radius = self._neighbour_lists(ends, t0 + self.time_budget * LIST_SHARE)
+
+        # a listák Python listaként kellenek (gyors elemenkénti olvasás),
+        # de csak ha marad idő a használatukra
+        if time.perf_counter() < nn_deadline:
+            near = near.tolist()
+            order, flip = self._nearest_neighbour(ends, near, radius, nn_deadline)
+        else:
+            order, flip = self._curve_order(ends, np.arange(n), self.start)
+        nearest = self._distance(ends, order, flip)
+
+        moves = 0
+        if time.perf_counter() < deadline:
+            if not isinstance(near, list):
+                near = near.tolist()
+            moves = self._improve(ends, near, order, flip, deadline)
+
+        result = paths.reordered(
+            np.concatenate((ids[order], np.flatnonzero(~keep))),
+            np.concatenate((flip, np.zeros(len(paths) - n, bool))),
+        )
+
+        after = travel_distance(result, self.start)
+        self.last_stats = dict(before=before, nearest=nearest, after=after,
+                               moves=moves, seconds=time.perf_counter() - t0)
+        return result
+
+    def report(self):
+        s = self.last_stats
+        if not s:
+            return "travel: -"
+
+        saved = 1 - s["after"] / s["before"] if s["before"] else 0.0
+        return (f"travel: {s['before']:.0f} -> {s['nearest']:.0f} (nearest) -> "
+                f"{s['after']:.0f} px, -{saved * 100:.1f}%, "
+                f"{s['moves']} moves, {s['seconds']:.2f} s")
+
+    # ---------------------------------------------------------
+    # SEGÉD
+    # ---------------------------------------------------------
+    def _distance(self, ends, order, flip):
+        entry = ends[2 * order + flip]
+        exit_ = ends[2 * order + 1 - flip]
+
+        gaps = entry[1:] - exit_[:-1]
+        total = np.hypot(gaps[:, 0], gaps[:, 1]).sum()
+        return float(total + math.hypot(*(entry[0] - np.asarray(self.start, np.float64))))
+
+    @staticmethod
+    def _grid(ends, per_cell, cell=None):
+        """cella méret és cella index végpontonként (~per_cell pont / cella)"""
+        lo = ends.min(0)
+        span = np.maximum(ends.max(0) - lo, 1.0)
+        if cell is None:
+            cell = max(math.sqrt(span[0] * span[1] * per_cell / len(ends)), 1.0)
+
+        gw = int(span[0] // cell) + 1
+        gh = int(span[1] // cell) + 1
+        cx = ((ends[:, 0] - lo[0]) // cell).astype(np.int64)
+        cy = ((ends[:, 1] - lo[1]) // cell).astype(np.int64)
+        return cell, lo, gw, gh, cx, cy
+
+    # ---------------------------------------------------------
+    # 1. LEGKÖZELEBBI SZOMSZÉD
+    # ---------------------------------------------------------
+    def _nearest_neighbour(self, ends, near, radius, deadline=math.inf):
+        """
+        near: végpontonkénti szomszéd lista (távolság szerint) – ami radius
+        távolságon belül van, az mind benne van, így az első még be nem
+        járt elem, ha radius-on belül esik, biztosan a legközelebbi.
+        Különben rács keresés (közeli gyűrűk, majd blokkok).
+
+        deadline után a még be nem járt útvonalak _curve_order sorrendben
+        kerülnek a végére.
+        """
+        n = len(ends) // 2
+        cell, lo, gw, gh, cx, cy = self._grid(ends, 2.0)
+        cid = cy * gw + cx
+
+        # cellánkénti végpont listák
+        sort = np.argsort(cid, kind="stable")
+        bounds = np.searchsorted(cid[sort], np.arange(gw * gh + 1))
+        members = sort.tolist()
+        b = bounds.tolist()
+        cells = {}      # cella → még élő végpontok (első használatkor töltve)
+
+        # durva blokkok a távoli kereséshez
+        bw = (gw + BLOCK - 1) // BLOCK
+        bh = (gh + BLOCK - 1) // BLOCK
+        bid = (cy // BLOCK) * bw + cx // BLOCK
+        block_sort = np.argsort(bid, kind="stable")
+        block_bounds = np.searchsorted(bid[block_sort], np.arange(bw * bh + 1))
+        block_alive = np.bincount(bid, minlength=bw * bh)
+        block_x = np.arange(bw * bh) % bw
+        block_y = np.arange(bw * bh) // bw
+        block_size = BLOCK * cell
+
+        xs = ends[:, 0].tolist()
+        ys = ends[:, 1].tolist()
+        bid_list = bid.tolist()
+        visited = [False] * n
+        visited_np = np.zeros(n, bool)
+        hypot = math.hypot
+
+        def search(px, py):
+            best, best_d = -1, math.inf
+            gx = int((px - lo[0]) // cell)
+            gy = int((py - lo[1]) // cell)
+
+            # --- közeli gyűrűk (a korlát csak a rácson belül érvényes) ---
+            if 0 <= gx < gw and 0 <= gy < gh:
+                for r in range(NEAR_RINGS + 1):
+                    for yy in range(max(gy - r, 0), min(gy + r + 1, gh)):
+                        edge = yy == gy - r or yy == gy + r
+                        row = yy * gw
+                        for xx in (range(gx - r, gx + r + 1) if edge else (gx - r, gx + r)):
+                            if xx < 0 or xx >= gw:
+                                continue
+                            items = cells.get(row + xx)
+                            if items is None:
+                                c = row + xx
+                                items = cells[c] = members[b[c]:b[c + 1]]
+                            if not items:
+                                continue
+
+                            dead = False
+                            for e in items:
+                                if visited[e >> 1]:
+                                    dead = True
+                                    continue
+                                d = hypot(xs[e] - px, ys[e] - py)
+                                if d < best_d:
+                                    best, best_d = e, d
+
+                            if dead:
+                                cells[row + xx] = [e for e in items if not visited[e >> 1]]
+
+                    if best >= 0 and best_d <= r * cell:
+                        return best
+
+            # --- távoli keresés: nem üres blokkok, vektorizálva ---
+            live = np.flatnonzero(block_alive)
+            x0 = lo[0] + block_x[live] * block_size
+            y0 = lo[1] + block_y[live] * block_size
+            bx = np.maximum(np.maximum(x0 - px, px - x0 - block_size), 0.0)
+            by = np.maximum(np.maximum(y0 - py, py - y0 - block_size), 0.0)
+            box = np.hypot(bx, by)
+            limit = min(best_d, box.min() + block_size * 1.5)
+
+            cand = np.concatenate([
+                block_sort[block_bounds[c]:block_bounds[c + 1]]
+                for c in live[box <= limit].tolist()
+            ])
+            cand = cand[~visited_np[cand >> 1]]
+
+            d = np.hypot(ends[cand, 0] - px, ends[cand, 1] - py)
+            j = int(d.argmin())
+            return int(cand[j]) if d[j] < best_d else best
+
+        order = np.empty(n, np.int64)
+        flip = np.zeros(n, bool)
+
+        px, py = float(self.start[0]), float(self.start[1])
+        current = -1
+
+        for step in range(n):
+            if step & 255 == 0 and time.perf_counter() > deadline:
+                rest = np.flatnonzero(~visited_np)
+                order[step:], flip[step:] = self._curve_order(ends, rest, (px, py))
+                break
+
+            best = -1
+
+            # --- gyors út: szomszéd lista ---
+            if current >= 0:
+                for e in near[current]:
+                    if e < 0:
+                        break
+                    if not visited[e >> 1]:
+                        if hypot(xs[e] - px, ys[e] - py) <= radius:
+                            best = e
+                        break
+
+            if best < 0:
+                best = search(px, py)
+
+            k = best >> 1
+            visited[k] = True
+            visited_np[k] = True
+            block_alive[bid_list[2 * k]] -= 1
+            block_alive[bid_list[2 * k + 1]] -= 1
+
+            order[step] = k
+            flip[step] = best & 1
+
+            # kilépés a másik végén
+            current = best ^ 1
+            px, py = xs[current], ys[current]
+
+        return order, flip
+
+    @staticmethod
+    def _curve_order(ends, ids, start):
+        """
+        Gyors sorrend (vektorizált): az útvonal középpontok Hilbert görbe
+        szerint; mindegyik úgy fordul, hogy az előző középponthoz közelebbi
+        végén lépjen be, és a következő felé lépjen ki.
+        """
+        first = ends[2 * ids]
+        last = ends[2 * ids + 1]
+        mid = (first + last) / 2
+
+        lo = mid.min(0)
+        span = max(float((mid.max(0) - lo).max()), 1.0)
+        q = ((mid - lo) * (65535 / span)).astype(np.int64)
+
+        sort = np.argsort(_hilbert_index(q[:, 0], q[:, 1], 16), kind="stable")
+        ids, first, last, mid = ids[sort], first[sort], last[sort], mid[sort]
+
+        prev = np.vstack((np.asarray(start, np.float64)[None], mid[:-1]))
+        nxt = np.vstack((mid[1:], mid[-1:]))
+
+        keep = np.hypot(*(first - prev).T) + np.hypot(*(last - nxt).T)
+        turn = np.hypot(*(last - prev).T) + np.hypot(*(first - nxt).T)
+        return ids, turn < keep
+
+    # ---------------------------------------------------------
+    # SZOMSZÉD LISTÁK (végpontonként a k legközelebbi más útvonal végpont)
+    # ---------------------------------------------------------
+    def _neighbour_lists(self, ends, deadline=math.inf):
+        """
+        LIST_CHUNK végpontonként; deadline után a többi végpont listája
+        üres marad (-1) – a legközelebbi szomszéd ott rácson keres,
+        a javítás kihagyja őket.
+        """
+        k = self.neighbours
+        cell, lo, gw, gh, cx, cy = self._grid(ends, 2.0)
+
+        # jelölt párok becslése (9 · Σ cella²) → sűrű csomóknál kisebb cella
+        while cell > 1.0:
+            count = np.bincount(cy * gw + cx).astype(np.float64)
+            if 9 * (count * count).sum() <= PAIRS_PER_END * len(ends):
+                break
+            cell, lo, gw, gh, cx, cy = self._grid(ends, 0, max(cell / 1.4, 1.0))
+
+        # cella tábla 1 cellás kerettel → a 3×3 szomszédság mindig létezik
+        width = gw + 2
+        key = (cy + 1) * width + (cx + 1)
+        sort = np.argsort(key, kind="stable")
+        cell_count = np.bincount(key, minlength=width * (gh + 2))
+        cell_start = np.cumsum(cell_count) - cell_count
+
+        around = np.array([dy * width + dx for dy in (-1, 0, 1) for dx in (-1, 0, 1)])
+        near = np.full((len(ends), k), -1, np.int64)
+
+        for lo in range(0, len(ends), LIST_CHUNK):
+            if time.perf_counter() > deadline:
+                break
+            hi = min(lo + LIST_CHUNK, len(ends))
+
+            cells = key[lo:hi, None] + around[None, :]
+            count = cell_count[cells].ravel()
+            first = cell_start[cells].ravel()
+
+            # jelölt párok végpontonként egymás után (a szerint rendezve)
+            local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            b = sort[np.repeat(first, count) + local]
+            a = np.repeat(np.arange(lo, hi), count.reshape(-1, 9).sum(1))
+
+            # saját útvonal végpontjai nem
+            ok = (a >> 1) != (b >> 1)
+            a, b = a[ok], b[ok]
+            diff = ends[a] - ends[b]
+            d = np.hypot(diff[:, 0], diff[:, 1])
+
+            # csoporton belül távolság szerint (a már rendezett → gyors)
+            by_dist = np.argsort(a + d / (d.max(initial=0.0) + 1.0), kind="stable")
+            a, b = a[by_dist], b[by_dist]
+
+            start = np.searchsorted(a, np.arange(lo, hi))
+            rank = np.arange(len(a)) - start[a - lo]
+            keep = rank < k
+            near[a[keep], rank[keep]] = b[keep]
+
+        # a 3×3 cella legalább cell sugarú kört lefed
+        return near, cell
+
+    # ---------------------------------------------------------
+    # 2. + 3. JAVÍTÁS: 2-opt + Or-opt, szomszéd listákkal
+    # ---------------------------------------------------------
+    def _improve(self, ends, near, order, flip, deadline):
+        n = len(order)
+
+        xs = ends[:, 0].tolist()
+        ys = ends[:, 1].tolist()
+        sx, sy = float(self.start[0]), float(self.start[1])
+        hypot = math.hypot
+
+        pos = np.empty(n, np.int64)
+        pos[order] = np.arange(n)
+
+        # olvasás Python listából (gyors), szakasz műveletek numpy-n
+        order_l = order.tolist()
+        flip_l = flip.tolist()
+
+        def exit_xy(p):
+            if p < 0:
+                return sx, sy
+            e = 2 * order_l[p] + 1 - flip_l[p]
+            return xs[e], ys[e]
+
+        def entry_xy(p):
+            if p >= n:
+                return None
+            e = 2 * order_l[p] + flip_l[p]
+            return xs[e], ys[e]
+
+        def dist(a, b):
+            if a is None or b is None:
+                return 0.0
+            return hypot(a[0] - b[0], a[1] - b[1])
+
+        def sync(lo, hi):
+            """order / flip / pos tükrözés a [lo, hi) tartományra"""
+            order_l[lo:hi] = order[lo:hi].tolist()
+            flip_l[lo:hi] = flip[lo:hi].tolist()
+            pos[order[lo:hi]] = np.arange(lo, hi)
+
+        def reverse(p, q):
+            """2-opt: p+1 .. q szakasz megfordítása (az útvonalak iránya is)"""
+            lo, hi = p + 1, q + 1
+            order[lo:hi] = order[lo:hi][::-1].copy()
+            flip[lo:hi] = ~flip[lo:hi][::-1]
+            sync(lo, hi)
+
+        def two_opt(p, q):
+            if p > q:
+                p, q = q, p
+            if p == q:
+                return False
+            a, b = exit_xy(p), entry_xy(p + 1)
+            c, d = exit_xy(q), entry_xy(q + 1)
+            delta = dist(a, c) + dist(b, d) - dist(a, b) - dist(c, d)
+            if delta < -1e-9:
+                reverse(p, q)
+                return True
+            return False
+
+        def or_opt(i, j, after):
+            """i. útvonal áthelyezése a j. útvonal után (after) vagy elé"""
+            if not after:
+                j -= 1
+            # j, j+1 közé; i nem lehet a két szomszéd egyike sem
+            if j == i or j == i - 1:
+                return False
+
+            prev, nxt = exit_xy(i - 1), entry_xy(i + 1)
+            u, v = entry_xy(i), exit_xy(i)
+            gain = dist(prev, u) + dist(v, nxt) - dist(prev, nxt)
+
+            a, b = exit_xy(j), entry_xy(j + 1)
+            base = dist(a, b)
+            keep_cost = dist(a, u) + dist(v, b) - base
+            flip_cost = dist(a, v) + dist(u, b) - base
+
+            cost = min(keep_cost, flip_cost)
+            if cost - gain >= -1e-9:
+                return False
+
+            k = order_l[i]
+            f = flip_l[i] != (flip_cost < keep_cost)
+
+            if j > i:
+                order[i:j] = order[i + 1:j + 1].copy()
+                flip[i:j] = flip[i + 1:j + 1].copy()
+                order[j], flip[j] = k, f
+                sync(i, j + 1)
+            else:
+                order[j + 2:i + 1] = order[j + 1:i].copy()
+                flip[j + 2:i + 1] = flip[j + 1:i].copy()
+                order[j + 1], flip[j + 1] = k, f
+                sync(j + 1, i + 1)
+            return True
+
+        queue = deque(order_l)
+        queued = [True] * n
+        moves = 0
+        checks = 0
+
+        while queue:
+            checks += 1
+            if checks & 255 == 0 and time.perf_counter() > deadline:
+                break
+
+            k = queue.popleft()
+            queued[k] = False
+
+            improved = False
+            for end in (2 * k, 2 * k + 1):
+                for c in near[end]:
+                    if c < 0:
+                        break
+                    i = int(pos[k])
+                    j = int(pos[c >> 1])
+
+                    # end: k kilépő vagy belépő vége a mostani irányban
+                    k_exit = (end & 1) != flip_l[i]
+                    c_exit = (c & 1) != flip_l[j]
+
+                    if k_exit and c_exit:
+                        done = two_opt(i, j)
+                    elif not k_exit and not c_exit:
+                        done = two_opt(i - 1, j - 1)
+                    else:
+                        done = or_opt(i, j, c_exit)
+
+                    if done:
+                        moves += 1
+                        improved = True
+                        break
+                if improved:
+                    break
+
+            if improved:
+                # az érintett útvonalak újra sorra kerülnek
+                for m in (k, c >> 1):
+                    p = int(pos[m])
+                    for q in (p - 1, p, p + 1):
+                        if 0 <= q < n and not queued[order_l[q]]:
+                            queued[order_l[q]] = True
+                            queue.append(order_l[q])
+
+        return moves
@@ -1,11 +1,37 @@
 # vectorizer.py
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
+from path_set import PathSet
+
 class Vectorizer:
-    def __init__(self, min_length=15, epsilon=1.5):
+    # ennyi már bejárt pixelen át egy kontúr szakaszai összefűződnek
+    JOIN_GAP = 4
+
+    # végpont összefűzés: max. irány eltérés (fok)
+    MERGE_ANGLE = 35
+
+    # nagyított / kicsinyített előnézet: ennyi tört bit a koordinátákban
+    PREVIEW_SHIFT = 4
+
+    # párhuzamos követés csempe mérete és átfedése (pixel)
+    TILE = 512
+    OVERLAP = 16
+
+    def __init__(self, min_length=15, epsilon=1.5, merge_dist=0.0, workers=1):
         self.min_length = min_length
         self.epsilon = epsilon
+        self.merge_dist = merge_dist   # 0 = nincs összefűzés
+
+        # csempénkénti párhuzamos követés (0 / None = minden mag)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+        # utolsó összefűzés statisztika (kapcsolatok száma, idő)
+        self.last_merge = (0, 0.0)
 
     # ---------------------------------------------------------
     # PUBLIC
@@ -26,83 +52,448 @@ class Vectorizer:
         if smooth is not None:
             self.epsilon = 0.5 + smooth * 0.04            # görbe simítása
 
+        if merge is not None:
+            # folytonosság: szakadt vonalvégek összefűzése (0 = ki)
+            self.merge_dist = 1 + merge * 0.08 if merge > 0 else 0.0
+
         print("ink pixels:", np.count_nonzero(bw))
         print("image size:", bw.shape)
 
-        visited = np.zeros_like(bw, dtype=np.uint8)
+        paths = self._trace_rings(bw).simplify(self.epsilon)
+
+        if self.merge_dist > 0:
+            before = len(paths)
+            paths = self._merge_paths(paths, self.merge_dist, self.MERGE_ANGLE)
+            joins, elapsed = self.last_merge
+            print(f"merged: {joins} joins, {before} -> {len(paths)} paths "
+                  f"({elapsed * 1000:.0f} ms)")
+
+        print("paths:", len(paths), "points:", paths.total_points)
+        return paths
+
+    # ---------------------------------------------------------
+    # TRACE: távolság gyűrűk + kontúrok (vektorizált)
+    # ---------------------------------------------------------
+    def _trace_rings(self, bw):
+        """
+        Minden tinta pixel pontosan egy útvonalra kerül (mint a régi
+        pixel bejárónál), de Python ciklus nélkül:
+
+        1. sakktábla távolság a háttértől → a k. gyűrű a dist == k pixelek
+           (vékony vonalnál maga a vonal, vastag foltnál koncentrikus körök)
+        2. a páros és a páratlan gyűrűk nem érintkeznek (8 szomszédságban a
+           távolság legfeljebb 1-et változik) → két findContours az összeset
+           megadja
+        3. a kontúrok oda-vissza járják a vékony részeket: minden pixel az
+           első előfordulásánál marad meg, a megmaradt folyamatos szakaszok
+           lesznek az útvonalak (a csatlakozó pixellel együtt)
+
+        workers > 1 esetén csempénként párhuzamosan (_trace_tiled),
+        közelítő eredménnyel.
+
+        Visszatérés: PathSet pixel útvonalak (min_length szűréssel)
+        """
+        if self.workers > 1 and max(bw.shape) > self.TILE:
+            return self._trace_tiled(bw)
+        return self._rings(bw)
+
+    def _rings(self, bw, origin=(0, 0), core=None, min_length=None):
+        """
+        _trace_rings magja egy (rész)képre.
+
+        origin: a kivágás helye a teljes képen (a pontok teljes kép
+        koordinátákban jönnek vissza)
+        core: (x0, y0, x1, y1) a kivágásban – csak az ide eső pixelek
+        kerülnek útvonalra, a határon kilépő vonal ott megszakad
+        """
         h, w = bw.shape
-        paths = []
+        ox, oy = origin
+        if min_length is None:
+            min_length = self.min_length
 
-        # 8 szomszéd
-        N = [(-1,-1),(-1,0),(-1,1),
-             ( 0,-1),       (0,1),
-             ( 1,-1),(1,0),(1,1)]
+        pad = cv2.copyMakeBorder(bw, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+        dist = cv2.distanceTransform(pad, cv2.DIST_C, 3)[1:-1, 1:-1]
+        dist = dist.astype(np.int32)
 
-        def trace(x, y):
-            path = [(x,y)]
-            visited[y,x] = 1
+        contours = []
+        for parity in (1, 0):
+            layer = (((dist & 1) == parity) & (dist > 0)).astype(np.uint8)
+            found, _ = cv2.findContours(layer, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+            contours.extend(found)
 
-            cx, cy = x, y
-            while True:
-                found = False
-                for dx,dy in N:
-                    nx, ny = cx+dx, cy+dy
-                    if 0<=nx<w and 0<=ny<h:
-                        if bw[ny,nx] and not visited[ny,nx]:
-                            visited[ny,nx] = 1
-                            path.append((nx,ny))
-                            cx,cy = nx,ny
-                            found = True
-                            break
-                if not found:
-                    break
-            return path
-
-        for y in range(h):
-            for x in range(w):
-                if bw[y,x] and not visited[y,x]:
-                    p = trace(x,y)
-                    if len(p) > self.min_length:
-                        paths.append(self._simplify(p))
-
-        print("paths:", len(paths))
-        return paths
+        if not contours:
+            return PathSet()
+
+        # --- egy közös pont tömb, kontúr azonosítóval ---
+        lengths = np.fromiter(map(len, contours), np.int32, len(contours))
+        offsets = np.zeros(len(contours), np.int32)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+
+        pts = np.concatenate(contours).reshape(-1, 2)
+        n = len(pts)
+        cid = np.repeat(np.arange(len(contours), dtype=np.int32), lengths)
+        index = np.arange(n, dtype=np.int32)
+
+        # --- első előfordulás pixelenként ---
+        ids = pts[:, 1] * w + pts[:, 0]
+        owner = np.full(h * w, n, np.int32)
+        np.minimum.at(owner, ids, index)
+        keep = owner[ids] == index
+
+        inside = None
+        if core is not None:
+            x0, y0, x1, y1 = core
+            inside = ((pts[:, 0] >= x0) & (pts[:, 0] < x1)
+                      & (pts[:, 1] >= y0) & (pts[:, 1] < y1))
+            keep &= inside
+
+        # --- kontúronként forgatás: egy eldobott pontnál kezdődjön ---
+        # (így a megmaradt szakaszok nem lógnak át a kontúr végén)
+        pos = index - offsets[cid]
+        shift = np.minimum.reduceat(np.where(keep, n, pos), offsets)
+        closed = shift == n
+        shift[closed] = 0
+
+        perm = offsets[cid] + (pos + shift[cid]) % lengths[cid]
+        pts = pts[perm]
+        keep = keep[perm]
+        if inside is not None:
+            inside = inside[perm]
+
+        # --- megmaradt szakaszok (csatlakozó ponttal kibővítve) ---
+        first = np.zeros(n, bool)
+        first[offsets] = True
+        last = np.empty(n, bool)
+        last[:-1] = first[1:]
+        last[-1] = True
+
+        prev_keep = np.empty(n, bool)
+        prev_keep[0] = False
+        prev_keep[1:] = keep[:-1]
+
+        next_keep = np.empty(n, bool)
+        next_keep[-1] = False
+        next_keep[:-1] = keep[1:]
+
+        starts = np.flatnonzero(keep & (~prev_keep | first))
+        ends = np.flatnonzero(keep & (~next_keep | last))
+
+        # egy kontúron belül a pár pixeles kihagyások (lépcsős sarok,
+        # csomópont) áthidalása → kevesebb, hosszabb útvonal
+        gap = starts[1:] - ends[:-1] - 1
+        join = (gap <= self.JOIN_GAP) & (cid[starts[1:]] == cid[ends[:-1]])
+        if inside is not None:
+            # a magon kívüli kitérő a szomszéd csempéé, nem hidaljuk át
+            outside = np.zeros(n + 1, np.int32)
+            np.cumsum(~inside, out=outside[1:])
+            join &= outside[starts[1:]] == outside[ends[:-1] + 1]
+        starts = starts[np.r_[True, ~join]]
+        ends = ends[np.r_[~join, True]]
+
+        # csatlakozó pixel csak a magon belülről (a kinti a szomszédé)
+        head = ~first[starts]
+        tail = ~last[ends]
+        if inside is not None:
+            head &= inside[starts - head]
+            tail &= inside[ends + tail]
+        starts = starts - head
+        ends = ends + tail + 1
+
+        # teljesen megmaradt kontúr = zárt gyűrű
+        ring = closed[cid[starts]] & (lengths[cid[starts]] > 2)
+
+        size = ends - starts + ring
+        selected = self._long_enough(bw, pts[starts], size, min_length)
+        starts = starts[selected]
+
+        if ox or oy:
+            pts = pts + np.array([ox, oy], np.int32)
+
+        return PathSet.gather(pts, starts, (ends[selected] - starts), ring[selected])
+
+    # ---------------------------------------------------------
+    # TRACE: csempénként párhuzamosan
+    # ---------------------------------------------------------
+    def _trace_tiled(self, bw):
+        """
+        Rögzített TILE × TILE csempék, OVERLAP pixel átfedéssel: minden
+        csempe a kibővített kivágáson fut (a távolság transzformáció a
+        csempe szélén is helyes, ha a vonal nem vastagabb 2 × OVERLAP-nál),
+        de csak a saját (átfedés nélküli) magjába eső pixeleket adja vissza.
+        Így minden tinta pixel pontosan egy csempéé, a nagy összefüggő
+        vonalak is szétoszlanak.
+
+        A magból kilépő vonal a határon megszakad; a varrat két oldalán
+        egymás melletti (8 szomszéd) végpontokat _stitch fűzi össze.
+        A min_length szűrés csak az összefűzés után jön.
+
+        Nem bitre azonos az egyszálas követéssel: a kontúr bejárás és az
+        "első előfordulás" a teljes komponenstől függ, a csempe csak a
+        kivágást látja. A lefedett tinta ugyanaz, az útvonalak bontása
+        és sorrendje eltér.
+        """
+        h, w = bw.shape
+        t, m = self.TILE, self.OVERLAP
+
+        def run(tile):
+            y0, x0 = tile
+            y1, x1 = min(y0 + t, h), min(x0 + t, w)
+            if not bw[y0:y1, x0:x1].any():
+                return PathSet()
+
+            ya, yb = max(y0 - m, 0), min(y1 + m, h)
+            xa, xb = max(x0 - m, 0), min(x1 + m, w)
+            core = (x0 - xa, y0 - ya, x1 - xa, y1 - ya)
+            return self._rings(bw[ya:yb, xa:xb], (xa, ya), core, min_length=0)
+
+        tiles = [(y, x) for y in range(0, h, t) for x in range(0, w, t)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            paths = self._stitch(PathSet.concat(list(pool.map(run, tiles))))
 
+        first = paths.points[paths.offsets[:-1]]
+        return paths.select(self._long_enough(bw, first, paths.counts(), self.min_length))
+
+    def _long_enough(self, bw, first, size, min_length):
+        """
+        min_length szűrés (bool maszk a szakaszokra), first = a szakaszok
+        kezdőpontja (x, y) a bw-ben.
+
+        Egy kis, vastag folt gyűrűi mind rövidek lehetnek, bár a folt
+        együtt nagyobb a küszöbnél (a régi bejáró egy útvonallal
+        megtartotta) → ha egy komponensnek nincs megmaradó szakasza, de
+        a területe a küszöb fölött van, a 2 pontnál hosszabb szakaszai
+        maradnak.
+        """
+        selected = size > min_length
+        if min_length <= 0 or len(size) == 0:
+            return selected
+
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(bw, connectivity=8)
+        comp = labels[first[:, 1], first[:, 0]]
+
+        has_long = np.zeros(count, bool)
+        has_long[comp[selected]] = True
+        orphan = (stats[comp, cv2.CC_STAT_AREA] > min_length) & ~has_long[comp]
+        return selected | (orphan & (size > 2))
+
+    def _stitch(self, paths):
+        """
+        Csempe határon megszakadt vonalak összefűzése: a varrat mellett
+        álló végpontok párba, ha egymás 8 szomszédjai és különböző
+        csempébe esnek. Mohó, távolság szerint, végpontonként egy
+        kapcsolat; a körbeérő lánc zárt útvonal lesz.
+        """
+        t = self.TILE
+        first, last = paths.endpoints()
+        is_open = (paths.counts() > 1) & (first != last).any(1)
+
+        # csak a varrat menti végpontok számítanak
+        def at_seam(p):
+            r = p % t
+            return ((r == 0) & (p > 0) | (r == t - 1)).any(1)
+
+        is_open &= at_seam(first) | at_seam(last)
+        open_ids = np.flatnonzero(is_open)
+        if len(open_ids) < 2:
+            return paths
+
+        ends = np.empty((len(open_ids) * 2, 2), np.float64)
+        ends[0::2] = first[open_ids]
+        ends[1::2] = last[open_ids]
+
+        a, b, d = self._endpoint_pairs(ends, 1.5)
+        tile = ends.astype(np.int64) // t
+        ok = (tile[a] != tile[b]).any(1)
+        a, b, d = a[ok], b[ok], d[ok]
+        order = np.argsort(d, kind="stable")
+
+        link = np.full(len(ends), -1, np.int64)
+        for e1, e2 in zip(a[order].tolist(), b[order].tolist()):
+            if link[e1] >= 0 or link[e2] >= 0:
+                continue
+            link[e1] = e2
+            link[e2] = e1
+
+        chains = PathSet.concat_arrays(self._chains(paths, open_ids, link))
+        return PathSet.concat((paths.select(~is_open), chains))
+
+    # ---------------------------------------------------------
+    # VÉGPONT ÖSSZEFŰZÉS (rács index)
+    # ---------------------------------------------------------
     def _merge_paths(self, paths, dist=2.5, angle=35):
+        """
+        Szakadt vonalak összefűzése a végpontjaiknál (PathSet → PathSet).
 
-        import math
+        - végpontok rácsba (cella = dist), jelöltek csak a szomszéd
+          cellákból → a páros keresés nem négyzetes
+        - irány teszt: a két végpont kifelé mutató iránya közel ellentétes
+          (a vonal folytatódik); mindkét végpont, mindkét irány számít
+        - mohó választás távolság szerint, végpontonként legfeljebb egy
+          kapcsolat, kör nem keletkezhet (union-find)
+        """
+        t0 = time.perf_counter()
 
-        def ang(a,b):
-            dx=b[0]-a[0]
-            dy=b[1]-a[1]
-            return math.degrees(math.atan2(dy,dx))
+        # zárt és egypontos útvonalak kimaradnak
+        first, last = paths.endpoints()
+        is_open = (paths.counts() > 1) & (first != last).any(1)
+        open_ids = np.flatnonzero(is_open)
 
-        merged = True
-        while merged:
-            merged=False
+        if len(open_ids) < 2:
+            self.last_merge = (0, time.perf_counter() - t0)
+            return paths
 
-            for i in range(len(paths)):
-                if merged: break
-                for j in range(i+1,len(paths)):
-                    p1=paths[i]
-                    p2=paths[j]
+        # --- végpontok: 2k = eleje, 2k+1 = vége (open_ids[k]) ---
+        head = paths.offsets[open_ids]
+        tail = paths.offsets[open_ids + 1] - 1
 
-                    a1=p1[-2]; a2=p1[-1]
-                    b1=p2[0];  b2=p2[1]
+        ends = np.empty((len(open_ids) * 2, 2), np.float64)
+        inner = np.empty_like(ends)
+        ends[0::2] = paths.points[head]
+        inner[0::2] = paths.points[head + 1]
+        ends[1::2] = paths.points[tail]
+        inner[1::2] = paths.points[tail - 1]
 
-                    d=((a2[0]-b1[0])**2+(a2[1]-b1[1])**2)**0.5
-                    if d>dist: continue
+        # kifelé mutató egységvektor
+        out = ends - inner
+        out /= np.maximum(np.hypot(out[:, 0], out[:, 1]), 1e-9)[:, None]
 
-                    da=ang(a1,a2)
-                    db=ang(b1,b2)
+        a, b, d = self._endpoint_pairs(ends, dist)
 
-                    if abs(da-db)<angle:
-                        paths[i]=p1+p2
-                        del paths[j]
-                        merged=True
-                        break
+        # azonos útvonal két vége nem
+        ok = (a >> 1) != (b >> 1)
 
-        return paths
+        # folytatás: a kifelé irányok közel ellentétesek
+        cos_lim = np.cos(np.radians(angle))
+        ok &= -(out[a] * out[b]).sum(1) >= cos_lim
+
+        a, b, d = a[ok], b[ok], d[ok]
+        order = np.argsort(d, kind="stable")
+
+        # --- mohó párosítás ---
+        link = np.full(len(ends), -1, np.int64)
+        parent = list(range(len(open_ids)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        joins = 0
+        for e1, e2 in zip(a[order].tolist(), b[order].tolist()):
+            if link[e1] >= 0 or link[e2] >= 0:
+                continue
+
+            r1, r2 = find(e1 >> 1), find(e2 >> 1)
+            if r1 == r2:
+                continue
+
+            parent[r1] = r2
+            link[e1] = e2
+            link[e2] = e1
+            joins += 1
+
+        merged = self._chains(paths, open_ids, link)
+        merged.extend(paths.select(~is_open))
+
+        self.last_merge = (joins, time.perf_counter() - t0)
+        return PathSet.concat_arrays(merged)
+
+    @staticmethod
+    def _chains(paths, open_ids, link):
+        """
+        Láncok összerakása (nézetekből, egy concatenate lánconként).
+        link[e]: a 2k / 2k+1 végponthoz (open_ids[k] eleje / vége)
+        kapcsolt végpont, -1 = szabad. Visszatérés: pont tömbök listája,
+        a körbeérő lánc a kezdőpontjával zárva.
+        """
+        merged = []
+        used = np.zeros(len(open_ids), bool)
+        link = link.tolist()
+        open_ids = open_ids.tolist()
+
+        def walk(start):
+            pieces = []
+            e = start
+            while True:
+                j = e >> 1
+                used[j] = True
+
+                p = paths[open_ids[j]]
+                # e az útvonal belépő vége
+                if e & 1:
+                    p = p[::-1]
+
+                if pieces and (pieces[-1][-1] == p[0]).all():
+                    p = p[1:]
+                pieces.append(p)
+
+                nxt = link[e ^ 1]
+                if nxt < 0 or nxt == start:
+                    return pieces
+                e = nxt
+
+        for k in range(len(open_ids)):
+            if used[k]:
+                continue
+
+            # lánc eleje: szabad végponttal rendelkező útvonal
+            start = 2 * k if link[2 * k] < 0 else 2 * k + 1
+            if link[start] >= 0:
+                continue
+
+            pieces = walk(start)
+            merged.append(pieces[0] if len(pieces) == 1 else np.concatenate(pieces))
+
+        # ami maradt, körbeérő lánc (szabad vég nélkül)
+        for k in range(len(open_ids)):
+            if not used[k]:
+                pieces = walk(2 * k)
+                pieces.append(pieces[0][:1])
+                merged.append(np.concatenate(pieces))
+
+        return merged
+
+    def _endpoint_pairs(self, pts, dist):
+        """
+        Végpont párok dist távolságon belül, rács indexszel.
+        Visszatérés: (i, j, távolság) tömbök, i < j sorrend nélkül
+        """
+        cell = np.floor(pts / dist).astype(np.int64)
+        cell -= cell.min(0)
+        span = int(cell[:, 1].max()) + 3
+
+        key = cell[:, 0] * span + cell[:, 1]
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+
+        idx = np.arange(len(pts))
+        pairs_a, pairs_b = [], []
+
+        # fél szomszédság (minden pár egyszer)
+        for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+            target = key + dx * span + dy
+            lo = np.searchsorted(sorted_key, target, "left")
+            hi = np.searchsorted(sorted_key, target, "right")
+            count = hi - lo
+
+            a = np.repeat(idx, count)
+            offs = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            b = order[np.repeat(lo, count) + offs]
+
+            if dx == 0 and dy == 0:
+                keep = a < b
+                a, b = a[keep], b[keep]
+
+            pairs_a.append(a)
+            pairs_b.append(b)
+
+        a = np.concatenate(pairs_a)
+        b = np.concatenate(pairs_b)
+        d = np.hypot(*(pts[a] - pts[b]).T)
+
+        near = d <= dist
+        return a[near], b[near], d[near]
 
     # ---------------------------------------------------------
     # TRACE CONTOURS
@@ -122,19 +513,47 @@ class Vectorizer:
     # SIMPLIFY POLYLINE
     # ---------------------------------------------------------
     def _simplify(self, path):
-        cnt = np.array(path, dtype=np.int32).reshape((-1,1,2))
+        # egyetlen útvonal; több útvonalnál PathSet.simplify
+        cnt = np.asarray(path, dtype=np.int32).reshape((-1,1,2))
         approx = cv2.approxPolyDP(cnt, self.epsilon, False)
-        return [(int(p[0][0]), int(p[0][1])) for p in approx]
+        return list(map(tuple, approx.reshape(-1, 2).tolist()))
 
     # ---------------------------------------------------------
     # PREVIEW
     # ---------------------------------------------------------
-    def draw_preview(self, shape, paths):
+    def draw_preview(self, shape, paths, scale=1.0):
+        """
+        Újrarajzolás szürke vászonra, egyetlen cv2.polylines hívással
+        (1:1 méretben bitre azonos a szakaszonkénti cv2.line + BGR2GRAY-jel).
+
+        scale: kimeneti méret szorzó (pl. a kijelzés zoomja) – a pontok
+        PREVIEW_SHIFT tört bittel kerülnek a kisebb / nagyobb vászonra.
+        """
+        if not isinstance(paths, PathSet):
+            paths = PathSet.from_paths(paths)
+
         h, w = shape[:2]
-        canvas = np.ones((h, w, 3), dtype=np.uint8) * 255
+        if scale != 1.0:
+            h = max(1, int(round(h * scale)))
+            w = max(1, int(round(w * scale)))
+
+        canvas = np.full((h, w), 255, np.uint8)
+
+        # egypontos útvonalnak nincs szakasza
+        keep = paths.counts() > 1
+        if not keep.all():
+            paths = paths.select(keep)
+
+        if len(paths) == 0:
+            return canvas
 
-        for path in paths:
-            for i in range(len(path)-1):
-                cv2.line(canvas, path[i], path[i+1], (0,0,0), 1, cv2.LINE_AA)
+        if scale == 1.0:
+            cv2.polylines(canvas, paths.polylines(), False, 0, 1, cv2.LINE_AA)
+            return canvas
 
+        # pixel középpontok: (x + 0.5) * scale - 0.5
+        one = 1 << self.PREVIEW_SHIFT
+        pts = np.rint(((paths.points + 0.5) * scale - 0.5) * one).astype(np.int32)
+        cv2.polylines(canvas, PathSet(pts, paths.offsets).polylines(), False, 0, 1,
+                      cv2.LINE_AA, self.PREVIEW_SHIFT)
         return canvas